@@ -0,0 +1,74 @@
+""" Intermediate result cache shared between the stages of a benchmark pipeline. Dask collections are persisted
+when they are added to the cache, so that downstream stages reuse the computed chunks instead of recomputing them
+from the raw genotype data; other results (e.g. numpy arrays) are held as-is. Entries are evicted explicitly once no
+later stage needs them. """
+
+from collections import OrderedDict
+import dask.array as da
+
+
+def _persist(value):
+    """ Persists Dask-backed values (including scikit-allel Dask array wrappers); returns other values unchanged. """
+    if isinstance(value, da.Array):
+        return value.persist()
+    values = getattr(value, 'values', None)
+    if isinstance(values, da.Array):
+        return type(value)(values.persist())
+    return value
+
+
+def _nbytes(value):
+    """ Returns the number of bytes held by a cached value, or 0 if unknown. """
+    nbytes = getattr(value, 'nbytes', 0)
+    return int(nbytes) if nbytes is not None else 0
+
+
+class IntermediateResultCache:
+    """ Holds intermediate results of a pipeline, keyed by name, and tracks hits, misses and memory held. """
+
+    def __init__(self, enabled=True):
+        """
+        :param enabled: if False, every lookup computes its result and nothing is held
+        :type enabled: bool
+        """
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+
+    def get(self, key, compute):
+        """
+        Returns the cached result for key, computing (and persisting, if Dask-backed) it on a miss.
+        :param key: name of the intermediate result
+        :param compute: callable which produces the result if it is not cached
+        :type key: str
+        """
+        if self.enabled and key in self._results:
+            self.hits += 1
+            return self._results[key]
+
+        self.misses += 1
+        value = compute()
+        if self.enabled:
+            value = _persist(value)
+            self._results[key] = value
+        return value
+
+    def evict(self, *keys):
+        """
+        Removes results from the cache, releasing the memory they hold.
+        :param keys: names of the intermediate results to evict
+        """
+        for key in keys:
+            self._results.pop(key, None)
+
+    def clear(self):
+        self._results.clear()
+
+    def __contains__(self, key):
+        return key in self._results
+
+    @property
+    def nbytes(self):
+        """ Number of bytes currently held by cached results. """
+        return sum(_nbytes(value) for value in self._results.values())
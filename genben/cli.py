@@ -7,9 +7,13 @@ import datetime
 import time  # for benchmark timer
 import csv  # for writing results
 import logging
+import os
 import sys
 import shutil
-from genben import core, config, data_service, dask_utils
+from genben import config
+
+# Modules used by a single command (and the libraries they load, such as allel, Dask, pandas and InfluxDB) are imported
+# when that command runs, so that other commands and --help start quickly.
 
 
 def get_cli_arguments():
@@ -50,6 +54,52 @@ def get_cli_arguments():
     benchmark_exec_parser.add_argument("--config_file", type=str, required=True,
                                        help="Specify the path to a configuration file.", metavar="FILEPATH")
 
+    compare_parser = subparser.add_parser("compare",
+                                          help='Comparison of the results of two or more benchmark runs. Exits with a non-zero status if a regression is found.')
+    compare_parser.add_argument("baseline", type=str, metavar="BASELINE",
+                                help="Results file (or label) of the baseline benchmark run.")
+    compare_parser.add_argument("candidates", type=str, nargs="+", metavar="CANDIDATE",
+                                help="Results files (or labels) of the benchmark runs to compare against the baseline.")
+    compare_parser.add_argument("--metric", type=str, default="execution_time", choices=config.compare_metric_types,
+                                help="Timing to compare.")
+    compare_parser.add_argument("--alpha", type=float, default=0.05,
+                                help="Significance level of the comparison.")
+    compare_parser.add_argument("--threshold", type=float, default=0.05,
+                                help="Relative slowdown of the median beyond which a significant slowdown is a regression.")
+    compare_parser.add_argument("--delimiter", type=str, default=None,
+                                help="Column delimiter of the results files (detected automatically by default).")
+    compare_parser.add_argument("--output", type=str, default=None, metavar="FILEPATH",
+                                help="Write the comparison to a csv file.")
+
+    generate_parser = subparser.add_parser("generate",
+                                           help='Generation of a synthetic genotype dataset, in Zarr format (with the same layout as converted VCF data) or as a VCF file.')
+    generate_parser.add_argument("--output_format", type=str, default="zarr", choices=["zarr", "vcf"],
+                                 help="Format of the dataset.")
+    generate_parser.add_argument("--output", type=str, default=None, metavar="FILEPATH",
+                                 help="Location of the dataset to write (by default, synthetic in the Zarr data directory, or synthetic.vcf.gz in the VCF data directory). Existing data there is overwritten.")
+    generate_parser.add_argument("--num_variants", type=int, required=True, help="Number of variants.")
+    generate_parser.add_argument("--num_samples", type=int, required=True, help="Number of samples.")
+    generate_parser.add_argument("--seed", type=int, default=0, help="Seed of the random number generator.")
+    generate_parser.add_argument("--missing_rate", type=float, default=0.0,
+                                 help="Fraction of genotype calls which are missing.")
+    generate_parser.add_argument("--multiallelic_rate", type=float, default=0.0,
+                                 help="Fraction of variants with more than one ALT allele.")
+    generate_parser.add_argument("--alt_number", type=int, default=3, help="Number of ALT allele columns.")
+    generate_parser.add_argument("--chunk_length", type=int, default=None,
+                                 help="Number of variants per chunk (overrides the configuration file).")
+    generate_parser.add_argument("--chunk_width", type=int, default=None,
+                                 help="Number of samples per chunk (overrides the configuration file).")
+    generate_parser.add_argument("--config_file", type=str, default=None, metavar="FILEPATH",
+                                 help="Configuration file whose [vcf_to_zarr] chunk sizes and compressor are used (Zarr format only).")
+    generate_parser.add_argument("--info_fields", type=str, default="NS,AN,AC,AF",
+                                 help="Comma-separated INFO fields to write (VCF format only), from: {}.".format(", ".join(config.synthetic_vcf_info_field_types)))
+    generate_parser.add_argument("--format_fields", type=str, default="GT",
+                                 help="Comma-separated FORMAT fields to write (VCF format only), from: {}.".format(", ".join(config.synthetic_vcf_format_field_types)))
+    generate_parser.add_argument("--compression", type=str, default=None, choices=config.synthetic_vcf_compression_types,
+                                 help="Compression of the VCF file (by default, BGZF if the file name ends with .gz).")
+    generate_parser.add_argument("--workers", type=int, default=None,
+                                 help="Number of processes writing the VCF file (by default, the number of CPU cores).")
+
     runtime_configuration = vars(parser.parse_args())
     return runtime_configuration
 
@@ -66,6 +116,8 @@ def _main():
         config.generate_default_config_file(output_location=output_config_location,
                                             overwrite=overwrite_mode)
     elif command == "setup":
+        from genben import data_service
+
         print("[Setup] Setting up benchmark data.")
 
         # Clear out existing files in VCF and Zarr directories
@@ -96,6 +148,8 @@ def _main():
                                            output_zarr_dir=data_dirs.zarr_dir_setup,
                                            conversion_config=vcf_to_zarr_config)
     elif command == "exec":
+        from genben import core, data_service, dask_utils, scaling, sweep
+
         print("[Exec] Executing benchmark tool.")
 
         # Clear out existing files in Zarr benchmark directory
@@ -110,20 +164,154 @@ def _main():
         # Extract Dask scheduler configuration
         dask_config = config.DaskSchedulerConfigurationRepresentation(runtime_config)
 
-        # Connect to Dask scheduler if enabled
+        # Get Benchmark module settings from runtime config
+        benchmark_config = config.BenchmarkConfigurationRepresentation(runtime_config)
+
+        # Get scaling experiment and parameter sweep settings from runtime config
+        scaling_config = config.ScalingConfigurationRepresentation(runtime_config)
+        sweep_config = config.SweepConfigurationRepresentation(runtime_config)
+        if scaling_config.enabled and sweep_config.enabled:
+            print("[Exec] Error: Scaling experiments and parameter sweeps cannot be enabled at the same time.")
+            sys.exit(1)
+
+        # Run a scaling experiment instead of a single benchmark if enabled (it starts its own local clusters)
+        if scaling_config.enabled:
+            experiment = scaling.ScalingExperiment(bench_conf=benchmark_config, dask_config=dask_config,
+                                                   scaling_config=scaling_config, data_dirs=data_dirs,
+                                                   benchmark_label=benchmark_label)
+            experiment.run()
+            return
+
+        # Connect to Dask scheduler (or start a local cluster) if enabled
+        du = None
+        dask_cluster_parameters = None
         if dask_config.enabled:
             du = dask_utils.DaskUtils()
-            du.connect_to_scheduler(address=dask_config.scheduler_address,
-                                    port=dask_config.scheduler_port)
+            if dask_config.mode == 'local_cluster':
+                # A value of -1 (or an empty spill directory) leaves the setting to Dask
+                n_workers = dask_config.local_cluster_n_workers
+                threads_per_worker = dask_config.local_cluster_threads_per_worker
+                du.start_local_cluster(n_workers=n_workers if n_workers > 0 else None,
+                                       threads_per_worker=threads_per_worker if threads_per_worker > 0 else None,
+                                       memory_limit=dask_config.local_cluster_memory_limit,
+                                       spill_dir=dask_config.local_cluster_spill_dir or None,
+                                       processes=dask_config.local_cluster_processes)
+            else:
+                du.connect_to_scheduler(address=dask_config.scheduler_address,
+                                        port=dask_config.scheduler_port)
+            dask_cluster_parameters = du.get_cluster_parameters()
 
-        # Get Benchmark module settings from runtime config
-        benchmark_config = config.BenchmarkConfigurationRepresentation(runtime_config)
+        try:
+            if sweep_config.enabled:
+                # Run the benchmark for each point of the parameter sweep
+                runner = sweep.SweepRunner(runtime_config=runtime_config, sweep_config=sweep_config,
+                                           data_dirs=data_dirs, benchmark_label=benchmark_label,
+                                           dask_cluster_parameters=dask_cluster_parameters)
+                runner.run()
+            else:
+                # Setup the benchmark runner
+                benchmark = core.Benchmark(bench_conf=benchmark_config, data_dirs=data_dirs,
+                                           benchmark_label=benchmark_label,
+                                           dask_cluster_parameters=dask_cluster_parameters)
+
+                # Run the benchmark
+                benchmark.run_benchmark()
+        finally:
+            # Disconnect from the Dask scheduler and shut down the local cluster, if one was started
+            if du is not None:
+                du.close()
+    elif command == "compare":
+        import pandas as pd
+        from genben import compare
+
+        delimiter = cli_arguments["delimiter"]
+        baseline_path = compare.results_path(cli_arguments["baseline"])
+        if not os.path.isfile(baseline_path):
+            print("[Compare] Error: Results file could not be found: {}".format(baseline_path))
+            sys.exit(1)
+        baseline = compare.load_results(baseline_path, delimiter=delimiter)
+
+        comparison_rows = []
+        regressions = 0
+        for candidate_name in cli_arguments["candidates"]:
+            candidate_path = compare.results_path(candidate_name)
+            if not os.path.isfile(candidate_path):
+                print("[Compare] Error: Results file could not be found: {}".format(candidate_path))
+                sys.exit(1)
+            candidate = compare.load_results(candidate_path, delimiter=delimiter)
+
+            print("[Compare] {} vs. {} ({}):".format(baseline_path, candidate_path, cli_arguments["metric"]))
+            comparisons = compare.compare_results(baseline, candidate,
+                                                  metric=cli_arguments["metric"],
+                                                  alpha=cli_arguments["alpha"],
+                                                  threshold=cli_arguments["threshold"])
+            if len(comparisons) == 0:
+                print("  - No operations in common.")
+            for comparison in comparisons:
+                print("  - {}".format(compare.format_comparison(comparison)))
+                comparison["baseline"] = baseline_path
+                comparison["candidate"] = candidate_path
+                comparison_rows.append(comparison)
+                if comparison["regression"]:
+                    regressions += 1
+
+        if cli_arguments["output"] is not None and len(comparison_rows) > 0:
+            pd.DataFrame(comparison_rows, columns=list(comparison_rows[0].keys())).to_csv(cli_arguments["output"],
+                                                                                          index=False)
+
+        if regressions > 0:
+            print("[Compare] {} regression(s) found.".format(regressions))
+            sys.exit(1)
+        print("[Compare] No regressions found.")
+    elif command == "generate":
+        from genben import data_service, synthetic
 
-        # Setup the benchmark runner
-        benchmark = core.Benchmark(bench_conf=benchmark_config, data_dirs=data_dirs, benchmark_label=benchmark_label)
+        output_path = cli_arguments["output"]
+        try:
+            if cli_arguments["output_format"] == "vcf":
+                if output_path is None:
+                    data_service.create_directory_tree(data_dirs.vcf_dir)
+                    output_path = os.path.join(data_dirs.vcf_dir, "synthetic.vcf.gz")
+                synthetic.generate_vcf(output_vcf_path=output_path,
+                                       n_variants=cli_arguments["num_variants"],
+                                       n_samples=cli_arguments["num_samples"],
+                                       seed=cli_arguments["seed"],
+                                       missing_rate=cli_arguments["missing_rate"],
+                                       multiallelic_rate=cli_arguments["multiallelic_rate"],
+                                       alt_number=cli_arguments["alt_number"],
+                                       info_fields=[f for f in cli_arguments["info_fields"].split(",") if f != ""],
+                                       format_fields=[f for f in cli_arguments["format_fields"].split(",") if f != ""],
+                                       compression=cli_arguments["compression"],
+                                       n_workers=cli_arguments["workers"])
+            else:
+                chunk_length = cli_arguments["chunk_length"]
+                chunk_width = cli_arguments["chunk_width"]
+                compressor = None
+                if cli_arguments["config_file"] is not None:
+                    # Use the chunk sizes and compressor of VCF to Zarr conversion, unless given on the command line
+                    runtime_config = config.read_configuration(location=cli_arguments["config_file"])
+                    vcf_to_zarr_config = config.VCFtoZarrConfigurationRepresentation(runtime_config)
+                    if chunk_length is None:
+                        chunk_length = vcf_to_zarr_config.chunk_length
+                    if chunk_width is None:
+                        chunk_width = vcf_to_zarr_config.chunk_width
+                    compressor = data_service.get_compressor(vcf_to_zarr_config)
 
-        # Run the benchmark
-        benchmark.run_benchmark()
+                if output_path is None:
+                    output_path = os.path.join(data_dirs.zarr_dir_setup, "synthetic")
+                synthetic.generate_zarr(output_zarr_path=output_path,
+                                        n_variants=cli_arguments["num_variants"],
+                                        n_samples=cli_arguments["num_samples"],
+                                        seed=cli_arguments["seed"],
+                                        missing_rate=cli_arguments["missing_rate"],
+                                        multiallelic_rate=cli_arguments["multiallelic_rate"],
+                                        alt_number=cli_arguments["alt_number"],
+                                        chunk_length=chunk_length,
+                                        chunk_width=chunk_width,
+                                        compressor=compressor)
+        except ValueError as e:
+            print("[Generate] Error: {}".format(e))
+            sys.exit(1)
     else:
         print("Error: Unexpected command specified. Exiting...")
         sys.exit(1)
@@ -0,0 +1,106 @@
+""" Comparison of benchmark result sets. Operations are matched by name between a baseline result set and one or more
+candidate result sets, and the execution times of each operation (one sample per run) are compared: the Mann-Whitney U
+test decides whether a difference is significant, and a bootstrap confidence interval for the ratio of the medians
+gives the size of the difference. A significant slowdown beyond a threshold is reported as a regression. """
+
+import os
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from genben import config, stats
+
+COMPARE_METRICS = config.compare_metric_types
+
+
+def results_path(result_set):
+    """
+    Resolves a result set given on the command line to the path of its results file. A result set is either the path
+    of a results CSV file or a benchmark label, whose results are in "<label>.csv".
+    :param result_set: path or benchmark label
+    :return: path of the results file
+    """
+    if os.path.isfile(result_set):
+        return result_set
+    return '{}.csv'.format(result_set)
+
+
+def _detect_delimiter(path):
+    with open(path, 'r') as f:
+        header = f.readline()
+    # The header contains the column names only, so the delimiter is the candidate which splits it most often
+    return max(['|', ',', ';', '\t'], key=header.count)
+
+
+def load_results(path, delimiter=None):
+    """
+    Loads a benchmark results file, as written by the CSV output of the exec command.
+    :param path: path of the results file
+    :param delimiter: column delimiter. If None, the delimiter is detected from the header line.
+    :return: pandas DataFrame with one row per operation and run
+    """
+    if delimiter is None:
+        delimiter = _detect_delimiter(path)
+    return pd.read_csv(path, sep=delimiter)
+
+
+def compare_results(baseline, candidate, metric='execution_time', alpha=0.05, threshold=0.05):
+    """
+    Compares the timings of each operation which appears in both result sets.
+    :param baseline: baseline results, as returned by load_results()
+    :param candidate: candidate results, as returned by load_results()
+    :param metric: timing column to compare
+    :param alpha: significance level of the Mann-Whitney U test (and 1 - confidence level of the bootstrap interval)
+    :param threshold: relative slowdown of the median beyond which a significant slowdown counts as a regression
+    :return: list of OrderedDicts, one per operation, in the order of the baseline results
+    """
+    comparisons = []
+    candidate_operations = set(candidate['operation'])
+    for operation_name in pd.unique(baseline['operation']):
+        if operation_name not in candidate_operations:
+            continue
+        a = baseline.loc[baseline['operation'] == operation_name, metric].dropna().values
+        b = candidate.loc[candidate['operation'] == operation_name, metric].dropna().values
+        if a.shape[0] == 0 or b.shape[0] == 0:
+            continue
+
+        baseline_median = np.median(a)
+        candidate_median = np.median(b)
+        ratio = candidate_median / baseline_median if baseline_median > 0 else np.inf
+        ratio_low, ratio_high = stats.bootstrap_median_ratio_ci(a, b, confidence=1 - alpha)
+        p_value = stats.mann_whitney_p_value(a, b)
+        significant = p_value < alpha
+
+        comparisons.append(OrderedDict([('operation', operation_name),
+                                        ('baseline_samples', a.shape[0]),
+                                        ('candidate_samples', b.shape[0]),
+                                        ('baseline_median', baseline_median),
+                                        ('candidate_median', candidate_median),
+                                        ('speedup', 1 / ratio if ratio > 0 else np.inf),
+                                        ('ratio_ci_low', ratio_low),
+                                        ('ratio_ci_high', ratio_high),
+                                        ('p_value', p_value),
+                                        ('significant', significant),
+                                        ('regression', significant and ratio > 1 + threshold)]))
+    return comparisons
+
+
+def format_comparison(comparison):
+    """
+    Formats the comparison of a single operation as a line of text.
+    :param comparison: entry returned by compare_results()
+    :return: str
+    """
+    speedup = comparison['speedup']
+    if speedup >= 1:
+        change = '{:.3f}x faster'.format(speedup)
+    else:
+        change = '{:.3f}x slower'.format(1 / speedup)
+    if comparison['regression']:
+        verdict = 'REGRESSION'
+    elif comparison['significant']:
+        verdict = 'significant'
+    else:
+        verdict = 'not significant'
+    return '{}: {:.6f}s -> {:.6f}s, {} (ratio CI: [{:.3f}, {:.3f}], p = {:.4f}, {})'.format(
+        comparison['operation'], comparison['baseline_median'], comparison['candidate_median'], change,
+        comparison['ratio_ci_low'], comparison['ratio_ci_high'], comparison['p_value'], verdict)
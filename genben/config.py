@@ -1,8 +1,11 @@
 from configparser import ConfigParser
+from collections import OrderedDict
 from shutil import copyfile
 import os.path
-from pkg_resources import resource_string
-from numcodecs import Blosc
+import pkgutil
+
+# Only the standard library is imported here, as the configuration is read by every command of the command line
+# interface (libraries needed to interpret particular settings are imported where they are used)
 
 
 def config_str_to_bool(input_str):
@@ -21,6 +24,7 @@ class DataDirectoriesConfigurationRepresentation:
     vcf_dir = "./data/vcf/"
     zarr_dir_setup = "./data/zarr/"
     zarr_dir_benchmark = "./data/zarr_benchmark/"
+    cache_dir = "./data/cache/"
 
 
 def isint(value):
@@ -104,9 +108,15 @@ class FTPConfigurationRepresentation(object):
                         self.files = files_str.split(delimiter)
 
 
+# Blosc shuffle modes, with the values of numcodecs.Blosc.NOSHUFFLE, SHUFFLE, BITSHUFFLE and AUTOSHUFFLE
+BLOSC_NOSHUFFLE = 0
+BLOSC_SHUFFLE = 1
+BLOSC_BITSHUFFLE = 2
+BLOSC_AUTOSHUFFLE = -1
+
 vcf_to_zarr_compressor_types = ["Blosc"]
 vcf_to_zarr_blosc_algorithm_types = ["zstd", "blosclz", "lz4", "lz4hc", "zlib", "snappy"]
-vcf_to_zarr_blosc_shuffle_types = [Blosc.NOSHUFFLE, Blosc.SHUFFLE, Blosc.BITSHUFFLE, Blosc.AUTOSHUFFLE]
+vcf_to_zarr_blosc_shuffle_types = [BLOSC_NOSHUFFLE, BLOSC_SHUFFLE, BLOSC_BITSHUFFLE, BLOSC_AUTOSHUFFLE]
 
 
 class VCFtoZarrConfigurationRepresentation:
@@ -119,7 +129,7 @@ class VCFtoZarrConfigurationRepresentation:
     compressor = "Blosc"  # Specifies compressor type to use for Zarr conversion
     blosc_compression_algorithm = "zstd"
     blosc_compression_level = 1  # Level of compression to use for Zarr conversion
-    blosc_shuffle_mode = Blosc.AUTOSHUFFLE
+    blosc_shuffle_mode = BLOSC_AUTOSHUFFLE
 
     def __init__(self, runtime_config=None):
         """
@@ -196,11 +206,20 @@ class VCFtoZarrConfigurationRepresentation:
                                         "blosc_shuffle_mode could not be converted to integer.")
 
 
+dask_mode_types = ['scheduler', 'local_cluster']
+
+
 class DaskSchedulerConfigurationRepresentation:
     """ Utility class for object representation of the Dask scheduler module configuration. """
     enabled = False  # Specifies whether connection to a Dask scheduler should be performed or not
+    mode = 'scheduler'  # Connect to an external scheduler, or start a local cluster
     scheduler_address = '127.0.0.1'
     scheduler_port = 8786
+    local_cluster_n_workers = -1
+    local_cluster_threads_per_worker = -1
+    local_cluster_memory_limit = 'auto'
+    local_cluster_spill_dir = ''
+    local_cluster_processes = True
 
     def __init__(self, runtime_config=None):
         """
@@ -224,6 +243,180 @@ class DaskSchedulerConfigurationRepresentation:
                     else:
                         raise ValueError("Invalid value provided for scheduler port in configuration.\n"
                                          "Expected: positive integer value")
+                if "mode" in config_dask:
+                    mode_str = config_dask["mode"]
+                    if mode_str in dask_mode_types:
+                        self.mode = mode_str
+                    else:
+                        raise ValueError("Invalid value provided for mode in [dask] configuration.\n"
+                                         "Expected one of: {}".format(', '.join(dask_mode_types)))
+                if "local_cluster_n_workers" in config_dask:
+                    n_workers_str = config_dask["local_cluster_n_workers"]
+                    if isint(n_workers_str) and (int(n_workers_str) > 0 or int(n_workers_str) == -1):
+                        self.local_cluster_n_workers = int(n_workers_str)
+                    else:
+                        raise ValueError("Invalid value provided for local_cluster_n_workers in configuration.\n"
+                                         "Expected: positive integer value, or -1")
+                if "local_cluster_threads_per_worker" in config_dask:
+                    threads_per_worker_str = config_dask["local_cluster_threads_per_worker"]
+                    if isint(threads_per_worker_str) and (int(threads_per_worker_str) > 0 or
+                                                          int(threads_per_worker_str) == -1):
+                        self.local_cluster_threads_per_worker = int(threads_per_worker_str)
+                    else:
+                        raise ValueError("Invalid value provided for local_cluster_threads_per_worker in "
+                                         "configuration.\nExpected: positive integer value, or -1")
+                if "local_cluster_memory_limit" in config_dask:
+                    self.local_cluster_memory_limit = config_dask["local_cluster_memory_limit"]
+                if "local_cluster_spill_dir" in config_dask:
+                    self.local_cluster_spill_dir = config_dask["local_cluster_spill_dir"]
+                if "local_cluster_processes" in config_dask:
+                    self.local_cluster_processes = config_str_to_bool(config_dask["local_cluster_processes"])
+
+
+scaling_mode_types = ['strong', 'weak']
+scaling_unit_types = ['workers', 'threads']
+
+
+class ScalingConfigurationRepresentation:
+    """ Utility class for object representation of the scaling experiment module configuration. """
+    enabled = False
+    mode = 'strong'
+    unit = 'workers'
+    counts = [1, 2, 4]
+    threads_per_worker = 1
+
+    def __init__(self, runtime_config=None):
+        """
+        Creates an object representation of the scaling experiment module's configuration data.
+        :param runtime_config: runtime_config data to extract scaling experiment configuration from
+        :type runtime_config: ConfigurationRepresentation
+        """
+        if runtime_config is not None:
+            # Check if [scaling] section exists in config
+            if hasattr(runtime_config, "scaling"):
+                # Extract relevant settings from config file
+                config_scaling = runtime_config['scaling']
+                if "enabled" in config_scaling:
+                    self.enabled = config_str_to_bool(config_scaling["enabled"])
+                if "mode" in config_scaling:
+                    mode_str = config_scaling["mode"]
+                    if mode_str in scaling_mode_types:
+                        self.mode = mode_str
+                    else:
+                        raise ValueError("Invalid value provided for mode in [scaling] configuration.\n"
+                                         "Expected one of: {}".format(', '.join(scaling_mode_types)))
+                if "unit" in config_scaling:
+                    unit_str = config_scaling["unit"]
+                    if unit_str in scaling_unit_types:
+                        self.unit = unit_str
+                    else:
+                        raise ValueError("Invalid value provided for unit in [scaling] configuration.\n"
+                                         "Expected one of: {}".format(', '.join(scaling_unit_types)))
+                if "counts" in config_scaling:
+                    counts = [count.strip() for count in config_scaling["counts"].split(',') if count.strip() != '']
+                    if len(counts) > 0 and all(isint(count) and int(count) > 0 for count in counts):
+                        self.counts = sorted(set(int(count) for count in counts))
+                    else:
+                        raise ValueError("Invalid value provided for counts in [scaling] configuration.\n"
+                                         "Expected: comma-separated list of positive integer values")
+                if "threads_per_worker" in config_scaling:
+                    threads_per_worker_str = config_scaling["threads_per_worker"]
+                    if isint(threads_per_worker_str) and int(threads_per_worker_str) > 0:
+                        self.threads_per_worker = int(threads_per_worker_str)
+                    else:
+                        raise ValueError("Invalid value provided for threads_per_worker in [scaling] configuration.\n"
+                                         "Expected: positive integer value")
+
+
+sweep_method_types = ['cartesian', 'latin_hypercube']
+sweep_section_types = ['benchmark', 'vcf_to_zarr']
+
+# Timings which can be compared between benchmark runs (columns of the results files)
+compare_metric_types = ['execution_time', 'cpu_time', 'self_time']
+
+# Fields and compression types supported for synthetic VCF files (see synthetic.generate_vcf())
+synthetic_vcf_info_field_types = ['NS', 'AN', 'AC', 'AF', 'DP']
+synthetic_vcf_format_field_types = ['GT', 'DP', 'GQ', 'AD']
+synthetic_vcf_compression_types = ['none', 'gzip', 'bgzf']
+
+
+def parse_sweep_values(value_str):
+    """
+    Parses the values of a swept configuration key: either a comma-separated list of values, or a range of integers
+    written as range(start, stop[, step]), with the same meaning as Python's range().
+    :param value_str: configuration value
+    :type value_str: str
+    :return: list of values, as strings
+    """
+    value_str = value_str.strip()
+    if value_str.startswith('range(') and value_str.endswith(')'):
+        bounds = [bound.strip() for bound in value_str[len('range('):-1].split(',')]
+        if not (1 <= len(bounds) <= 3 and all(isint(bound) for bound in bounds)):
+            raise ValueError("Invalid range in [sweep] configuration: {}\n"
+                             "Expected: range(start, stop[, step]) with integer values".format(value_str))
+        return [str(value) for value in range(*[int(bound) for bound in bounds])]
+    return [value.strip() for value in value_str.split(',') if value.strip() != '']
+
+
+class SweepConfigurationRepresentation:
+    """ Utility class for object representation of the parameter sweep module configuration. """
+    enabled = False
+    method = 'cartesian'
+    samples = 10
+    seed = 0
+
+    def __init__(self, runtime_config=None):
+        """
+        Creates an object representation of the parameter sweep module's configuration data. Swept keys are given as
+        "<section>.<key> = <values>", where section is benchmark or vcf_to_zarr.
+        :param runtime_config: runtime_config data to extract parameter sweep configuration from
+        :type runtime_config: ConfigurationRepresentation
+        """
+        self.parameters = OrderedDict()  # Values of each swept key, by (section, key)
+
+        if runtime_config is not None:
+            # Check if [sweep] section exists in config
+            if hasattr(runtime_config, "sweep"):
+                # Extract relevant settings from config file
+                config_sweep = runtime_config['sweep']
+                for name, value_str in config_sweep.items():
+                    if name == "enabled":
+                        self.enabled = config_str_to_bool(value_str)
+                    elif name == "method":
+                        if value_str in sweep_method_types:
+                            self.method = value_str
+                        else:
+                            raise ValueError("Invalid value provided for method in [sweep] configuration.\n"
+                                             "Expected one of: {}".format(', '.join(sweep_method_types)))
+                    elif name == "samples":
+                        if isint(value_str) and int(value_str) > 0:
+                            self.samples = int(value_str)
+                        else:
+                            raise ValueError("Invalid value provided for samples in [sweep] configuration.\n"
+                                             "Expected: positive integer value")
+                    elif name == "seed":
+                        if isint(value_str):
+                            self.seed = int(value_str)
+                        else:
+                            raise ValueError("Invalid value provided for seed in [sweep] configuration.\n"
+                                             "Expected: integer value")
+                    else:
+                        section, _, key = name.partition('.')
+                        if section not in sweep_section_types or key == '':
+                            raise ValueError("Invalid key in [sweep] configuration: {}\n"
+                                             "Expected: <section>.<key>, where section is one of: {}".format(
+                                                 name, ', '.join(sweep_section_types)))
+                        # Keys which the section does not read would be ignored, running every point the same way
+                        section_class = {'benchmark': BenchmarkConfigurationRepresentation,
+                                         'vcf_to_zarr': VCFtoZarrConfigurationRepresentation}[section]
+                        if key.startswith('_') or not hasattr(section_class, key) or callable(
+                                getattr(section_class, key)):
+                            raise ValueError("Invalid key in [sweep] configuration: {}\n"
+                                             "{} is not a key of the [{}] configuration.".format(name, key, section))
+                        values = parse_sweep_values(value_str)
+                        if len(values) == 0:
+                            raise ValueError("No values provided for {} in [sweep] configuration.".format(name))
+                        self.parameters[(section, key)] = values
 
 
 benchmark_data_input_types = ["vcf", "zarr"]
@@ -235,33 +428,79 @@ benchmark_pca_data_scaler_types = {PCA_DATA_SCALER_STANDARD: 'standard',
                                    PCA_DATA_SCALER_PATTERSON: 'patterson',
                                    PCA_DATA_SCALER_NONE: None}
 
+PCA_DATA_PRECISION_DEFAULT = 0
+PCA_DATA_PRECISION_FLOAT32 = 1
+PCA_DATA_PRECISION_FLOAT64 = 2
+benchmark_pca_data_precision_types = {PCA_DATA_PRECISION_DEFAULT: None,
+                                      PCA_DATA_PRECISION_FLOAT32: 'float32',
+                                      PCA_DATA_PRECISION_FLOAT64: 'float64'}
+
+pca_solver_types = ['exact', 'arpack', 'block_krylov', 'randomized']
+
+PCA_SUBSET_METHOD_GLOBAL = 0
+PCA_SUBSET_METHOD_CHUNKED = 1
+pca_subset_method_types = {PCA_SUBSET_METHOD_GLOBAL,
+                           PCA_SUBSET_METHOD_CHUNKED}
+
 GENOTYPE_ARRAY_NORMAL = 0
 GENOTYPE_ARRAY_DASK = 1
 GENOTYPE_ARRAY_CHUNKED = 2
+GENOTYPE_ARRAY_PACKED = 3
 genotype_array_types = {GENOTYPE_ARRAY_NORMAL,
                         GENOTYPE_ARRAY_DASK,
-                        GENOTYPE_ARRAY_CHUNKED}
+                        GENOTYPE_ARRAY_CHUNKED,
+                        GENOTYPE_ARRAY_PACKED}
+
+COMPUTE_ENGINE_ALLEL = 0
+COMPUTE_ENGINE_NUMBA = 1
+compute_engine_types = {COMPUTE_ENGINE_ALLEL,
+                        COMPUTE_ENGINE_NUMBA}
 
 
 class BenchmarkConfigurationRepresentation:
     """ Utility class for object representation of the benchmark module's configuration. """
     benchmark_number_runs = 5
+    benchmark_warmup_runs = 0
+    benchmark_adaptive_enabled = False
+    benchmark_adaptive_ci_target = 0.05
+    benchmark_adaptive_max_runs = 100
+    benchmark_adaptive_time_budget = 3600.0
+    benchmark_trace_allocations = False
+    benchmark_dask_diagnostics = False
+    benchmark_isolation_enabled = False
+    benchmark_isolation_memory_limit = 0
+    benchmark_isolation_timeout = 0.0
     benchmark_data_input = "vcf"
     benchmark_dataset = ""
     benchmark_num_variants = -1
     benchmark_num_samples = -1
     benchmark_aggregations = False
+    benchmark_operations = []
+    benchmark_operation_modules = []
     benchmark_pca = False
     genotype_array_type = GENOTYPE_ARRAY_DASK
     dask_genotype_array_chunk_variants = -1
     dask_genotype_array_chunk_samples = -1
+    compute_engine = COMPUTE_ENGINE_ALLEL
+    compute_engine_cross_check = False
     vcf_to_zarr_config = None
     results_output_config = None
 
     # PCA-specific settings
     pca_number_components = 10
     pca_data_scaler = benchmark_pca_data_scaler_types[PCA_DATA_SCALER_PATTERSON]
+    pca_data_precision = benchmark_pca_data_precision_types[PCA_DATA_PRECISION_DEFAULT]
     pca_subset_size = 100000
+    pca_subset_method = PCA_SUBSET_METHOD_GLOBAL
+    pca_subset_seed = -1
+    pca_cache_intermediate_results = False
+    pca_n_alt_cache_enabled = False
+    pca_gram_enabled = False
+    pca_incremental_enabled = False
+    pca_solvers = []
+    pca_solver_oversamples = 10
+    pca_solver_power_iterations = 4
+    pca_solver_exact_reference = False
     pca_ld_enabled = False
     pca_ld_pruning_number_iterations = 2
     pca_ld_pruning_size = 100
@@ -282,6 +521,61 @@ class BenchmarkConfigurationRepresentation:
                         self.benchmark_number_runs = int(runtime_config.benchmark["benchmark_number_runs"])
                     except ValueError:
                         pass
+                if "benchmark_warmup_runs" in runtime_config.benchmark:
+                    benchmark_warmup_runs_str = runtime_config.benchmark["benchmark_warmup_runs"]
+                    if isint(benchmark_warmup_runs_str) and (int(benchmark_warmup_runs_str) >= 0):
+                        self.benchmark_warmup_runs = int(benchmark_warmup_runs_str)
+                    else:
+                        raise ValueError("Invalid value for benchmark_warmup_runs in configuration.\n"
+                                         "benchmark_warmup_runs must be a valid integer greater than or equal to 0.")
+                if "benchmark_adaptive_enabled" in runtime_config.benchmark:
+                    self.benchmark_adaptive_enabled = config_str_to_bool(
+                        runtime_config.benchmark["benchmark_adaptive_enabled"])
+                if "benchmark_adaptive_ci_target" in runtime_config.benchmark:
+                    benchmark_adaptive_ci_target_str = runtime_config.benchmark["benchmark_adaptive_ci_target"]
+                    if isfloat(benchmark_adaptive_ci_target_str) and (float(benchmark_adaptive_ci_target_str) > 0):
+                        self.benchmark_adaptive_ci_target = float(benchmark_adaptive_ci_target_str)
+                    else:
+                        raise ValueError("Invalid value for benchmark_adaptive_ci_target in configuration.\n"
+                                         "benchmark_adaptive_ci_target must be a number greater than 0.")
+                if "benchmark_adaptive_max_runs" in runtime_config.benchmark:
+                    benchmark_adaptive_max_runs_str = runtime_config.benchmark["benchmark_adaptive_max_runs"]
+                    if isint(benchmark_adaptive_max_runs_str) and (int(benchmark_adaptive_max_runs_str) > 0):
+                        self.benchmark_adaptive_max_runs = int(benchmark_adaptive_max_runs_str)
+                    else:
+                        raise ValueError("Invalid value for benchmark_adaptive_max_runs in configuration.\n"
+                                         "benchmark_adaptive_max_runs must be a valid integer greater than 0.")
+                if "benchmark_adaptive_time_budget" in runtime_config.benchmark:
+                    benchmark_adaptive_time_budget_str = runtime_config.benchmark["benchmark_adaptive_time_budget"]
+                    if isfloat(benchmark_adaptive_time_budget_str) and (float(benchmark_adaptive_time_budget_str) > 0):
+                        self.benchmark_adaptive_time_budget = float(benchmark_adaptive_time_budget_str)
+                    else:
+                        raise ValueError("Invalid value for benchmark_adaptive_time_budget in configuration.\n"
+                                         "benchmark_adaptive_time_budget must be a number greater than 0.")
+                if "benchmark_trace_allocations" in runtime_config.benchmark:
+                    self.benchmark_trace_allocations = config_str_to_bool(
+                        runtime_config.benchmark["benchmark_trace_allocations"])
+                if "benchmark_dask_diagnostics" in runtime_config.benchmark:
+                    self.benchmark_dask_diagnostics = config_str_to_bool(
+                        runtime_config.benchmark["benchmark_dask_diagnostics"])
+                if "benchmark_isolation_enabled" in runtime_config.benchmark:
+                    self.benchmark_isolation_enabled = config_str_to_bool(
+                        runtime_config.benchmark["benchmark_isolation_enabled"])
+                if "benchmark_isolation_memory_limit" in runtime_config.benchmark:
+                    memory_limit_str = runtime_config.benchmark["benchmark_isolation_memory_limit"]
+                    from dask.utils import parse_bytes
+                    try:
+                        self.benchmark_isolation_memory_limit = parse_bytes(memory_limit_str)
+                    except ValueError:
+                        raise ValueError("Invalid value for benchmark_isolation_memory_limit in configuration.\n"
+                                         "benchmark_isolation_memory_limit must be a size such as 4GB, or 0.")
+                if "benchmark_isolation_timeout" in runtime_config.benchmark:
+                    timeout_str = runtime_config.benchmark["benchmark_isolation_timeout"]
+                    if isfloat(timeout_str) and float(timeout_str) >= 0:
+                        self.benchmark_isolation_timeout = float(timeout_str)
+                    else:
+                        raise ValueError("Invalid value for benchmark_isolation_timeout in configuration.\n"
+                                         "benchmark_isolation_timeout must be a number greater than or equal to 0.")
                 if "benchmark_data_input" in runtime_config.benchmark:
                     benchmark_data_input_temp = runtime_config.benchmark["benchmark_data_input"]
                     if benchmark_data_input_temp in benchmark_data_input_types:
@@ -308,6 +602,23 @@ class BenchmarkConfigurationRepresentation:
                                          "Alternatively, a value of -1 can be specified to include all samples.")
                 if "benchmark_aggregations" in runtime_config.benchmark:
                     self.benchmark_aggregations = config_str_to_bool(runtime_config.benchmark["benchmark_aggregations"])
+                if "benchmark_operation_modules" in runtime_config.benchmark:
+                    self.benchmark_operation_modules = [
+                        module_name.strip() for module_name in
+                        runtime_config.benchmark["benchmark_operation_modules"].split(',') if module_name.strip() != '']
+                if "benchmark_operations" in runtime_config.benchmark:
+                    benchmark_operations = [
+                        selector.strip() for selector in runtime_config.benchmark["benchmark_operations"].split(',')
+                        if selector.strip() != '']
+                    # Imported here, as the operations (and the modules registering them) import scikit-allel
+                    from genben import operations
+                    try:
+                        operations.import_operation_modules(self.benchmark_operation_modules)
+                        operations.select_operations(benchmark_operations)
+                    except ValueError as e:
+                        raise ValueError("Invalid value for benchmark_operations in configuration.\n"
+                                         "{}".format(e))
+                    self.benchmark_operations = benchmark_operations
                 if "benchmark_pca" in runtime_config.benchmark:
                     self.benchmark_pca = config_str_to_bool(runtime_config.benchmark["benchmark_pca"])
                 if "genotype_array_type" in runtime_config.benchmark:
@@ -317,7 +628,7 @@ class BenchmarkConfigurationRepresentation:
                         self.genotype_array_type = int(genotype_array_type_str)
                     else:
                         raise ValueError("Invalid value for genotype_array_type in configuration.\n"
-                                         "genotype_array_type must be a valid integer between 0 and 2")
+                                         "genotype_array_type must be a valid integer between 0 and 3")
                 if "dask_genotype_array_chunk_variants" in runtime_config.benchmark:
                     dask_genotype_array_chunk_variants_str = runtime_config.benchmark["dask_genotype_array_chunk_variants"]
                     if isint(dask_genotype_array_chunk_variants_str):
@@ -346,6 +657,16 @@ class BenchmarkConfigurationRepresentation:
                         raise TypeError("Invalid type for dask_genotype_array_chunk_samples in configuration.\n"
                                         "dask_genotype_array_chunk_samples must be a valid integer equal to\n"
                                         "-1 or an integer greater than 0.")
+                if "compute_engine" in runtime_config.benchmark:
+                    compute_engine_str = runtime_config.benchmark["compute_engine"]
+                    if isint(compute_engine_str) and (int(compute_engine_str) in compute_engine_types):
+                        self.compute_engine = int(compute_engine_str)
+                    else:
+                        raise ValueError("Invalid value for compute_engine in configuration.\n"
+                                         "compute_engine must be a valid integer between 0 and 1")
+                if "compute_engine_cross_check" in runtime_config.benchmark:
+                    self.compute_engine_cross_check = config_str_to_bool(
+                        runtime_config.benchmark["compute_engine_cross_check"])
                 if "pca_number_components" in runtime_config.benchmark:
                     pca_number_components_str = runtime_config.benchmark["pca_number_components"]
                     if isint(pca_number_components_str) and (int(pca_number_components_str) > 0):
@@ -360,6 +681,14 @@ class BenchmarkConfigurationRepresentation:
                     else:
                         raise ValueError("Invalid value for pca_data_scaler in configuration.\n"
                                          "pca_data_scaler must be a valid integer between 0 and 2")
+                if "pca_data_precision" in runtime_config.benchmark:
+                    pca_data_precision_str = runtime_config.benchmark["pca_data_precision"]
+                    if isint(pca_data_precision_str) and (int(pca_data_precision_str) in
+                                                          benchmark_pca_data_precision_types):
+                        self.pca_data_precision = benchmark_pca_data_precision_types[int(pca_data_precision_str)]
+                    else:
+                        raise ValueError("Invalid value for pca_data_precision in configuration.\n"
+                                         "pca_data_precision must be a valid integer between 0 and 2")
                 if "pca_subset_size" in runtime_config.benchmark:
                     pca_subset_size_str = runtime_config.benchmark["pca_subset_size"]
                     if isint(pca_subset_size_str) and (int(pca_subset_size_str) > 0):
@@ -370,6 +699,59 @@ class BenchmarkConfigurationRepresentation:
                         raise ValueError("Invalid value for pca_subset_size in configuration.\n"
                                          "pca_subset_size must be a valid integer greater than 0.\n"
                                          "Additionally, a value of -1 can be used to include all samples.")
+                if "pca_subset_method" in runtime_config.benchmark:
+                    pca_subset_method_str = runtime_config.benchmark["pca_subset_method"]
+                    if isint(pca_subset_method_str) and (int(pca_subset_method_str) in pca_subset_method_types):
+                        self.pca_subset_method = int(pca_subset_method_str)
+                    else:
+                        raise ValueError("Invalid value for pca_subset_method in configuration.\n"
+                                         "pca_subset_method must be a valid integer between 0 and 1")
+                if "pca_subset_seed" in runtime_config.benchmark:
+                    pca_subset_seed_str = runtime_config.benchmark["pca_subset_seed"]
+                    if isint(pca_subset_seed_str) and (int(pca_subset_seed_str) >= -1):
+                        self.pca_subset_seed = int(pca_subset_seed_str)
+                    else:
+                        raise ValueError("Invalid value for pca_subset_seed in configuration.\n"
+                                         "pca_subset_seed must be a valid non-negative integer.\n"
+                                         "Alternatively, a value of -1 can be used for a random seed.")
+                if "pca_cache_intermediate_results" in runtime_config.benchmark:
+                    self.pca_cache_intermediate_results = config_str_to_bool(
+                        runtime_config.benchmark["pca_cache_intermediate_results"])
+                if "pca_n_alt_cache_enabled" in runtime_config.benchmark:
+                    self.pca_n_alt_cache_enabled = config_str_to_bool(
+                        runtime_config.benchmark["pca_n_alt_cache_enabled"])
+                if "pca_gram_enabled" in runtime_config.benchmark:
+                    self.pca_gram_enabled = config_str_to_bool(runtime_config.benchmark["pca_gram_enabled"])
+                if "pca_incremental_enabled" in runtime_config.benchmark:
+                    self.pca_incremental_enabled = config_str_to_bool(
+                        runtime_config.benchmark["pca_incremental_enabled"])
+                if "pca_solvers" in runtime_config.benchmark:
+                    pca_solvers = [solver.strip() for solver in runtime_config.benchmark["pca_solvers"].split(',')
+                                   if solver.strip() != '']
+                    for solver in pca_solvers:
+                        if solver not in pca_solver_types:
+                            raise ValueError("Invalid value for pca_solvers in configuration.\n"
+                                             "pca_solvers must be a comma-separated list of: {}".format(
+                                                 ', '.join(pca_solver_types)))
+                    self.pca_solvers = pca_solvers
+                if "pca_solver_oversamples" in runtime_config.benchmark:
+                    pca_solver_oversamples_str = runtime_config.benchmark["pca_solver_oversamples"]
+                    if isint(pca_solver_oversamples_str) and (int(pca_solver_oversamples_str) >= 0):
+                        self.pca_solver_oversamples = int(pca_solver_oversamples_str)
+                    else:
+                        raise ValueError("Invalid value for pca_solver_oversamples in configuration.\n"
+                                         "pca_solver_oversamples must be a valid integer greater than or equal to 0.")
+                if "pca_solver_power_iterations" in runtime_config.benchmark:
+                    pca_solver_power_iterations_str = runtime_config.benchmark["pca_solver_power_iterations"]
+                    if isint(pca_solver_power_iterations_str) and (int(pca_solver_power_iterations_str) >= 0):
+                        self.pca_solver_power_iterations = int(pca_solver_power_iterations_str)
+                    else:
+                        raise ValueError("Invalid value for pca_solver_power_iterations in configuration.\n"
+                                         "pca_solver_power_iterations must be a valid integer greater than or equal "
+                                         "to 0.")
+                if "pca_solver_exact_reference" in runtime_config.benchmark:
+                    self.pca_solver_exact_reference = config_str_to_bool(
+                        runtime_config.benchmark["pca_solver_exact_reference"])
                 if "pca_ld_enabled" in runtime_config.benchmark:
                     self.pca_ld_enabled = config_str_to_bool(runtime_config.benchmark["pca_ld_enabled"])
                 if "pca_ld_pruning_number_iterations" in runtime_config.benchmark:
@@ -410,6 +792,9 @@ class BenchmarkConfigurationRepresentation:
 
 class OutputConfigurationRepresentation:
     """ Utility class for object representation of the benchmark results output module's configuration. """
+    output_batch_size = 1000
+    output_flush_interval = 5.0
+
     output_csv_enabled = True
     output_csv_delimiter = '|'
 
@@ -429,6 +814,24 @@ class OutputConfigurationRepresentation:
         :type runtime_config: ConfigurationRepresentation
         """
         if runtime_config is not None:
+            # Check if settings exist for [output] section
+            if hasattr(runtime_config, 'output'):
+                config_output = runtime_config['output']
+                if 'batch_size' in config_output:
+                    batch_size_str = config_output['batch_size']
+                    if isint(batch_size_str) and int(batch_size_str) > 0:
+                        self.output_batch_size = int(batch_size_str)
+                    else:
+                        raise ValueError("Invalid value for batch_size in [output] configuration.\n"
+                                         "batch_size must be a valid integer greater than 0.")
+                if 'flush_interval' in config_output:
+                    flush_interval_str = config_output['flush_interval']
+                    if isfloat(flush_interval_str) and float(flush_interval_str) > 0:
+                        self.output_flush_interval = float(flush_interval_str)
+                    else:
+                        raise ValueError("Invalid value for flush_interval in [output] configuration.\n"
+                                         "flush_interval must be a number greater than 0.")
+
             # Check if settings exist for [output.csv] module
             if hasattr(runtime_config, 'output.csv'):
                 # Extract relevant settings from config file
@@ -477,7 +880,7 @@ def read_configuration(location):
 
 def generate_default_config_file(output_location, overwrite=False):
     # Get Default Config File Data as Package Resource
-    default_config_file_data = resource_string(__name__, 'config/benchmark.conf.default')
+    default_config_file_data = pkgutil.get_data(__name__, 'config/benchmark.conf.default')
 
     if overwrite is None:
         overwrite = False
@@ -6,26 +6,78 @@ import allel
 import zarr
 import datetime
 import time  # for benchmark timer
+import uuid
+import signal
+import resource
+import itertools
+import contextlib
+import multiprocessing
 import numpy as np
 import dask.array as da
+from dask.distributed import Client
 import os
 import pandas as pd
 from collections import OrderedDict
-from genben import config, data_service
+from genben import config, data_service, dask_diagnostics, dask_utils, kernels, ld, n_alt_cache, operations, pca, \
+    resources, stats
+from genben.cache import IntermediateResultCache
+from genben.results_sink import ResultsSink, ConnectionResultsSink
 from influxdb import InfluxDBClient
 
+# Nanosecond-resolution clocks (with fallbacks for Python versions before 3.7)
+perf_counter_ns = getattr(time, 'perf_counter_ns', lambda: int(time.perf_counter() * 1e9))
+process_time_ns = getattr(time, 'process_time_ns', lambda: int(time.process_time() * 1e9))
+
+# Status of a benchmark results entry. Failed isolated runs are recorded as a single entry with a failure status.
+RUN_STATUS_OK = 'ok'
+RUN_STATUS_OOM = 'oom'
+RUN_STATUS_TIMEOUT = 'timeout'
+RUN_STATUS_ERROR = 'error'
+
 
 class BenchmarkResultsData:
     run_number = None
     operation_name = None
     start_time = None
     exec_time = None
+    cpu_time = None
+    cpu_wall_ratio = None
+    cache_hits = 0
+    cache_memory_bytes = 0
+    peak_rss_bytes = None
+    tracemalloc_peak_bytes = None
+    io_read_bytes = None
+    io_write_bytes = None
+    voluntary_context_switches = None
+    involuntary_context_switches = None
+    span_id = None
+    parent_id = None
+    self_time = None
+    status = RUN_STATUS_OK
+    data_type = None  # Floating point type the operation computed in, if it selects one (e.g. PCA runs)
+    parameters = None  # Parameter values of a sweep point, by "<section>.<key>" name
 
     def to_dict(self):
         return OrderedDict([("log_timestamp", self.start_time),
                             ("run_number", self.run_number),
                             ("operation", self.operation_name),
-                            ("execution_time", self.exec_time)])
+                            ("execution_time", self.exec_time),
+                            ("cpu_time", self.cpu_time),
+                            ("cpu_wall_ratio", self.cpu_wall_ratio),
+                            ("cache_hits", self.cache_hits),
+                            ("cache_memory_bytes", self.cache_memory_bytes),
+                            ("peak_rss_bytes", self.peak_rss_bytes),
+                            ("tracemalloc_peak_bytes", self.tracemalloc_peak_bytes),
+                            ("io_read_bytes", self.io_read_bytes),
+                            ("io_write_bytes", self.io_write_bytes),
+                            ("voluntary_context_switches", self.voluntary_context_switches),
+                            ("involuntary_context_switches", self.involuntary_context_switches),
+                            ("span_id", self.span_id),
+                            ("parent_id", self.parent_id),
+                            ("self_time", self.self_time),
+                            ("status", self.status),
+                            ("data_type", self.data_type)] +
+                           (list(self.parameters.items()) if self.parameters is not None else []))
 
     def to_pandas(self):
         data = self.to_dict()
@@ -43,15 +95,14 @@ class BenchmarkResultsData:
             pd_results = self.to_pandas()
             pd_results.to_csv(psv_file, sep=delimiter, header=psv_header, index=False)
 
-    def to_influxdb(self, host='localhost', port=8086, username='root', password='root', db_name=None,
-                    benchmark_label=None, additional_tags=None):
-        influx_client = InfluxDBClient(host=host,
-                                       port=port,
-                                       username=username,
-                                       password=password,
-                                       database=db_name)
-
-        json_body = [{
+    def to_influxdb_point(self, benchmark_label=None, additional_tags=None):
+        """
+        Converts the results entry into an InfluxDB point.
+        :param benchmark_label: label of the benchmark, added as a tag
+        :param additional_tags: dict of additional tags
+        :return: dict in the JSON point format accepted by InfluxDBClient.write_points()
+        """
+        point = {
             'measurement': 'benchmark',
             'tags': {
                 'operation_name': self.operation_name,
@@ -60,178 +111,672 @@ class BenchmarkResultsData:
             'time': self.start_time,
             'fields': {
                 'run_number': self.run_number,
-                'execution_time': self.exec_time
+                'execution_time': self.exec_time,
+                'self_time': self.self_time,
+                'cpu_time': self.cpu_time,
+                'cpu_wall_ratio': self.cpu_wall_ratio,
+                'cache_hits': self.cache_hits,
+                'cache_memory_bytes': self.cache_memory_bytes,
+                # Span IDs are fields rather than tags, since they are unique per operation
+                'span_id': self.span_id,
+                'parent_id': self.parent_id if self.parent_id is not None else '',
+                'status': self.status
             }
-        }]
+        }
+
+        # Add resource usage fields which were measured (InfluxDB fields cannot be null)
+        for field in ['peak_rss_bytes', 'tracemalloc_peak_bytes', 'io_read_bytes', 'io_write_bytes',
+                      'voluntary_context_switches', 'involuntary_context_switches', 'data_type']:
+            value = getattr(self, field)
+            if value is not None:
+                point['fields'][field] = value
+
+        # Add sweep parameter values as tags, so results can be grouped by them
+        if self.parameters is not None:
+            point['tags'].update((name, str(value)) for name, value in self.parameters.items())
 
         # Add any additional tags if they were provided
         if additional_tags is not None:
             if type(additional_tags) is dict:
-                json_body[0]['tags'].update(additional_tags)
+                point['tags'].update(additional_tags)
             else:
                 raise TypeError('Additional tags should be within a dict object.')
 
+        return point
+
+    def to_influxdb(self, host='localhost', port=8086, username='root', password='root', db_name=None,
+                    benchmark_label=None, additional_tags=None):
+        influx_client = InfluxDBClient(host=host,
+                                       port=port,
+                                       username=username,
+                                       password=password,
+                                       database=db_name)
+
+        json_body = [self.to_influxdb_point(benchmark_label=benchmark_label, additional_tags=additional_tags)]
         return influx_client.write_points(json_body)
 
 
-class BenchmarkProfiler:
-    benchmark_running = False
+class BenchmarkSpan:
+    """ A running benchmark operation. Operations started while another is running are nested within it as child
+    spans, so that sub-steps roll up into the total time of their parent. """
 
-    def __init__(self, output_config, benchmark_label):
+    def __init__(self, operation_name, parent=None):
+        """
+        :param operation_name: name of the operation
+        :param parent: span of the enclosing operation, if any
+        :type operation_name: str
+        :type parent: BenchmarkSpan
+        """
+        self.operation_name = operation_name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.results = BenchmarkResultsData()
+        self.children_time = 0.0
+        self.cache = None
+        self.cache_hits_start = 0
+        self.resource_monitor = None
+        self.dask_diagnostics = None
+        self.perf_counter_start = 0
+        self.process_time_start = 0
+
+
+class BenchmarkProfilerSpan(contextlib.ContextDecorator):
+    """ Context manager (also usable as a function decorator) which times the enclosed code as an operation. """
+
+    def __init__(self, profiler, operation_name):
+        self.profiler = profiler
+        self.operation_name = operation_name
+
+    def __enter__(self):
+        self.profiler.start_benchmark(self.operation_name)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.profiler.end_benchmark()
+        return False
+
+
+class BenchmarkProfiler:
+    def __init__(self, output_config, benchmark_label, trace_allocations=False, dask_diagnostics=False,
+                 parameters=None):
+        """
+        :param output_config: results output configuration
+        :param benchmark_label: label to use when saving benchmark results
+        :param trace_allocations: whether to record the peak traced Python allocations of each operation
+        :param dask_diagnostics: whether to record Dask diagnostics (task stream, graph size, transfers, spilling) of
+                                 each operation
+        :param parameters: parameter values recorded with each result (e.g. of a parameter sweep point)
+        :type output_config: config.OutputConfigurationRepresentation
+        :type benchmark_label: str
+        :type trace_allocations: bool
+        :type dask_diagnostics: bool
+        :type parameters: OrderedDict
+        """
         self.results = BenchmarkResultsData()
         self.output_config = output_config
         self.benchmark_label = benchmark_label
+        self.trace_allocations = trace_allocations
+        self.dask_diagnostics = dask_diagnostics
+        self.parameters = parameters
+        self.results_sink = ResultsSink(output_config, benchmark_label)
+        self.run_number = None
+        self.cache = None
+        self.recording = True
+        self.samples = OrderedDict()  # Recorded execution times of each operation, by operation name
+        self._spans = []
+
+    @property
+    def benchmark_running(self):
+        """ Whether any operation is currently running. """
+        return len(self._spans) > 0
 
     def set_run_number(self, run_number):
         if not self.benchmark_running:
+            self.run_number = run_number
             self.results.run_number = run_number
 
+    def set_recording(self, recording):
+        """
+        Sets whether the results of operations are recorded. Operations which are not recorded (e.g. in warmup runs)
+        are still timed, but their results are neither written out nor included in the timing samples.
+        :param recording: whether to record results
+        :type recording: bool
+        """
+        self.recording = recording
+
+    def set_cache(self, cache):
+        """
+        Sets the intermediate result cache whose hits and memory usage are recorded with each operation started
+        from now on.
+        :param cache: cache to track, or None to stop tracking
+        :type cache: genben.cache.IntermediateResultCache
+        """
+        self.cache = cache
+
+    def span(self, operation_name):
+        """
+        Returns a context manager, also usable as a decorator, which times the enclosed code as an operation.
+        Spans (and start_benchmark() calls) can be nested; each recorded operation includes the ID of its parent.
+        :param operation_name: name of the operation
+        :type operation_name: str
+        """
+        return BenchmarkProfilerSpan(self, operation_name)
+
+    def set_data_type(self, data_type):
+        """
+        Records the floating point type the running operation computes in.
+        :param data_type: name of the floating point type (e.g. "float32")
+        :type data_type: str
+        """
+        if self.benchmark_running:
+            self._spans[-1].results.data_type = data_type
+
     def start_benchmark(self, operation_name):
-        if not self.benchmark_running:
-            print('Running benchmark: {}'.format(operation_name))
-            self.results.operation_name = operation_name
+        """
+        Starts timing an operation. If another operation is running, the new operation is nested within it.
+        :param operation_name: name of the operation
+        :type operation_name: str
+        """
+        parent = self._spans[-1] if self.benchmark_running else None
+        span = BenchmarkSpan(operation_name, parent=parent)
+        print('{}Running benchmark: {}'.format('  ' * span.depth, operation_name))
+
+        results = span.results
+        results.run_number = self.run_number
+        results.operation_name = operation_name
+        results.parameters = self.parameters
+        results.span_id = span.span_id
+        results.parent_id = parent.span_id if parent is not None else None
 
-            self.benchmark_running = True
+        span.cache = self.cache
+        span.cache_hits_start = self.cache.hits if self.cache is not None else 0
 
-            # Start the benchmark timer
-            self.results.start_time = datetime.datetime.utcnow()
+        # Record the wall-clock start time (used only to label the results)
+        results.start_time = datetime.datetime.utcnow()
+
+        # Start measuring resource usage
+        span.resource_monitor = resources.OperationResourceMonitor(
+            trace_allocations=self.trace_allocations,
+            parent=parent.resource_monitor if parent is not None else None)
+        span.resource_monitor.start()
+
+        # Start collecting Dask diagnostics
+        if self.dask_diagnostics:
+            span.dask_diagnostics = dask_diagnostics.OperationDaskDiagnostics(client=dask_diagnostics.current_client())
+            span.dask_diagnostics.start()
+
+        self._spans.append(span)
+
+        # Start the benchmark timers (monotonic wall time and CPU time of all threads in this process)
+        span.process_time_start = process_time_ns()
+        span.perf_counter_start = perf_counter_ns()
 
     def end_benchmark(self):
+        """
+        Ends timing the most recently started operation which is still running, and records its results.
+        """
         if self.benchmark_running:
-            end_time = datetime.datetime.utcnow()
+            perf_counter_end = perf_counter_ns()
+            process_time_end = process_time_ns()
 
-            print('  - Done.')
+            span = self._spans.pop()
+            results = span.results
 
-            # Calculate the execution time from start and end times
-            self.results.exec_time = (end_time - self.results.start_time).total_seconds()
+            print('{}  - Done.'.format('  ' * span.depth))
 
-            # Save benchmark results
-            self._record_runtime()
+            # Calculate the execution time and CPU time from the monotonic timers
+            results.exec_time = (perf_counter_end - span.perf_counter_start) / 1e9
+            results.cpu_time = (process_time_end - span.process_time_start) / 1e9
+            if results.exec_time > 0:
+                results.cpu_wall_ratio = results.cpu_time / results.exec_time
+            else:
+                results.cpu_wall_ratio = 0.0
+
+            # Self time excludes time spent in nested operations
+            results.self_time = max(results.exec_time - span.children_time, 0.0)
+            if span.parent is not None:
+                span.parent.children_time += results.exec_time
+
+            # Record resource usage for the operation
+            monitor = span.resource_monitor
+            monitor.stop()
+            results.peak_rss_bytes = monitor.peak_rss
+            results.tracemalloc_peak_bytes = monitor.tracemalloc_peak
+            results.io_read_bytes = monitor.io_read_bytes
+            results.io_write_bytes = monitor.io_write_bytes
+            results.voluntary_context_switches = monitor.voluntary_context_switches
+            results.involuntary_context_switches = monitor.involuntary_context_switches
+
+            # Record Dask diagnostics for the operation
+            if span.dask_diagnostics is not None:
+                span.dask_diagnostics.stop()
+
+            # Record intermediate result cache usage for the operation
+            if span.cache is not None:
+                results.cache_hits = span.cache.hits - span.cache_hits_start
+                results.cache_memory_bytes = span.cache.nbytes
+            else:
+                results.cache_hits = 0
+                results.cache_memory_bytes = 0
 
-            self.benchmark_running = False
+            # Save benchmark results
+            self.results = results
+            if self.recording:
+                self._record_runtime()
+                if span.dask_diagnostics is not None:
+                    self._record_dask_diagnostics(span.dask_diagnostics.summary)
 
     def get_benchmark_results(self):
         return self.results
 
-    def _record_runtime(self):
+    def get_timing_summary(self, confidence=0.95):
         """
-        Records the benchmark results data entry to the specified PSV file.
+        Summarizes the recorded execution times of each operation.
+        :param confidence: confidence level of the interval for the median
+        :return: OrderedDict mapping each operation name to its summary statistics (see stats.summarize())
         """
-        if self.output_config.output_csv_enabled:
-            self.results.to_csv(filename='{}.csv'.format(self.benchmark_label),
-                                delimiter=self.output_config.output_csv_delimiter)
+        return OrderedDict((operation_name, stats.summarize(samples, confidence))
+                           for operation_name, samples in self.samples.items())
 
-        if self.output_config.output_influxdb_enabled:
-            influxdb_additional_tags = {
-                'benchmark_group': self.output_config.output_influxdb_benchmark_group,
-                'device_name': self.output_config.output_influxdb_device_name
-            }
+    def record_metadata(self, metadata):
+        """
+        Writes metadata describing the benchmark environment to the configured outputs.
+        :param metadata: JSON-serializable dictionary of metadata sections
+        :type metadata: dict
+        """
+        self.results_sink.write_metadata(metadata)
 
-            self.results.to_influxdb(host=self.output_config.output_influxdb_host,
-                                     port=self.output_config.output_influxdb_port,
-                                     username=self.output_config.output_influxdb_username,
-                                     password=self.output_config.output_influxdb_password,
-                                     db_name=self.output_config.output_influxdb_database_name,
-                                     benchmark_label=self.benchmark_label,
-                                     additional_tags=influxdb_additional_tags)
+    def record_timing_summary(self, confidence=0.95):
+        """
+        Writes the summary of the recorded execution times of each operation to the configured outputs.
+        :param confidence: confidence level of the interval for the median
+        """
+        self.results_sink.write_summary(self.get_timing_summary(confidence), parameters=self.parameters)
+
+    def flush(self):
+        """
+        Writes all buffered benchmark results to the configured outputs.
+        """
+        self.results_sink.flush()
+
+    def close(self):
+        """
+        Writes all buffered benchmark results and releases output connections.
+        """
+        self.results_sink.close()
+
+    def record_results(self, results):
+        """
+        Records the results of an operation which was timed elsewhere (e.g. in an isolated subprocess).
+        :param results: results entry of a single operation
+        :type results: BenchmarkResultsData
+        """
+        self.results = results
+        self._record_runtime()
+
+    def record_failed_run(self, status, start_time, exec_time):
+        """
+        Records a run which failed (e.g. ran out of memory or timed out) as a single "Benchmark run" entry with the
+        given status. The entry is not included in the timing samples.
+        :param status: RUN_STATUS_OOM, RUN_STATUS_TIMEOUT or RUN_STATUS_ERROR
+        :param start_time: wall-clock start time of the run
+        :param exec_time: time until the run failed, in seconds
+        """
+        results = BenchmarkResultsData()
+        results.run_number = self.run_number
+        results.operation_name = 'Benchmark run'
+        results.start_time = start_time
+        results.exec_time = exec_time
+        results.status = status
+        results.parameters = self.parameters
+        self.results = results
+        if self.recording:
+            self.results_sink.add(results)
+
+    def _record_runtime(self):
+        """
+        Adds the benchmark results data entry to the results sink, which writes it to the configured outputs in
+        the background.
+        """
+        self.samples.setdefault(self.results.operation_name, []).append(self.results.exec_time)
+        self.results_sink.add(self.results)
+
+    def _record_dask_diagnostics(self, summary):
+        """
+        Adds the Dask diagnostics of the current operation to the results sink, linked to its results by run number,
+        operation name and span ID.
+        """
+        diagnostics = OrderedDict([('run_number', self.results.run_number),
+                                   ('operation', self.results.operation_name),
+                                   ('span_id', self.results.span_id)])
+        diagnostics.update(summary)
+        self.results_sink.add_diagnostics(diagnostics)
+
+
+def _isolated_benchmark_run(bench_conf, data_dirs, benchmark_label, parameters, run_number, recording,
+                            memory_limit, dask_scheduler_address, connection):
+    """
+    Executes a single benchmark run in a subprocess (see Benchmark._benchmark_run_isolated()), sending results and
+    the outcome of the run to the parent process through the given connection.
+    :param memory_limit: limit of the address space of the subprocess in bytes (RLIMIT_AS), or 0 for no limit
+    :param dask_scheduler_address: address of the Dask scheduler to connect to, or None to use the local scheduler
+    :param connection: sending end of a multiprocessing pipe
+    """
+    original_memory_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, original_memory_limit[1]))
+
+    client = None
+    try:
+        if dask_scheduler_address is not None:
+            client = Client(dask_scheduler_address)
+        benchmark = Benchmark(bench_conf=bench_conf, data_dirs=data_dirs, benchmark_label=benchmark_label,
+                              parameters=parameters)
+        benchmark.benchmark_profiler.results_sink = ConnectionResultsSink(connection)
+        benchmark.benchmark_profiler.set_run_number(run_number)
+        benchmark.benchmark_profiler.set_recording(recording)
+        benchmark._benchmark_run()
+        connection.send(('done', benchmark.genotype_array_shape))
+    except SystemExit as e:
+        connection.send(('failed', (RUN_STATUS_ERROR, 'exited with status {}'.format(e.code))))
+    except Exception as e:
+        # Lift the memory limit, so that the failure can be reported
+        resource.setrlimit(resource.RLIMIT_AS, original_memory_limit)
+
+        # Under an address space limit, running out of memory also shows as a failure to start a thread (whose stack
+        # cannot be allocated)
+        out_of_memory = isinstance(e, MemoryError) or (memory_limit > 0 and isinstance(e, RuntimeError) and
+                                                       "can't start new thread" in str(e))
+        status = RUN_STATUS_OOM if out_of_memory else RUN_STATUS_ERROR
+        connection.send(('failed', (status, '{}: {}'.format(type(e).__name__, e))))
+    finally:
+        if client is not None:
+            client.close()
+        connection.close()
 
 
 class Benchmark:
     benchmark_zarr_dir = ""  # Directory for which to use data from for benchmark process
     benchmark_zarr_file = ""  # File within benchmark_zarr_dir for which to use for benchmark process
+    benchmark_source_paths = []  # Source data (VCF file or Zarr data sets) of the benchmark process
+    genotype_array_shape = None  # Shape of the genotype array used by the last benchmark run
 
-    def __init__(self, bench_conf, data_dirs, benchmark_label):
+    def __init__(self, bench_conf, data_dirs, benchmark_label, dask_cluster_parameters=None, parameters=None):
         """
         Sets up a Benchmark object which is used to execute benchmarks.
         :param bench_conf: Benchmark configuration data that controls the benchmark execution
         :param data_dirs: DataDirectoriesConfigurationRepresentation object that contains working data directories
         :param benchmark_label: label to use when saving benchmark results to file
+        :param dask_cluster_parameters: parameters of the Dask cluster used by the benchmark, recorded with the results
+        :param parameters: parameter values to tag each result with (e.g. of a parameter sweep point)
         :type bench_conf: config.BenchmarkConfigurationRepresentation
         :type data_dirs: config.DataDirectoriesConfigurationRepresentation
         :type benchmark_label: str
+        :type dask_cluster_parameters: dict
+        :type parameters: OrderedDict
         """
         self.bench_conf = bench_conf
         self.data_dirs = data_dirs
         self.benchmark_label = benchmark_label
+        self.dask_cluster_parameters = dask_cluster_parameters
 
         self.benchmark_profiler = BenchmarkProfiler(output_config=self.bench_conf.results_output_config,
-                                                    benchmark_label=self.benchmark_label)
+                                                    benchmark_label=self.benchmark_label,
+                                                    trace_allocations=self.bench_conf.benchmark_trace_allocations,
+                                                    dask_diagnostics=self.bench_conf.benchmark_dask_diagnostics,
+                                                    parameters=parameters)
+
+        # Select the operations to run (benchmark_aggregations selects the simple aggregations)
+        selectors = list(self.bench_conf.benchmark_operations)
+        if self.bench_conf.benchmark_aggregations:
+            selectors.append('aggregations')
+        try:
+            operations.import_operation_modules(self.bench_conf.benchmark_operation_modules)
+            self.operations = operations.select_operations(selectors)
+        except ValueError as e:
+            print('[Exec] Error: {}'.format(e))
+            exit(1)
 
     def run_benchmark(self):
         """
         Executes the benchmarking process.
         """
         if self.bench_conf is not None and self.data_dirs is not None:
-            for run_number in range(1, self.bench_conf.benchmark_number_runs + 1):
-                # Clear out existing files in Zarr benchmark directory
-                # (Should be done every single run)
-                data_service.remove_directory_tree(self.data_dirs.zarr_dir_benchmark)
+            if self.bench_conf.compute_engine == config.COMPUTE_ENGINE_NUMBA and not kernels.numba_available():
+                print('[Exec] Error: compute_engine is set to use Numba, but the numba package is not installed.')
+                exit(1)
+            if self.bench_conf.compute_engine == config.COMPUTE_ENGINE_NUMBA and \
+                    self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_PACKED:
+                print('[Exec] Error: The Numba compute engine does not support packed genotype arrays.')
+                print('  - Packed genotype arrays use their own bitwise counting kernels.')
+                exit(1)
+
+            # Record the Dask cluster used for this benchmark
+            if self.dask_cluster_parameters is not None:
+                self.benchmark_profiler.record_metadata(OrderedDict([('dask_cluster', self.dask_cluster_parameters)]))
+
+            # Warmup runs (results are not recorded)
+            self.benchmark_profiler.set_recording(False)
+            for warmup_number in range(1, self.bench_conf.benchmark_warmup_runs + 1):
+                print('[Exec] Warmup run {} of {}'.format(warmup_number, self.bench_conf.benchmark_warmup_runs))
+                self._execute_run()
+            self.benchmark_profiler.set_recording(True)
+
+            # Measured runs
+            runs_start_time = time.perf_counter()
+            run_number = 0
+            while True:
+                run_number += 1
 
                 # Update run number in benchmark profiler (for results tracking)
                 self.benchmark_profiler.set_run_number(run_number)
 
-                # Prepare data directory and file locations for benchmarks
-                if self.bench_conf.benchmark_data_input == "vcf":
-                    # Ensure user didn't attempt to use concatenation along with vcf data input mode
-                    if self.bench_conf.benchmark_dataset == '*':
-                        print(
-                            '[Exec] Error: benchmark_dataset has a value of *, which cannot be used with VCF to Zarr conversion.')
-                        print('  - Please disable concatenation and specify a single data set to work with.')
-                        print(
-                            '  - Alternatively, benchmark_data_input can be set to zarr so that concatenation can be used.')
-                        exit(1)
+                self._execute_run()
 
-                    # Convert VCF data to Zarr format as part of benchmark
-                    self._benchmark_convert_to_zarr()
+                # Write the results of this run (outside of any timed operation) before starting the next one
+                self.benchmark_profiler.flush()
 
-                elif self.bench_conf.benchmark_data_input == "zarr":
-                    # Use pre-converted Zarr data which was done ahead of benchmark (i.e. in Setup mode)
-                    self.benchmark_zarr_dir = self.data_dirs.zarr_dir_setup
-                    self.benchmark_zarr_file = self.bench_conf.benchmark_dataset
+                if not self._continue_runs(run_number, time.perf_counter() - runs_start_time):
+                    break
 
-                else:
-                    print("[Exec] Error: Invalid option supplied for benchmark data input format.")
-                    print("  - Expected data input formats: vcf, zarr")
-                    print("  - Provided data input format: {}".format(self.bench_conf.benchmark_data_input))
-                    exit(1)
+            # Record the number of samples and dispersion of each operation's execution times
+            self.benchmark_profiler.record_timing_summary()
 
-                callsets = []
+            # Write any remaining results and release output connections
+            self.benchmark_profiler.close()
 
-                # Ensure Zarr dataset exists and can be used for upcoming benchmarks
-                benchmark_zarr_path = os.path.join(self.benchmark_zarr_dir, self.benchmark_zarr_file)
-                if self.benchmark_zarr_file == '*':
-                    # User specified concatenation mode. Get all available datasets
-                    zarr_datasets = os.listdir(self.benchmark_zarr_dir)
-                    if len(zarr_datasets) == 0:
-                        print('[Exec] Error: No zarr data sets could be found for concatenation.')
-                        exit(1)
+    def _execute_run(self):
+        """
+        Executes a single run of all enabled benchmarks, in this process or, in isolation mode, in a subprocess.
+        """
+        if self.bench_conf.benchmark_isolation_enabled:
+            self._benchmark_run_isolated()
+        else:
+            self._benchmark_run()
+
+    def _benchmark_run_isolated(self):
+        """
+        Executes a single run of all enabled benchmarks in a fresh subprocess, with the configured memory limit and
+        timeout. Results are received from the subprocess as they are recorded; if the run fails, the failure is
+        recorded as a results entry instead of ending the benchmark.
+        """
+        # The subprocess connects to the same Dask scheduler, unless it is only reachable from within this process
+        client = dask_diagnostics.current_client()
+        dask_scheduler_address = client.scheduler.address if client is not None else None
+        if dask_scheduler_address is not None and dask_scheduler_address.startswith('inproc://'):
+            print('[Exec] Warning: Isolated runs cannot connect to an in-process Dask cluster; '
+                  'the local scheduler is used instead.')
+            dask_scheduler_address = None
+
+        context = multiprocessing.get_context('spawn')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_isolated_benchmark_run,
+                                  args=(self.bench_conf, self.data_dirs, self.benchmark_label,
+                                        self.benchmark_profiler.parameters, self.benchmark_profiler.run_number,
+                                        self.benchmark_profiler.recording,
+                                        self.bench_conf.benchmark_isolation_memory_limit,
+                                        dask_scheduler_address, sender),
+                                  name='genben-isolated-run')
+
+        start_time = datetime.datetime.utcnow()
+        perf_counter_start = time.perf_counter()
+        process.start()
+        sender.close()
+
+        timeout = self.bench_conf.benchmark_isolation_timeout
+        status = None
+        message = None
+        while status is None:
+            elapsed_time = time.perf_counter() - perf_counter_start
+            if timeout > 0 and elapsed_time >= timeout:
+                # Process.kill() is not available before Python 3.7
+                os.kill(process.pid, signal.SIGKILL)
+                status, message = RUN_STATUS_TIMEOUT, 'timed out after {:.1f} seconds'.format(timeout)
+            elif receiver.poll(min(timeout - elapsed_time, 1.0) if timeout > 0 else 1.0):
+                try:
+                    kind, payload = receiver.recv()
+                except EOFError:
+                    # The subprocess ended without reporting (e.g. it was killed by the out-of-memory killer)
+                    process.join()
+                    if process.exitcode == -signal.SIGKILL:
+                        status = RUN_STATUS_OOM
                     else:
-                        zarr_paths = []
-                        for zarr_dataset in zarr_datasets:
-                            zarr_paths.append(os.path.join(self.benchmark_zarr_dir, zarr_dataset))
-
-                        callsets = self._benchmark_load_zarr_datasets(zarr_paths)
-                elif (benchmark_zarr_path != "") and (os.path.isdir(benchmark_zarr_path)):
-                    # Load Zarr dataset into memory
-                    callsets = self._benchmark_load_zarr_datasets([benchmark_zarr_path])
+                        status = RUN_STATUS_ERROR
+                    message = 'subprocess exited with code {}'.format(process.exitcode)
+                    continue
+                if kind == 'results':
+                    self.benchmark_profiler.record_results(payload)
+                elif kind == 'diagnostics':
+                    self.benchmark_profiler.results_sink.add_diagnostics(payload)
+                elif kind == 'done':
+                    status = RUN_STATUS_OK
+                    self.genotype_array_shape = payload
                 else:
-                    # Zarr dataset doesn't exist. Print error message and exit
-                    print("[Exec] Error: Zarr dataset could not be found for benchmarking.")
-                    print("  - Zarr dataset location: {}".format(benchmark_zarr_path))
-                    exit(1)
+                    status, message = payload
+        exec_time = time.perf_counter() - perf_counter_start
+        process.join()
+        receiver.close()
 
-                # Create genotype data from data set
-                num_variants = self.bench_conf.benchmark_num_variants
-                num_samples = self.bench_conf.benchmark_num_samples
-                gt = self._benchmark_create_genotype_array(callsets, num_variants, num_samples)
+        if status != RUN_STATUS_OK:
+            print('[Exec] Error: Benchmark run failed ({}): {}'.format(status, message))
+            self.benchmark_profiler.record_failed_run(status, start_time, exec_time)
 
-                if self.bench_conf.benchmark_aggregations:
-                    # Run simple aggregations benchmark
-                    self._benchmark_simple_aggregations(gt)
+    def _benchmark_run(self):
+        """
+        Executes a single run of all enabled benchmarks.
+        """
+        # Clear out existing files in Zarr benchmark directory
+        # (Should be done every single run)
+        data_service.remove_directory_tree(self.data_dirs.zarr_dir_benchmark)
+
+        # Prepare data directory and file locations for benchmarks
+        if self.bench_conf.benchmark_data_input == "vcf":
+            # Ensure user didn't attempt to use concatenation along with vcf data input mode
+            if self.bench_conf.benchmark_dataset == '*':
+                print(
+                    '[Exec] Error: benchmark_dataset has a value of *, which cannot be used with VCF to Zarr conversion.')
+                print('  - Please disable concatenation and specify a single data set to work with.')
+                print(
+                    '  - Alternatively, benchmark_data_input can be set to zarr so that concatenation can be used.')
+                exit(1)
+
+            # Convert VCF data to Zarr format as part of benchmark
+            self._benchmark_convert_to_zarr()
+
+        elif self.bench_conf.benchmark_data_input == "zarr":
+            # Use pre-converted Zarr data which was done ahead of benchmark (i.e. in Setup mode)
+            self.benchmark_zarr_dir = self.data_dirs.zarr_dir_setup
+            self.benchmark_zarr_file = self.bench_conf.benchmark_dataset
+
+        else:
+            print("[Exec] Error: Invalid option supplied for benchmark data input format.")
+            print("  - Expected data input formats: vcf, zarr")
+            print("  - Provided data input format: {}".format(self.bench_conf.benchmark_data_input))
+            exit(1)
+
+        callsets = []
+
+        # Ensure Zarr dataset exists and can be used for upcoming benchmarks
+        benchmark_zarr_path = os.path.join(self.benchmark_zarr_dir, self.benchmark_zarr_file)
+        if self.benchmark_zarr_file == '*':
+            # User specified concatenation mode. Get all available datasets
+            zarr_datasets = os.listdir(self.benchmark_zarr_dir)
+            if len(zarr_datasets) == 0:
+                print('[Exec] Error: No zarr data sets could be found for concatenation.')
+                exit(1)
+            else:
+                zarr_paths = []
+                for zarr_dataset in zarr_datasets:
+                    zarr_paths.append(os.path.join(self.benchmark_zarr_dir, zarr_dataset))
+
+                callsets = self._benchmark_load_zarr_datasets(zarr_paths)
+                if self.bench_conf.benchmark_data_input == "zarr":
+                    self.benchmark_source_paths = zarr_paths
+        elif (benchmark_zarr_path != "") and (os.path.isdir(benchmark_zarr_path)):
+            # Load Zarr dataset into memory
+            callsets = self._benchmark_load_zarr_datasets([benchmark_zarr_path])
+            if self.bench_conf.benchmark_data_input == "zarr":
+                self.benchmark_source_paths = [benchmark_zarr_path]
+        else:
+            # Zarr dataset doesn't exist. Print error message and exit
+            print("[Exec] Error: Zarr dataset could not be found for benchmarking.")
+            print("  - Zarr dataset location: {}".format(benchmark_zarr_path))
+            exit(1)
 
-                if self.bench_conf.benchmark_pca:
-                    # Run PCA benchmark
-                    self._benchmark_pca(gt)
+        # Create genotype data from data set
+        num_variants = self.bench_conf.benchmark_num_variants
+        num_samples = self.bench_conf.benchmark_num_samples
+        gt = self._benchmark_create_genotype_array(callsets, num_variants, num_samples)
+
+        # Run the selected operations (consecutive operations of a group are nested within a total for the group)
+        operation_inputs = {'gt': gt}
+        for group, group_operations in itertools.groupby(self.operations, key=lambda operation: operation.group):
+            if group is not None:
+                with self.benchmark_profiler.span(group):
+                    for operation in group_operations:
+                        self._benchmark_operation(operation, operation_inputs, callsets)
+            else:
+                for operation in group_operations:
+                    self._benchmark_operation(operation, operation_inputs, callsets)
+        del operation_inputs
+
+        if self.bench_conf.benchmark_pca:
+            # Run PCA benchmark
+            with self.benchmark_profiler.span('PCA'):
+                self._benchmark_pca(gt)
+
+    def _continue_runs(self, run_number, elapsed_time):
+        """
+        Determines whether to start another measured run. With a fixed number of runs, this is the case until
+        benchmark_number_runs runs are complete. In adaptive mode, benchmark_number_runs is the minimum; runs continue
+        until the confidence interval of every operation's median execution time is narrower than the target, or the
+        maximum number of runs or the time budget is reached.
+        :param run_number: number of measured runs completed so far
+        :param elapsed_time: time spent on measured runs so far, in seconds
+        :return: bool
+        """
+        if run_number < self.bench_conf.benchmark_number_runs:
+            return True
+        if not self.bench_conf.benchmark_adaptive_enabled:
+            return False
+
+        if run_number >= self.bench_conf.benchmark_adaptive_max_runs:
+            print('[Exec] Adaptive mode: Maximum number of runs ({}) reached.'.format(run_number))
+            return False
+        if elapsed_time >= self.bench_conf.benchmark_adaptive_time_budget:
+            print('[Exec] Adaptive mode: Time budget used up after {} runs.'.format(run_number))
+            return False
+
+        ci_target = self.bench_conf.benchmark_adaptive_ci_target
+        unstable = [operation_name for operation_name, samples in self.benchmark_profiler.samples.items()
+                    if stats.relative_ci_half_width(samples) > ci_target]
+        if len(unstable) == 0:
+            print('[Exec] Adaptive mode: Timings of all operations are stable after {} runs.'.format(run_number))
+            return False
+        print('[Exec] Adaptive mode: {} operation(s) have not reached the confidence interval target.'.format(
+            len(unstable)))
+        return True
 
     def _benchmark_convert_to_zarr(self):
         self.benchmark_zarr_dir = self.data_dirs.zarr_dir_benchmark
@@ -239,17 +784,21 @@ class Benchmark:
         input_vcf_path = os.path.join(self.data_dirs.vcf_dir, input_vcf_file)
 
         if os.path.isfile(input_vcf_path):
+            # Truncate *.vcf (or *.vcf.gz) from input filename
             output_zarr_file = input_vcf_file
-            output_zarr_file = output_zarr_file[
-                               0:len(output_zarr_file) - 4]  # Truncate *.vcf from input filename
+            if output_zarr_file.endswith('.gz'):
+                output_zarr_file = output_zarr_file[0:len(output_zarr_file) - 3]
+            output_zarr_file = output_zarr_file[0:len(output_zarr_file) - 4]
             output_zarr_path = os.path.join(self.data_dirs.zarr_dir_benchmark, output_zarr_file)
 
-            data_service.convert_to_zarr(input_vcf_path=input_vcf_path,
-                                         output_zarr_path=output_zarr_path,
-                                         conversion_config=self.bench_conf.vcf_to_zarr_config,
-                                         benchmark_profiler=self.benchmark_profiler)
+            with self.benchmark_profiler.span('VCF to Zarr conversion'):
+                data_service.convert_to_zarr(input_vcf_path=input_vcf_path,
+                                             output_zarr_path=output_zarr_path,
+                                             conversion_config=self.bench_conf.vcf_to_zarr_config,
+                                             benchmark_profiler=self.benchmark_profiler)
 
             self.benchmark_zarr_file = output_zarr_file
+            self.benchmark_source_paths = [input_vcf_path]
         else:
             print("[Exec] Error: Dataset specified in configuration file does not exist. Exiting...")
             print("  - Dataset file specified in configuration: {}".format(input_vcf_file))
@@ -274,6 +823,12 @@ class Benchmark:
         gt = data_service.get_genotype_array_concat(callsets=callsets, genotype_array_type=genotype_array_type)
         self.benchmark_profiler.end_benchmark()
 
+        if genotype_array_type == config.GENOTYPE_ARRAY_PACKED:
+            print('[Exec][Create Genotype Array] Packed genotype data uses {} bytes ({} bytes unpacked).'.format(
+                gt.nbytes, gt.nbytes_unpacked))
+            print('[Exec][Create Genotype Array] {} variants are stored unpacked (multiallelic or partially '
+                  'missing calls).'.format(len(gt.fallback_index)))
+
         # If the number of variants or samples were specified, limit the genotype data returned
         if num_variants is not None and num_variants != -1:
             print('[Exec][Create Genotype Array] Limiting number of variants to {}.'.format(num_variants))
@@ -311,85 +866,273 @@ class Benchmark:
                 print('[Exec][Create Genotype Array] Rechunking data to size {}.'.format(new_chunk_size))
                 gt = gt.rechunk(new_chunk_size)
 
+        self.genotype_array_shape = tuple(gt.shape)
         return gt
 
-    def _benchmark_simple_aggregations(self, gt):
-        # Run benchmark for allele count
-        benchmark_allele_count_name = "Allele Count (All Samples)"
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_allele_count_name)
-            gt.count_alleles().compute()
-        else:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_allele_count_name)
-            gt.count_alleles()
-        self.benchmark_profiler.end_benchmark()
+    def _materialize(self, result):
+        """
+        Computes the result of an operation if it is Dask-backed; otherwise returns the result unchanged.
+        """
+        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK and hasattr(result, 'compute'):
+            return result.compute()
+        return result
 
-        # Run benchmark for genotype count (heterozygous per variant)
-        benchmark_gt_count_het_per_var_name = "Genotype Count: Heterozygous per Variant"
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_het_per_var_name)
-            gt.count_het(axis=1).compute()
-        else:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_het_per_var_name)
-            gt.count_het(axis=1)
-        self.benchmark_profiler.end_benchmark()
+    def _cross_check(self, operation_name, result, expected):
+        """
+        Compares the result of a Numba kernel against the equivalent scikit-allel output, if cross-checking is
+        enabled. Exits if the results differ.
+        :param operation_name: name of the operation being checked
+        :param result: result produced by the Numba kernel
+        :param expected: callable returning the equivalent scikit-allel result
+        """
+        if not self.bench_conf.compute_engine_cross_check:
+            return
+
+        result = np.asarray(self._materialize(result))
+        expected = np.asarray(self._materialize(expected()))
+        if result.shape != expected.shape or not np.array_equal(result, expected):
+            print('[Exec][Numba] Error: result of operation "{}" does not match scikit-allel output.'.format(
+                operation_name))
+            exit(1)
+        print('  - Cross-check against scikit-allel passed.')
 
-        # Run benchmark for genotype count (homozygous per variant)
-        benchmark_gt_count_hom_per_var_name = "Genotype Count: Homozygous per Variant"
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_hom_per_var_name)
-            gt.count_hom(axis=1).compute()
-        else:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_hom_per_var_name)
-            gt.count_hom(axis=1)
+    def _benchmark_operation(self, operation, inputs, callsets):
+        """
+        Runs a single registered operation: prepares its inputs, then times the operation and the materialization
+        of its result. With the Numba compute engine, the operation's kernel is used if it has one.
+        :param operation: the operation
+        :param inputs: inputs prepared so far in this run, by name; updated with the inputs prepared for the operation
+        :param callsets: callsets the genotype array was created from
+        :type operation: operations.Operation
+        :type inputs: dict
+        """
+        implementation = operation.implementation(self.bench_conf.genotype_array_type)
+        use_kernel = self.bench_conf.compute_engine == config.COMPUTE_ENGINE_NUMBA and operation.kernel is not None
+        if implementation is None and not use_kernel:
+            print('[Exec] Warning: Operation "{}" is not available for the selected genotype array type. '
+                  'Skipping...'.format(operation.name))
+            return
+
+        arguments = OrderedDict((name, self._operation_input(name, inputs, callsets)) for name in operation.inputs)
+
+        self.benchmark_profiler.start_benchmark(operation_name=operation.name)
+        result = self._materialize((operation.kernel if use_kernel else implementation)(**arguments))
         self.benchmark_profiler.end_benchmark()
 
-        # Run benchmark for genotype count (heterozygous per sample)
-        benchmark_gt_count_het_per_sample = "Genotype Count: Heterozygous per Sample"
+        if use_kernel and implementation is not None:
+            self._cross_check(operation.name, result, lambda: implementation(**arguments))
+        del result
+
+    def _operation_input(self, name, inputs, callsets):
+        """
+        Returns an input of the registered operations, preparing it (as a separately timed operation) if it has not
+        been prepared in this run yet.
+        :param name: name of the input, from operations.OPERATION_INPUTS
+        :param inputs: inputs prepared so far in this run, by name, including the genotype array ("gt")
+        :param callsets: callsets the genotype array was created from
+        """
+        if name in inputs:
+            return inputs[name]
+
+        gt = inputs['gt']
+        use_kernels = self.bench_conf.compute_engine == config.COMPUTE_ENGINE_NUMBA
+        with self.benchmark_profiler.span('Prepare Input: {}'.format(operations.OPERATION_INPUTS[name])):
+            if name == 'ac':
+                value = allel.AlleleCountsArray(
+                    self._materialize(kernels.count_alleles(gt) if use_kernels else gt.count_alleles()))
+            elif name == 'gn':
+                value = kernels.to_n_alt(gt) if use_kernels else gt.to_n_alt()
+                if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
+                    # Keep the (large) input chunked, in memory, so that operations using it remain parallel
+                    value = value.persist()
+            else:
+                positions = []
+                for callset in callsets:
+                    if 'variants' not in callset or 'POS' not in callset['variants']:
+                        print('[Exec] Error: Variant positions (variants/POS) are missing from the dataset.')
+                        exit(1)
+                    positions.append(callset['variants']['POS'][:])
+                value = np.concatenate(positions)[:gt.shape[0]]
+        inputs[name] = value
+        return value
+
+    def _benchmark_pca(self, gt):
+        # Set up cache for intermediate results shared between PCA stages
+        cache = IntermediateResultCache(enabled=self.bench_conf.pca_cache_intermediate_results)
+        self.benchmark_profiler.set_cache(cache)
+
+        # Load the PCA input from the on-disk alt allele count cache, or prepare it from the genotype data
+        gnu = None
+        alt_count_cache = n_alt_cache.NAltMatrixCache(self.data_dirs.cache_dir)
+        n_alt_cache_params = self._pca_n_alt_cache_params(gt) if self.bench_conf.pca_n_alt_cache_enabled else None
+        if n_alt_cache_params is not None:
+            n_alt_cache_key = n_alt_cache.cache_key(n_alt_cache_params)
+            if n_alt_cache_key in alt_count_cache:
+                self.benchmark_profiler.start_benchmark('PCA: Load transformed genotype data from cache')
+                gnu = alt_count_cache.load(n_alt_cache_key, self.bench_conf.genotype_array_type)
+                self.benchmark_profiler.end_benchmark()
+                print('[Exec][PCA] Loaded {} variants from alt allele count cache entry {}.'.format(gnu.shape[0],
+                                                                                                   n_alt_cache_key))
+        elif self.bench_conf.pca_n_alt_cache_enabled:
+            print('[Exec][PCA] A random subset seed is used (pca_subset_seed = -1), so the alt allele count cache '
+                  'cannot be used.')
+
+        if gnu is None:
+            with self.benchmark_profiler.span('PCA: Prepare input'):
+                gnu = self._pca_prepare_input(gt, cache)
+
+            if n_alt_cache_params is not None:
+                # Store the PCA input, then read it back so this run uses the same input as later runs
+                self.benchmark_profiler.start_benchmark('PCA: Store transformed genotype data in cache')
+                alt_count_cache.store(n_alt_cache_key, gnu, params=n_alt_cache_params,
+                                      chunk_length=self._chunk_length(gt))
+                gnu = alt_count_cache.load(n_alt_cache_key, self.bench_conf.genotype_array_type)
+                self.benchmark_profiler.end_benchmark()
+
+        if cache.enabled:
+            # Persist the PCA input so that both PCA runs reuse it instead of recomputing it from raw genotypes
+            self.benchmark_profiler.start_benchmark('PCA: Persist intermediate results')
+            gnu_unpersisted = gnu
+            gnu = cache.get('gnu', lambda: gnu_unpersisted)
+            del gnu_unpersisted
+            self.benchmark_profiler.end_benchmark()
+
+        # Run PCA analysis
+        pca_num_components = self.bench_conf.pca_number_components
+        scaler = self.bench_conf.pca_data_scaler
+
         if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_het_per_sample)
-            gt.count_het(axis=0).compute()
+            # Rechunk Dask array to work with Dask's svd function (single chunk for transposed column)
+            gnu_pca_conv = gnu.rechunk({0: -1, 1: gt.values.chunksize[1]})
         else:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_count_het_per_sample)
-            gt.count_het(axis=0)
-        self.benchmark_profiler.end_benchmark()
+            gnu_pca_conv = gnu
+
+        # scikit-allel's scalers cast integer input to float16, so single precision would double its input
+        allel_dtype = gnu.dtype.name if gnu.dtype.kind == 'f' else 'float16'
+        if self.bench_conf.pca_data_precision == \
+                config.benchmark_pca_data_precision_types[config.PCA_DATA_PRECISION_FLOAT32]:
+            print('[Exec][PCA] Warning: scikit-allel\'s PCA runs compute in their default precision ({}), '
+                  'since single precision would increase their memory use.'.format(allel_dtype))
+
+        # Run conventional PCA analysis
+        scaler_name = scaler if scaler is not None else 'none'
+        self._run_pca('PCA: Run conventional PCA analysis (scaler: {})'.format(scaler_name),
+                      lambda dtype: allel.pca(self._pca_input(gnu_pca_conv, dtype), n_components=pca_num_components,
+                                              scaler=scaler, copy=dtype is None),
+                      default_dtype=allel_dtype, single_precision=False)
+        del gnu_pca_conv
 
-        # Run benchmark for genotype count (homozygous per sample)
-        benchmark_gt_hom_per_sample = "Genotype Count: Homozygous per Sample"
         if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_hom_per_sample)
-            gt.count_hom(axis=0).compute()
+            # Rechunk Dask array to match original genotype chunk size
+            gnu_pca_rand = gnu.rechunk((gt.values.chunksize[0], gt.values.chunksize[1]))
         else:
-            self.benchmark_profiler.start_benchmark(operation_name=benchmark_gt_hom_per_sample)
-            gt.count_hom(axis=0)
-        self.benchmark_profiler.end_benchmark()
+            gnu_pca_rand = gnu
+
+        # Run randomized PCA analysis
+        # (A fixed random state is used so that the single and double precision runs can be compared)
+        self._run_pca('PCA: Run randomized PCA analysis (scaler: {})'.format(scaler_name),
+                      lambda dtype: allel.randomized_pca(self._pca_input(gnu_pca_rand, dtype),
+                                                         n_components=pca_num_components, scaler=scaler,
+                                                         copy=dtype is None, random_state=0),
+                      default_dtype=allel_dtype, single_precision=False)
+        del gnu_pca_rand
+
+        if self.bench_conf.pca_gram_enabled:
+            # Run out-of-core Gram-matrix PCA analysis (streams variant blocks; no rechunking required)
+            self._run_pca('PCA: Run Gram-matrix PCA analysis (scaler: {})'.format(scaler_name),
+                          lambda dtype: pca.gram_pca(gnu, n_components=pca_num_components, scaler=scaler,
+                                                     dtype=dtype if dtype is not None else np.float64))
+
+        if self.bench_conf.pca_incremental_enabled:
+            # Run incremental PCA analysis (consumes one block of variants at a time; bounded memory)
+            self._run_pca('PCA: Run incremental PCA analysis (scaler: {})'.format(scaler_name),
+                          lambda dtype: pca.incremental_pca(gnu, n_components=pca_num_components, scaler=scaler,
+                                                            dtype=dtype if dtype is not None else np.float64))
+
+        if len(self.bench_conf.pca_solvers) > 0:
+            # Run selected truncated SVD solvers
+            models = OrderedDict()
+            for solver in self.bench_conf.pca_solvers:
+                models[solver] = self._run_pca(
+                    'PCA: Run {} solver PCA analysis (scaler: {})'.format(solver, scaler_name),
+                    lambda dtype: pca.solver_pca(gnu, n_components=pca_num_components, scaler=scaler, solver=solver,
+                                                 n_oversamples=self.bench_conf.pca_solver_oversamples,
+                                                 n_iter=self.bench_conf.pca_solver_power_iterations,
+                                                 dtype=dtype if dtype is not None else np.float64))
+
+            if self.bench_conf.pca_solver_exact_reference:
+                # Compare explained variance against the exact solution (computed untimed, unless the exact solver
+                # was one of the selected solvers)
+                model_exact = models.get('exact')
+                if model_exact is None:
+                    _, model_exact = pca.solver_pca(gnu, n_components=pca_num_components, scaler=scaler,
+                                                    solver='exact')
+                for solver, model in models.items():
+                    if solver != 'exact':
+                        print('[Exec][PCA] Explained variance deviation of {} solver from exact solution: '
+                              '{:.3e}'.format(solver, pca.explained_variance_deviation(model, model_exact)))
+                del model_exact
+            del models
+
+        # Release all intermediate results held for this PCA run
+        cache.clear()
+        self.benchmark_profiler.set_cache(None)
+
+    def _pca_prepare_input(self, gt, cache):
+        """
+        Filters the genotype data, transforms it into alternate allele counts, and applies the variant subset and
+        LD pruning, timing each stage.
+        :param gt: genotype array
+        :param cache: intermediate result cache shared between the stages
+        :return: alternate allele counts with shape (n_variants, n_samples), used as the PCA input
+        """
+        numba_engine = self.bench_conf.compute_engine == config.COMPUTE_ENGINE_NUMBA
 
-    def _benchmark_pca(self, gt):
         # Count alleles at each variant
         self.benchmark_profiler.start_benchmark('PCA: Count alleles')
-        ac = gt.count_alleles()
+        if numba_engine:
+            ac = cache.get('ac', lambda: kernels.count_alleles(gt))
+        else:
+            ac = cache.get('ac', lambda: gt.count_alleles())
         self.benchmark_profiler.end_benchmark()
+        if numba_engine:
+            self._cross_check('PCA: Count alleles', ac, lambda: gt.count_alleles())
+
+        if numba_engine:
+            def max_allele():
+                return cache.get('max_allele', lambda: kernels.max_allele(ac))
+        else:
+            def max_allele():
+                return cache.get('max_allele', lambda: ac.max_allele())
 
         # Count number of multiallelic SNPs
         self.benchmark_profiler.start_benchmark('PCA: Count multiallelic SNPs')
+        is_multiallelic = max_allele() > 1
         if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            num_multiallelic_snps = da.count_nonzero(ac.max_allele() > 1).compute()
+            num_multiallelic_snps = da.count_nonzero(is_multiallelic).compute()
         else:
-            num_multiallelic_snps = np.count_nonzero(ac.max_allele() > 1)
+            num_multiallelic_snps = np.count_nonzero(is_multiallelic)
         self.benchmark_profiler.end_benchmark()
-        del num_multiallelic_snps
+        del is_multiallelic, num_multiallelic_snps
 
         # Count number of biallelic singletons
         self.benchmark_profiler.start_benchmark('PCA: Count biallelic singletons')
+        if numba_engine:
+            is_biallelic_singleton = kernels.locate_biallelic_singletons(ac)
+        else:
+            is_biallelic_singleton = (max_allele() == 1) & ac.is_singleton(1)
         if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            num_biallelic_singletons = da.count_nonzero((ac.max_allele() == 1) & ac.is_singleton(1)).compute()
+            num_biallelic_singletons = da.count_nonzero(is_biallelic_singleton).compute()
         else:
-            num_biallelic_singletons = np.count_nonzero((ac.max_allele() == 1) & ac.is_singleton(1))
+            num_biallelic_singletons = np.count_nonzero(is_biallelic_singleton)
         self.benchmark_profiler.end_benchmark()
-        del num_biallelic_singletons
+        del is_biallelic_singleton, num_biallelic_singletons
 
         # Apply filtering to remove singletons and multiallelic SNPs
-        flt = (ac.max_allele() == 1) & (ac[:, :2].min(axis=1) > 1)
+        if numba_engine:
+            flt = cache.get('flt', lambda: self._materialize(kernels.locate_common_biallelic(ac)))
+        else:
+            flt = cache.get('flt', lambda: (max_allele() == 1) & (ac[:, :2].min(axis=1) > 1))
         flt_count = np.count_nonzero(flt)
         self.benchmark_profiler.start_benchmark('PCA: Remove singletons and multiallelic SNPs')
         if flt_count > 0:
@@ -402,12 +1145,20 @@ class Benchmark:
             print('[Exec][PCA] Cannot remove singletons and multiallelic SNPs as no data would remain. Skipping...')
             gf = gt
         self.benchmark_profiler.end_benchmark()
-        del ac, flt, flt_count
+        del ac, flt, flt_count, max_allele
+
+        # Allele counts and filters are not needed by any later stage
+        cache.evict('ac', 'max_allele', 'flt')
 
         # Transform genotype data into 2-dim matrix
         self.benchmark_profiler.start_benchmark('PCA: Transform genotype data for PCA')
-        gn = gf.to_n_alt()
+        if numba_engine:
+            gn = kernels.to_n_alt(gf)
+        else:
+            gn = gf.to_n_alt()
         self.benchmark_profiler.end_benchmark()
+        if numba_engine:
+            self._cross_check('PCA: Transform genotype data for PCA', gn, lambda: gf.to_n_alt())
         del gf
 
         # Randomly choose subset of SNPs
@@ -417,74 +1168,142 @@ class Benchmark:
         else:
             n = min(gn.shape[0], self.bench_conf.pca_subset_size)
             print('[Exec][PCA] Including {} random variants for PCA.'.format(n))
-            vidx = np.random.choice(gn.shape[0], n, replace=False)
-            vidx.sort()
-            if self.bench_conf.genotype_array_type in [config.GENOTYPE_ARRAY_NORMAL, config.GENOTYPE_ARRAY_CHUNKED]:
-                gnr = gn.take(vidx, axis=0)
-            elif self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-                gnr = gn[vidx]  # Use indexing workaround since Dask Array's take() method is not working properly
+            seed = self.bench_conf.pca_subset_seed
+            if seed == -1:
+                seed = np.random.randint(0, 2 ** 31 - 1)
+            chunked_subset = self.bench_conf.pca_subset_method == config.PCA_SUBSET_METHOD_CHUNKED
+
+            if chunked_subset and self.bench_conf.genotype_array_type != config.GENOTYPE_ARRAY_DASK:
+                print('[Exec][PCA] Chunked subset method is only available for Dask arrays. Using global method.')
+                chunked_subset = False
+
+            self.benchmark_profiler.start_benchmark('PCA: Select random subset of variants')
+            if chunked_subset:
+                gnr = dask_utils.chunked_random_subset(gn, n, seed=seed)
             else:
-                print('[Exec][PCA] Error: Unspecified genotype array type specified.')
-                exit(1)
-            del vidx
+                vidx = np.random.RandomState(seed).choice(gn.shape[0], n, replace=False)
+                vidx.sort()
+                if self.bench_conf.genotype_array_type in [config.GENOTYPE_ARRAY_NORMAL,
+                                                           config.GENOTYPE_ARRAY_CHUNKED,
+                                                           config.GENOTYPE_ARRAY_PACKED]:
+                    gnr = gn.take(vidx, axis=0)
+                elif self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
+                    gnr = gn[vidx]  # Use indexing workaround since Dask Array's take() method is not working properly
+                else:
+                    print('[Exec][PCA] Error: Unspecified genotype array type specified.')
+                    exit(1)
+                del vidx
+            self.benchmark_profiler.end_benchmark()
+
+            if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
+                print('[Exec][PCA] Subset task graph size: {} tasks, {} chunks along variants.'.format(
+                    len(gnr.__dask_graph__()), len(gnr.chunks[0])))
 
         if self.bench_conf.pca_ld_enabled:
-            if self.bench_conf.genotype_array_type != config.GENOTYPE_ARRAY_DASK:
-                # Apply LD pruning to subset of SNPs
-                size = self.bench_conf.pca_ld_pruning_size
-                step = self.bench_conf.pca_ld_pruning_step
-                threshold = self.bench_conf.pca_ld_pruning_threshold
-                n_iter = self.bench_conf.pca_ld_pruning_number_iterations
-
-                self.benchmark_profiler.start_benchmark('PCA: Apply LD pruning')
-                gnu = self._pca_ld_prune(gnr, size=size, step=step, threshold=threshold, n_iter=n_iter)
-                self.benchmark_profiler.end_benchmark()
-            else:
-                print('[Exec][PCA] Cannot apply LD pruning because Dask genotype arrays do not support this operation.')
-                gnu = gnr
+            # Apply LD pruning to subset of SNPs
+            size = self.bench_conf.pca_ld_pruning_size
+            step = self.bench_conf.pca_ld_pruning_step
+            threshold = self.bench_conf.pca_ld_pruning_threshold
+            n_iter = self.bench_conf.pca_ld_pruning_number_iterations
+
+            self.benchmark_profiler.start_benchmark('PCA: Apply LD pruning')
+            gnu = self._pca_ld_prune(gnr, size=size, step=step, threshold=threshold, n_iter=n_iter)
+            self.benchmark_profiler.end_benchmark()
         else:
             print('[Exec][PCA] LD pruning disabled. Skipping this operation.')
             gnu = gnr
 
-        # Run PCA analysis
-        pca_num_components = self.bench_conf.pca_number_components
-        scaler = self.bench_conf.pca_data_scaler
+        return gnu
 
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            # Rechunk Dask array to work with Dask's svd function (single chunk for transposed column)
-            gnu_pca_conv = gnu.rechunk({0: -1, 1: gt.values.chunksize[1]})
-        else:
-            gnu_pca_conv = gnu
+    def _pca_n_alt_cache_params(self, gt):
+        """
+        Returns the parameters which determine the PCA input matrix, used to key the on-disk alt allele count cache,
+        or None if the input cannot be reproduced (i.e. a random subset seed is used).
+        """
+        bench_conf = self.bench_conf
+        subset = bench_conf.pca_subset_size != -1
+        if subset and bench_conf.pca_subset_seed == -1:
+            return None
+        chunked_subset = subset and bench_conf.pca_subset_method == config.PCA_SUBSET_METHOD_CHUNKED and \
+            bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK
+
+        params = OrderedDict([('dataset', n_alt_cache.dataset_fingerprint(self.benchmark_source_paths)),
+                              ('data_input', bench_conf.benchmark_data_input),
+                              ('num_variants', bench_conf.benchmark_num_variants),
+                              ('num_samples', bench_conf.benchmark_num_samples),
+                              ('filter', 'common_biallelic'),
+                              ('subset_size', bench_conf.pca_subset_size),
+                              ('subset_seed', bench_conf.pca_subset_seed if subset else None),
+                              # The chunked subset depends on the chunk layout of the genotype data
+                              ('subset_chunks', list(gt.values.chunks[0]) if chunked_subset else None)])
+        if bench_conf.benchmark_data_input == 'vcf' and bench_conf.vcf_to_zarr_config is not None:
+            params['alt_number'] = bench_conf.vcf_to_zarr_config.alt_number
+        if bench_conf.pca_ld_enabled:
+            params['ld'] = OrderedDict([('size', bench_conf.pca_ld_pruning_size),
+                                        ('step', bench_conf.pca_ld_pruning_step),
+                                        ('threshold', bench_conf.pca_ld_pruning_threshold),
+                                        ('iterations', bench_conf.pca_ld_pruning_number_iterations)])
+        return params
 
-        # Run conventional PCA analysis
-        self.benchmark_profiler.start_benchmark(
-            'PCA: Run conventional PCA analysis (scaler: {})'.format(scaler if scaler is not None else 'none'))
-        coords, model = allel.pca(gnu_pca_conv, n_components=pca_num_components, scaler=scaler)
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            coords.compute()
+    @staticmethod
+    def _chunk_length(gt):
+        """ Returns the number of variants per chunk of the genotype data, or None if it is not chunked. """
+        values = gt.values if hasattr(gt, 'values') else gt
+        chunks = getattr(values, 'chunks', None)
+        if chunks is None:
+            return None
+        return chunks[0][0] if isinstance(chunks[0], tuple) else chunks[0]
+
+    def _run_pca(self, operation_name, run, default_dtype='float64', single_precision=True):
+        """
+        Times a PCA run and reports the peak memory use (RSS) of the process while it runs. The floating point type
+        the run computes in is recorded with its results. If single precision is selected, the run is repeated
+        (untimed) in double precision and the projection error is reported.
+        :param operation_name: name of the benchmark operation
+        :param run: callable which takes the floating point type to compute in (None for the engine's default),
+                    performs the PCA and returns a tuple (coords, model)
+        :param default_dtype: name of the floating point type the engine computes in by default
+        :param single_precision: whether the engine runs in single precision if it is selected (otherwise, it runs in
+                                 its default type)
+        :type default_dtype: str
+        :type single_precision: bool
+        :return: the fitted PCA model
+        """
+        dtype = self.bench_conf.pca_data_precision
+        if dtype == config.benchmark_pca_data_precision_types[config.PCA_DATA_PRECISION_FLOAT32] and \
+                not single_precision:
+            dtype = None
+        self.benchmark_profiler.start_benchmark(operation_name)
+        self.benchmark_profiler.set_data_type(dtype if dtype is not None else default_dtype)
+        coords, model = run(dtype)
+        coords = self._materialize(coords)
         self.benchmark_profiler.end_benchmark()
-        del gnu_pca_conv, coords, model
+        print('[Exec][PCA] Peak RSS: {:.1f} MiB.'.format(
+            self.benchmark_profiler.get_benchmark_results().peak_rss_bytes / 2 ** 20))
 
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            # Rechunk Dask array to match original genotype chunk size
-            gnu_pca_rand = gnu.rechunk((gt.values.chunksize[0], gt.values.chunksize[1]))
-        else:
-            gnu_pca_rand = gnu
+        if dtype == config.benchmark_pca_data_precision_types[config.PCA_DATA_PRECISION_FLOAT32]:
+            coords_reference, _ = run('float64')
+            error = pca.projection_error(coords, self._materialize(coords_reference))
+            print('[Exec][PCA] Relative projection error against float64 coordinates: {:.3e}'.format(error))
 
-        # Run randomized PCA analysis
-        self.benchmark_profiler.start_benchmark(
-            'PCA: Run randomized PCA analysis (scaler: {})'.format(scaler if scaler is not None else 'none'))
-        coords, model = allel.randomized_pca(gnu_pca_rand, n_components=pca_num_components, scaler=scaler)
-        if self.bench_conf.genotype_array_type == config.GENOTYPE_ARRAY_DASK:
-            coords.compute()
-        self.benchmark_profiler.end_benchmark()
-        del gnu_pca_rand, coords, model
+        return model
+
+    @staticmethod
+    def _pca_input(gn, dtype):
+        """ Casts the PCA input to the given floating point type (lazily for Dask arrays), if one is specified. """
+        if dtype is None:
+            return gn
+        return gn.astype(dtype)
 
     @staticmethod
     def _pca_ld_prune(gn, size, step, threshold=.1, n_iter=1):
         blen = size * 10
         for i in range(n_iter):
-            loc_unlinked = allel.locate_unlinked(gn, size=size, step=step, threshold=threshold, blen=blen)
+            if isinstance(gn, da.Array):
+                # Compute pairwise LD per chunk in parallel, matching the in-memory result
+                loc_unlinked = ld.locate_unlinked(gn, size=size, step=step, threshold=threshold, blen=blen)
+            else:
+                loc_unlinked = allel.locate_unlinked(gn, size=size, step=step, threshold=threshold, blen=blen)
             n = np.count_nonzero(loc_unlinked)
             n_remove = gn.shape[0] - n
             print(
@@ -492,5 +1311,8 @@ class Benchmark:
                                                                                                        n_iter,
                                                                                                        n,
                                                                                                        n_remove))
-            gn = gn.compress(loc_unlinked, axis=0)
+            if isinstance(gn, da.Array):
+                gn = da.compress(loc_unlinked, gn, axis=0)
+            else:
+                gn = gn.compress(loc_unlinked, axis=0)
         return gn
@@ -0,0 +1,137 @@
+""" Dask diagnostics for benchmark operations. While an operation runs, the tasks executed by Dask are recorded (the
+task stream), along with the size of the (optimized) task graphs, the bytes transferred between workers and spill-to-disk events,
+so that a slower operation can be attributed to scheduling, data transfer, spilling or computation.
+
+With a distributed client, the task stream is taken from the scheduler and transfer bytes from the workers' counters.
+With Dask's local (threaded or synchronous) schedulers, tasks are recorded through scheduler callbacks; there is no
+data transfer or spilling, and task times are measured from the scheduler thread (from submission to completion). """
+
+import time
+from collections import OrderedDict
+from dask.callbacks import Callback
+
+try:
+    from distributed import default_client
+except ImportError:
+    default_client = None
+
+
+def current_client():
+    """
+    Returns the default distributed client, if one is connected.
+    :return: distributed.Client, or None
+    """
+    if default_client is None:
+        return None
+    try:
+        return default_client()
+    except ValueError:
+        return None
+
+
+def _transfer_outgoing_bytes(dask_worker):
+    return dask_worker.transfer_outgoing_bytes_total
+
+
+class _LocalSchedulerCallback(Callback):
+    """ Records the graphs and tasks run by Dask's local schedulers. """
+
+    def __init__(self):
+        super(_LocalSchedulerCallback, self).__init__()
+        self.graph_size = 0
+        self.task_stream = []
+        self._task_starts = {}
+
+    def _start(self, dsk):
+        self.graph_size += len(dsk)
+
+    def _pretask(self, key, dsk, state):
+        self._task_starts[key] = time.time()
+
+    def _posttask(self, key, result, dsk, state, worker_id):
+        start = self._task_starts.pop(key, None)
+        if start is not None:
+            self.task_stream.append({'key': str(key),
+                                     'worker': 'local-{}'.format(worker_id),
+                                     'action': 'compute',
+                                     'start': start,
+                                     'stop': time.time()})
+
+
+class OperationDaskDiagnostics:
+    """ Collects Dask diagnostics for a single operation, using the given distributed client or, if there is none,
+    the local schedulers. """
+
+    def __init__(self, client=None):
+        """
+        :param client: distributed client used by the operation, if any
+        :type client: distributed.Client
+        """
+        self.client = client
+        self._callback = None
+        self._start_time = None
+        self._transfer_bytes_start = None
+        self.summary = None
+
+    def start(self):
+        if self.client is not None:
+            # Ensure that the scheduler records the task stream
+            self.client.get_task_stream(start=0, stop=0)
+            self._transfer_bytes_start = self.client.run(_transfer_outgoing_bytes)
+        else:
+            self._callback = _LocalSchedulerCallback()
+            self._callback.register()
+        self._start_time = time.time()
+
+    def stop(self):
+        """
+        Stops collecting diagnostics.
+        :return: OrderedDict with the task stream and a summary of the graph size, compute, transfer and spill activity
+        """
+        if self.client is not None:
+            task_stream = self._distributed_task_stream()
+            transfer_bytes_end = self.client.run(_transfer_outgoing_bytes)
+            transfer_bytes = sum(max(nbytes - self._transfer_bytes_start.get(worker, 0), 0)
+                                 for worker, nbytes in transfer_bytes_end.items())
+            graph_size = None  # Not reported by the scheduler; see n_tasks instead
+            scheduler = 'distributed'
+        else:
+            self._callback.unregister()
+            task_stream = self._callback.task_stream
+            transfer_bytes = 0
+            graph_size = self._callback.graph_size
+            scheduler = 'local'
+
+        self.summary = self._summarize(task_stream)
+        self.summary.update([('scheduler', scheduler),
+                             ('graph_size', graph_size),
+                             ('transfer_bytes', transfer_bytes),
+                             ('task_stream', task_stream)])
+        return self.summary
+
+    def _distributed_task_stream(self):
+        task_stream = []
+        for task in self.client.get_task_stream(start=self._start_time):
+            for startstop in task['startstops']:
+                # Transfers are recorded with the worker which sent the data
+                if startstop['action'] == 'transfer':
+                    worker = startstop.get('source', task['worker'])
+                else:
+                    worker = task['worker']
+                task_stream.append({'key': str(task['key']),
+                                    'worker': worker,
+                                    'action': startstop['action'],
+                                    'start': startstop['start'],
+                                    'stop': startstop['stop']})
+        return task_stream
+
+    @staticmethod
+    def _summarize(task_stream):
+        summary = OrderedDict([('n_tasks', len(set(entry['key'] for entry in task_stream
+                                                    if entry['action'] == 'compute')))])
+        for action, name in [('compute', 'compute'), ('transfer', 'transfer'), ('disk-write', 'spill'),
+                             ('disk-read', 'unspill')]:
+            entries = [entry for entry in task_stream if entry['action'] == action]
+            summary['n_{}_events'.format(name)] = len(entries)
+            summary['{}_time'.format(name)] = sum(entry['stop'] - entry['start'] for entry in entries)
+        return summary
@@ -1,11 +1,146 @@
-from dask.distributed import Client
+import numpy as np
+import dask.array as da
+from collections import OrderedDict
+from dask.distributed import Client, LocalCluster
 
 
 class DaskUtils:
     def __init__(self):
         self.client = None
+        self.cluster = None
+        self.local_cluster_parameters = None
 
     def connect_to_scheduler(self, address='127.0.0.1', port=8786):
         # Connect to Dask scheduler
         print('[Dask Utils] Connecting to Dask scheduler at {address}:{port}'.format(address=address, port=port))
         self.client = Client('{}:{}'.format(address, port))
+
+    def start_local_cluster(self, n_workers=None, threads_per_worker=None, memory_limit='auto', spill_dir=None,
+                            processes=True):
+        """
+        Starts a Dask cluster on this machine and connects to it.
+        :param n_workers: number of workers. If None, Dask chooses based on the number of CPU cores.
+        :param threads_per_worker: number of threads per worker. If None, Dask chooses based on the number of cores.
+        :param memory_limit: memory limit per worker (e.g. '4GB'), 'auto' to divide the system memory between the
+                             workers, or 0 for no limit
+        :param spill_dir: directory in which workers spill data to disk. If None, Dask's default is used.
+        :param processes: whether to run workers in separate processes (True) or as threads of this process (False)
+        :type n_workers: int
+        :type threads_per_worker: int
+        :type memory_limit: str
+        :type spill_dir: str
+        :type processes: bool
+        """
+        print('[Dask Utils] Starting local Dask cluster.')
+        self.cluster = LocalCluster(n_workers=n_workers,
+                                    threads_per_worker=threads_per_worker,
+                                    memory_limit=memory_limit,
+                                    local_directory=spill_dir,
+                                    processes=processes)
+        self.client = Client(self.cluster)
+        self.local_cluster_parameters = OrderedDict([('memory_limit', memory_limit),
+                                                     ('spill_dir', spill_dir),
+                                                     ('processes', processes)])
+
+    def get_cluster_parameters(self):
+        """
+        Returns the parameters of the connected Dask cluster: its mode, scheduler address, workers, threads and memory
+        limits (and, for a local cluster, the settings it was started with).
+        :return: OrderedDict, or None if not connected
+        """
+        if self.client is None:
+            return None
+        workers = list(self.client.scheduler_info()['workers'].values())
+        parameters = OrderedDict([('mode', 'local_cluster' if self.cluster is not None else 'scheduler'),
+                                  ('scheduler_address', self.client.scheduler.address),
+                                  ('n_workers', len(workers)),
+                                  ('threads_per_worker', sorted(set(w['nthreads'] for w in workers))),
+                                  ('total_threads', sum(w['nthreads'] for w in workers)),
+                                  ('memory_limit_per_worker', sorted(set(w['memory_limit'] for w in workers)))])
+        if self.local_cluster_parameters is not None:
+            parameters.update(self.local_cluster_parameters)
+        return parameters
+
+    def close(self):
+        """
+        Disconnects from the Dask scheduler and shuts down the local cluster, if one was started.
+        """
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+        if self.cluster is not None:
+            print('[Dask Utils] Shutting down local Dask cluster.')
+            self.cluster.close()
+            self.cluster = None
+            self.local_cluster_parameters = None
+
+
+def allocate_subset_sizes(chunk_lengths, n):
+    """
+    Allocates a total sample size across chunks in proportion to chunk length (largest remainder method),
+    so that the per-chunk sizes sum to exactly n.
+    :param chunk_lengths: length of each chunk along the sampled axis
+    :param n: total number of items to sample
+    :type chunk_lengths: tuple
+    :type n: int
+    :return: numpy array with the number of items to sample from each chunk
+    """
+    chunk_lengths = np.asarray(chunk_lengths, dtype=np.int64)
+    total = chunk_lengths.sum()
+    if n > total:
+        raise ValueError('Cannot sample {} items from {} available.'.format(n, total))
+    if total == 0:
+        return np.zeros(len(chunk_lengths), dtype=np.int64)
+
+    quotas = chunk_lengths * (n / total)
+    sizes = np.minimum(np.floor(quotas).astype(np.int64), chunk_lengths)
+    remainder = n - sizes.sum()
+    order = np.argsort(-(quotas - sizes), kind='stable')
+    order = order[sizes[order] < chunk_lengths[order]]
+    sizes[order[:remainder]] += 1
+    return sizes
+
+
+def _chunk_subset_indices(chunk_length, size, seed, chunk_index):
+    """ Returns the sorted indices sampled within a single chunk, deterministic for a given seed and chunk. """
+    random_state = np.random.RandomState([seed, chunk_index])
+    return np.sort(random_state.choice(chunk_length, size, replace=False))
+
+
+def chunked_random_subset_indices(chunk_lengths, n, seed):
+    """
+    Returns the global indices selected by chunked_random_subset() for the given chunk lengths.
+    :type chunk_lengths: tuple
+    :type n: int
+    :type seed: int
+    :return: sorted numpy array of selected indices
+    """
+    sizes = allocate_subset_sizes(chunk_lengths, n)
+    offsets = np.cumsum((0,) + tuple(chunk_lengths[:-1]))
+    return np.concatenate([_chunk_subset_indices(chunk_length, size, seed, i) + offset
+                           for i, (chunk_length, size, offset) in enumerate(zip(chunk_lengths, sizes, offsets))]
+                          + [np.zeros(0, dtype=np.int64)])
+
+
+def chunked_random_subset(x, n, seed):
+    """
+    Draws a uniform random subset of exactly n items along the first axis of a Dask array. Each chunk contributes
+    a sample proportional to its length, drawn independently, so the task graph has one task per input chunk and
+    the output keeps one chunk per input chunk instead of fragmenting.
+    :param x: Dask array to subset along its first axis
+    :param n: number of items to select
+    :param seed: random seed; the same seed always selects the same items
+    :type x: dask.array.Array
+    :type n: int
+    :type seed: int
+    :return: dask.array.Array
+    """
+    sizes = allocate_subset_sizes(x.chunks[0], n)
+
+    def take_chunk_subset(block, block_info=None):
+        chunk_index = block_info[0]['chunk-location'][0]
+        indices = _chunk_subset_indices(block.shape[0], sizes[chunk_index], seed, chunk_index)
+        return block[indices]
+
+    return da.map_blocks(take_chunk_subset, x, chunks=(tuple(int(size) for size in sizes),) + x.chunks[1:],
+                         dtype=x.dtype)
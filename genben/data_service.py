@@ -26,6 +26,7 @@ import zarr
 import numcodecs
 from numcodecs import Blosc
 from genben import config
+from genben.packed import PackedGenotypeArray
 
 import gzip
 import shutil
@@ -291,6 +292,20 @@ def setup_vcf_to_zarr(input_vcf_dir, output_zarr_dir, conversion_config):
                         conversion_config=conversion_config)
 
 
+def get_compressor(conversion_config):
+    """ Returns the compressor to use for Zarr output, as specified in the conversion configuration.
+    :param conversion_config: Configuration data for the conversion
+    :type conversion_config: config.VCFtoZarrConfigurationRepresentation
+    :return: numcodecs compressor
+    """
+    if conversion_config.compressor == "Blosc":
+        return Blosc(cname=conversion_config.blosc_compression_algorithm,
+                     clevel=conversion_config.blosc_compression_level,
+                     shuffle=conversion_config.blosc_shuffle_mode)
+    else:
+        raise ValueError("Unexpected compressor type specified.")
+
+
 def convert_to_zarr(input_vcf_path, output_zarr_path, conversion_config, benchmark_profiler=None):
     """ Converts the original data (VCF) to a Zarr format. Only converts a single VCF file.
     If a BenchmarkRunner is provided, the actual VCF to Zarr conversion process will be benchmarked.
@@ -350,12 +365,7 @@ def convert_to_zarr(input_vcf_path, output_zarr_path, conversion_config, benchma
             chunk_width = conversion_config.chunk_width
         print("[VCF-Zarr] Chunk width: {}".format(chunk_width))
 
-        if conversion_config.compressor == "Blosc":
-            compressor = Blosc(cname=conversion_config.blosc_compression_algorithm,
-                               clevel=conversion_config.blosc_compression_level,
-                               shuffle=conversion_config.blosc_shuffle_mode)
-        else:
-            raise ValueError("Unexpected compressor type specified.")
+        compressor = get_compressor(conversion_config)
 
         if benchmark_profiler is not None:
             benchmark_profiler.start_benchmark(operation_name="Convert VCF to Zarr")
@@ -410,6 +420,8 @@ def get_genotype_array_concat(callsets, genotype_array_type=config.GENOTYPE_ARRA
         combined_gt = allel.GenotypeChunkedArray(np.concatenate(gt_list, axis=0))
     elif genotype_array_type == config.GENOTYPE_ARRAY_NORMAL:
         combined_gt = allel.GenotypeArray(np.concatenate(gt_list, axis=0))
+    elif genotype_array_type == config.GENOTYPE_ARRAY_PACKED:
+        combined_gt = PackedGenotypeArray.concatenate([PackedGenotypeArray.from_genotypes(gt) for gt in gt_list])
     else:
         raise ValueError('Error: Invalid option specified for genotype_array_type.')
 
@@ -425,5 +437,7 @@ def get_genotype_array(callset, genotype_array_type=config.GENOTYPE_ARRAY_DASK):
         return allel.GenotypeDaskArray(gtz)
     elif genotype_array_type == config.GENOTYPE_ARRAY_CHUNKED:
         return allel.GenotypeChunkedArray(gtz)
+    elif genotype_array_type == config.GENOTYPE_ARRAY_PACKED:
+        return PackedGenotypeArray.from_genotypes(gtz)
     else:
         return None
@@ -0,0 +1,322 @@
+""" Numba-compiled genotype kernels. These provide an alternative compute engine to the generic scikit-allel
+implementations used by the benchmark, operating directly on int8 genotype blocks and running multithreaded
+across variants (or samples) within each block. If Numba is not installed, the kernels fall back to plain Python
+loops, which are correct but slow; use numba_available() to check before selecting this engine. """
+
+import numpy as np
+import dask.array as da
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    prange = numba.prange
+else:
+    prange = range
+
+
+def numba_available():
+    """
+    Returns whether Numba is installed and the kernels in this module are JIT-compiled.
+    :return: bool
+    """
+    return numba is not None
+
+
+def jit(parallel=False):
+    """
+    Decorator which JIT-compiles a function with Numba if it is installed, or leaves it as plain Python otherwise.
+    :param parallel: whether Numba should parallelize prange loops within the function
+    """
+    def decorator(func):
+        if numba is None:
+            return func
+        return numba.njit(parallel=parallel, nogil=True, cache=False)(func)
+
+    return decorator
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Block kernels (operate on numpy arrays)
+# ----------------------------------------------------------------------------------------------------------------------
+
+@jit()
+def _call_type(g, i, j):
+    """ Returns -1 if the call at (i, j) is missing, 0 if homozygous and 1 if heterozygous. """
+    ploidy = g.shape[2]
+    first = g[i, j, 0]
+    if first < 0:
+        return -1
+    het = 0
+    for k in range(1, ploidy):
+        allele = g[i, j, k]
+        if allele < 0:
+            return -1
+        if allele != first:
+            het = 1
+    return het
+
+
+@jit()
+def _block_max(g):
+    out = -1
+    for i in range(g.shape[0]):
+        for j in range(g.shape[1]):
+            for k in range(g.shape[2]):
+                if g[i, j, k] > out:
+                    out = g[i, j, k]
+    return out
+
+
+@jit(parallel=True)
+def _count_alleles_block(g, max_allele):
+    n_variants, n_samples, ploidy = g.shape
+    out = np.zeros((n_variants, max_allele + 1), dtype=np.int32)
+    for i in prange(n_variants):
+        for j in range(n_samples):
+            for k in range(ploidy):
+                allele = g[i, j, k]
+                if 0 <= allele <= max_allele:
+                    out[i, allele] += 1
+    return out
+
+
+@jit(parallel=True)
+def _count_call_type_per_variant_block(g, call_type):
+    n_variants, n_samples = g.shape[0], g.shape[1]
+    out = np.zeros(n_variants, dtype=np.int64)
+    for i in prange(n_variants):
+        count = 0
+        for j in range(n_samples):
+            if _call_type(g, i, j) == call_type:
+                count += 1
+        out[i] = count
+    return out
+
+
+@jit(parallel=True)
+def _count_call_type_per_sample_block(g, call_type):
+    n_variants, n_samples = g.shape[0], g.shape[1]
+    out = np.zeros(n_samples, dtype=np.int64)
+    for j in prange(n_samples):
+        count = 0
+        for i in range(n_variants):
+            if _call_type(g, i, j) == call_type:
+                count += 1
+        out[j] = count
+    return out
+
+
+@jit(parallel=True)
+def _to_n_alt_block(g):
+    n_variants, n_samples, ploidy = g.shape
+    out = np.zeros((n_variants, n_samples), dtype=np.int8)
+    for i in prange(n_variants):
+        for j in range(n_samples):
+            n = 0
+            for k in range(ploidy):
+                if g[i, j, k] > 0:
+                    n += 1
+            out[i, j] = n
+    return out
+
+
+@jit(parallel=True)
+def _max_allele_block(ac):
+    n_variants, n_alleles = ac.shape
+    out = np.full(n_variants, -1, dtype=np.int8)
+    for i in prange(n_variants):
+        for a in range(n_alleles - 1, -1, -1):
+            if ac[i, a] > 0:
+                out[i] = a
+                break
+    return out
+
+
+@jit(parallel=True)
+def _locate_biallelic_singletons_block(ac):
+    n_variants, n_alleles = ac.shape
+    out = np.zeros(n_variants, dtype=np.bool_)
+    for i in prange(n_variants):
+        biallelic = n_alleles > 1 and ac[i, 1] > 0
+        for a in range(2, n_alleles):
+            if ac[i, a] > 0:
+                biallelic = False
+        out[i] = biallelic and ac[i, 1] == 1
+    return out
+
+
+@jit(parallel=True)
+def _locate_common_biallelic_block(ac):
+    n_variants, n_alleles = ac.shape
+    out = np.zeros(n_variants, dtype=np.bool_)
+    for i in prange(n_variants):
+        biallelic = n_alleles > 1 and ac[i, 1] > 0
+        for a in range(2, n_alleles):
+            if ac[i, a] > 0:
+                biallelic = False
+        out[i] = biallelic and ac[i, 0] > 1 and ac[i, 1] > 1
+    return out
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Genotype array wrappers (dispatch on genotype array type)
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _genotype_values(gt):
+    """ Returns the underlying values of a genotype array, unwrapping scikit-allel containers. """
+    return gt.values if hasattr(gt, 'values') else gt
+
+
+def _chunk_length(values, default=10000):
+    if hasattr(values, 'chunks') and values.chunks is not None:
+        return values.chunks[0]
+    return default
+
+
+def _iter_blocks(values):
+    """ Yields numpy blocks of int8 genotype data along the variants axis of an on-disk or chunked array. """
+    blen = _chunk_length(values)
+    for i in range(0, values.shape[0], blen):
+        yield np.asarray(values[i:i + blen])
+
+
+def _is_dask(values):
+    return isinstance(values, da.Array)
+
+
+def _is_in_memory(values):
+    return isinstance(values, np.ndarray)
+
+
+def max_allele_index(gt):
+    """
+    Returns the highest allele index present in the genotype data (-1 if all calls are missing).
+    :param gt: genotype array (normal, chunked or Dask)
+    :return: int
+    """
+    values = _genotype_values(gt)
+    if _is_dask(values):
+        return int(values.max().compute())
+    elif _is_in_memory(values):
+        return int(_block_max(values))
+    return max([int(_block_max(block)) for block in _iter_blocks(values)] + [-1])
+
+
+def count_alleles(gt, max_allele=None):
+    """
+    Counts the number of calls of each allele per variant.
+    :param gt: genotype array (normal, chunked or Dask)
+    :param max_allele: highest allele index to count; if None, determined from the data
+    :return: allele counts array with shape (n_variants, max_allele + 1). Lazy if gt is Dask-backed.
+    """
+    values = _genotype_values(gt)
+    if max_allele is None:
+        max_allele = max_allele_index(values)
+    max_allele = max(max_allele, 0)
+
+    if _is_dask(values):
+        chunks = (values.chunks[0], (1,) * len(values.chunks[1]), (max_allele + 1,))
+        return da.map_blocks(lambda b: _count_alleles_block(b, max_allele)[:, None, :], values,
+                             chunks=chunks, dtype='i4').sum(axis=1, dtype='i4')
+    elif _is_in_memory(values):
+        return _count_alleles_block(values, max_allele)
+    return np.concatenate([_count_alleles_block(block, max_allele) for block in _iter_blocks(values)], axis=0)
+
+
+def _count_call_type(gt, call_type, axis):
+    values = _genotype_values(gt)
+    if axis == 1:
+        block_kernel = _count_call_type_per_variant_block
+    elif axis == 0:
+        block_kernel = _count_call_type_per_sample_block
+    else:
+        raise ValueError('Invalid axis specified for genotype count: {}'.format(axis))
+
+    if _is_dask(values):
+        if axis == 1:
+            chunks = (values.chunks[0], (1,) * len(values.chunks[1]))
+            return da.map_blocks(lambda b: block_kernel(b, call_type)[:, None], values, chunks=chunks,
+                                 drop_axis=2, dtype='i8').sum(axis=1)
+        else:
+            chunks = ((1,) * len(values.chunks[0]), values.chunks[1])
+            return da.map_blocks(lambda b: block_kernel(b, call_type)[None, :], values, chunks=chunks,
+                                 drop_axis=2, dtype='i8').sum(axis=0)
+    elif _is_in_memory(values):
+        return block_kernel(values, call_type)
+    elif axis == 1:
+        return np.concatenate([block_kernel(block, call_type) for block in _iter_blocks(values)])
+    else:
+        out = np.zeros(values.shape[1], dtype=np.int64)
+        for block in _iter_blocks(values):
+            out += block_kernel(block, call_type)
+        return out
+
+
+def count_het(gt, axis):
+    """
+    Counts heterozygous calls.
+    :param gt: genotype array (normal, chunked or Dask)
+    :param axis: 1 to count per variant, 0 to count per sample
+    :return: int64 count array. Lazy if gt is Dask-backed.
+    """
+    return _count_call_type(gt, 1, axis)
+
+
+def count_hom(gt, axis):
+    """
+    Counts homozygous calls.
+    :param gt: genotype array (normal, chunked or Dask)
+    :param axis: 1 to count per variant, 0 to count per sample
+    :return: int64 count array. Lazy if gt is Dask-backed.
+    """
+    return _count_call_type(gt, 0, axis)
+
+
+def to_n_alt(gt):
+    """
+    Transforms genotype calls into the number of non-reference alleles per call, as int8.
+    :param gt: genotype array (normal, chunked or Dask)
+    :return: array with shape (n_variants, n_samples). Lazy if gt is Dask-backed.
+    """
+    values = _genotype_values(gt)
+    if _is_dask(values):
+        return da.map_blocks(_to_n_alt_block, values, drop_axis=2, dtype='i1')
+    elif _is_in_memory(values):
+        return _to_n_alt_block(values)
+    return np.concatenate([_to_n_alt_block(block) for block in _iter_blocks(values)], axis=0)
+
+
+def _map_allele_counts(ac, block_kernel, dtype):
+    ac = _genotype_values(ac)
+    if _is_dask(ac):
+        return da.map_blocks(block_kernel, ac.rechunk({1: -1}), drop_axis=1, dtype=dtype)
+    return block_kernel(np.asarray(ac))
+
+
+def max_allele(ac):
+    """
+    Returns the highest allele index with a non-zero count at each variant (-1 if none).
+    :param ac: allele counts array, as returned by count_alleles()
+    """
+    return _map_allele_counts(ac, _max_allele_block, 'i1')
+
+
+def locate_biallelic_singletons(ac):
+    """
+    Locates biallelic variants where the alternate allele is a singleton.
+    :param ac: allele counts array, as returned by count_alleles()
+    """
+    return _map_allele_counts(ac, _locate_biallelic_singletons_block, bool)
+
+
+def locate_common_biallelic(ac):
+    """
+    Locates biallelic variants where both the reference and alternate alleles occur more than once. This is the
+    filter used to remove singletons and multiallelic SNPs before PCA.
+    :param ac: allele counts array, as returned by count_alleles()
+    """
+    return _map_allele_counts(ac, _locate_common_biallelic_block, bool)
+
@@ -0,0 +1,140 @@
+""" Linkage disequilibrium (LD) pruning for Dask-backed genotype data. The pairwise r**2 computations, which dominate
+the cost of LD pruning, are performed per chunk in parallel (including across distributed workers), with each chunk
+extended by an overlapping window into the next chunk. The sequential pruning decisions are replayed, block by block,
+over the results using the same window sequence as allel.locate_unlinked(), so the output matches the in-memory
+result exactly. Chunks are computed in groups of as many chunks as there are threads to compute them, and the linked
+pairs of each block are dropped once it has been replayed, so memory use on the client depends on the chunk size
+rather than on the number of variants. """
+
+import os
+import numpy as np
+import dask
+from genben import dask_diagnostics
+from genben.kernels import jit
+
+
+def _linked_band(gnb, n_rows, size, threshold):
+    """
+    Computes whether each pair of variants within a window distance of each other is linked (r**2 > threshold),
+    using the method of Rogers and Huff (2008) with the same single-precision arithmetic as scikit-allel.
+    :param gnb: int8 alternate allele counts for the chunk, extended by up to size - 1 variants from the next chunk
+    :param n_rows: number of variants in the chunk itself (excluding the overlap)
+    :param size: window size (number of variants)
+    :param threshold: maximum value of r**2 to consider variants unlinked
+    :return: bool array with shape (n_rows, size - 1), where element (i, d - 1) is True if variants i and i + d
+             are linked
+    """
+    gnb = np.asarray(gnb, dtype=np.int8)
+    band = np.zeros((n_rows, max(size - 1, 0)), dtype=bool)
+    threshold = np.float32(threshold)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for d in range(1, size):
+            m = min(n_rows, gnb.shape[0] - d)
+            if m <= 0:
+                break
+            x = gnb[:m].astype(np.int32)
+            y = gnb[d:d + m].astype(np.int32)
+            valid = (x >= 0) & (y >= 0)
+            x = np.where(valid, x, 0)
+            y = np.where(valid, y, 0)
+
+            n = valid.sum(axis=1).astype(np.float32)
+            x_sum_sq = (x * x).sum(axis=1)
+            y_sum_sq = (y * y).sum(axis=1)
+            m0 = x.sum(axis=1).astype(np.float32) / n
+            m1 = y.sum(axis=1).astype(np.float32) / n
+            v0 = x_sum_sq.astype(np.float32) / n
+            v1 = y_sum_sq.astype(np.float32) / n
+            cov = (x * y).sum(axis=1).astype(np.float32) / n
+            cov = cov - m0 * m1
+            v0 = v0 - m0 * m0
+            v1 = v1 - m1 * m1
+
+            r = (cov.astype(np.float64) / np.sqrt((v0 * v1).astype(np.float64))).astype(np.float32)
+            r_squared = (r.astype(np.float64) ** 2).astype(np.float32)
+            r_squared[(n == 0) | (x_sum_sq == 0) | (y_sum_sq == 0)] = np.nan
+
+            band[:m, d - 1] = r_squared > threshold
+
+    return band
+
+
+@jit()
+def _replay_block(linked, offset, loc, block_start, block_stop, size, step):
+    """ Replays the windowed pruning decisions of allel.locate_unlinked() within a block of variants, using
+    precomputed linked pairs. Row i - offset of linked holds the linked pairs of variant i. """
+    window_start = block_start
+    window_stop = min(window_start + size, block_stop)
+    while window_start < block_stop:
+        last = window_stop == block_stop
+        for i in range(window_start, window_stop):
+            if loc[i]:
+                for j in range(i + 1, window_stop):
+                    if loc[j] and linked[i - offset, j - i - 1]:
+                        loc[j] = False
+        if last:
+            break
+        window_start += step
+        window_stop = min(window_start + size, block_stop)
+
+
+def _parallelism():
+    """ Returns the number of threads of the connected distributed cluster, or of this machine. """
+    client = dask_diagnostics.current_client()
+    if client is not None:
+        return max(sum(client.nthreads().values()), 1)
+    return os.cpu_count() or 1
+
+
+def locate_unlinked(gn, size=100, step=20, threshold=.1, blen=None, n_parallel_chunks=None):
+    """
+    Locates variants in approximate linkage equilibrium, where r**2 is below the given threshold. Equivalent to
+    allel.locate_unlinked(), but computes the pairwise r**2 values chunk by chunk in parallel using Dask.
+    :param gn: Dask array of alternate allele counts with shape (n_variants, n_samples)
+    :param size: window size (number of variants)
+    :param step: number of variants to advance to the next window
+    :param threshold: maximum value of r**2 to include variants
+    :param blen: block length used by the equivalent in-memory computation. If None, defaults to the chunk length.
+    :param n_parallel_chunks: number of chunks to compute at a time. If None, defaults to the number of threads of
+                              the connected distributed cluster (or of this machine).
+    :type gn: dask.array.Array
+    :return: bool array locating unlinked variants
+    """
+    if gn.ndim != 2:
+        raise ValueError('gn must have two dimensions')
+
+    n_variants = gn.shape[0]
+    if blen is None:
+        blen = gn.chunks[0][0] if len(gn.chunks[0]) > 0 else size
+    blen = max(blen, 10 * size)  # Mirror scikit-allel's minimum block length
+    if n_parallel_chunks is None:
+        n_parallel_chunks = _parallelism()
+
+    chunk_bounds = []
+    chunk_start = 0
+    for chunk_length in gn.chunks[0]:
+        chunk_bounds.append((chunk_start, chunk_start + chunk_length))
+        chunk_start += chunk_length
+
+    loc = np.ones(n_variants, dtype=bool)
+    linked = np.zeros((0, max(size - 1, 0)), dtype=bool)  # Linked pairs of variants offset onwards
+    offset = 0
+    block_start = 0
+    for group_start in range(0, len(chunk_bounds), n_parallel_chunks):
+        # Compute linked pairs for a group of chunks, each overlapping into the next chunk(s) by one window
+        tasks = [dask.delayed(_linked_band)(gn[start:min(n_variants, stop + size - 1)], stop - start, size, threshold)
+                 for start, stop in chunk_bounds[group_start:group_start + n_parallel_chunks]]
+        linked = np.concatenate([linked] + list(dask.compute(*tasks)), axis=0)
+        available = offset + linked.shape[0]
+
+        # Replay each block whose linked pairs are all available, then drop the pairs which no later block uses
+        while block_start < n_variants:
+            block_stop = min(n_variants, block_start + blen + size)
+            if block_stop > available:
+                break
+            _replay_block(linked, offset, loc, block_start, block_stop, size, step)
+            block_start += blen
+        linked = linked[min(block_start, available) - offset:]
+        offset = min(block_start, available)
+    return loc
@@ -0,0 +1,123 @@
+""" On-disk cache of the PCA input matrix: the filtered (and optionally subset and LD pruned) alternate allele counts,
+stored in Zarr as int8. Entries are keyed on a hash of the parameters which determine the matrix (data set, filters,
+subset and LD pruning settings), so later runs, and runs with a different data scaler, can start from the cached
+matrix instead of repeating the filtering and transformation. Entries are written to a temporary location and then
+renamed, so an interrupted write never leaves a partial entry behind. """
+
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import dask.array as da
+import zarr
+from genben import config
+
+
+def dataset_fingerprint(paths):
+    """
+    Identifies the source data of a benchmark by the names, sizes and modification times of its files, so that a
+    changed data set does not match an existing cache entry. Directories (e.g. Zarr data sets) are walked, as their
+    own size and modification time do not change when the files inside them are rewritten.
+    :param paths: list of file or directory paths of the source data
+    :return: list of [path, digest] entries, with a digest of None for paths which do not exist
+    """
+    fingerprint = []
+    for path in sorted(paths):
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            files = []
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    file_path = os.path.join(dir_path, file_name)
+                    stat = os.stat(file_path)
+                    files.append([os.path.relpath(file_path, path), stat.st_size, stat.st_mtime])
+            fingerprint.append([path, cache_key(files)])
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint.append([path, cache_key([stat.st_size, stat.st_mtime])])
+        else:
+            fingerprint.append([path, None])
+    return fingerprint
+
+
+def cache_key(params):
+    """
+    Computes the key of a cache entry from the parameters which determine its contents.
+    :param params: JSON-serializable dictionary of parameters
+    :return: hexadecimal digest string
+    """
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class NAltMatrixCache:
+    """ Stores and loads alternate allele count matrices in Zarr format under a cache directory. """
+
+    def __init__(self, cache_dir):
+        """
+        :param cache_dir: directory in which to store cache entries
+        :type cache_dir: str
+        """
+        self.cache_dir = cache_dir
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, '{}.zarr'.format(key))
+
+    def __contains__(self, key):
+        return os.path.isdir(self.path(key))
+
+    def load(self, key, genotype_array_type):
+        """
+        Loads a cached matrix in the form used by the given genotype array type: a numpy array for normal and packed
+        genotype arrays, the Zarr array itself for chunked genotype arrays, and a Dask array otherwise.
+        :param key: cache key, as returned by cache_key()
+        :param genotype_array_type: genotype array type used by the benchmark
+        :return: alternate allele counts with shape (n_variants, n_samples), or None if there is no such entry
+        """
+        if key not in self:
+            return None
+        z = zarr.open(os.path.join(self.path(key), 'n_alt'), mode='r')
+        if genotype_array_type == config.GENOTYPE_ARRAY_DASK:
+            return da.from_zarr(z)
+        elif genotype_array_type == config.GENOTYPE_ARRAY_CHUNKED:
+            return z
+        return z[:]
+
+    def store(self, key, gn, params=None, chunk_length=None):
+        """
+        Writes a matrix to the cache, replacing any existing entry with the same key.
+        :param key: cache key, as returned by cache_key()
+        :param gn: alternate allele counts with shape (n_variants, n_samples); numpy, Zarr, chunked or Dask array
+        :param params: parameters used to compute the key, stored alongside the matrix for reference
+        :param chunk_length: number of variants per Zarr chunk. If None, the chunk length of gn is used.
+        """
+        n_variants, n_samples = gn.shape
+        if chunk_length is None:
+            chunks = getattr(gn, 'chunks', None)
+            if chunks is None:
+                chunk_length = 10000
+            else:
+                chunk_length = chunks[0][0] if isinstance(chunks[0], tuple) else chunks[0]
+        chunk_length = max(min(chunk_length, n_variants), 1)
+
+        path = self.path(key)
+        temp_path = path + '.tmp'
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+        root = zarr.open_group(temp_path, mode='w')
+        if params is not None:
+            root.attrs['params'] = params
+        z = root.create_dataset('n_alt', shape=(n_variants, n_samples), chunks=(chunk_length, n_samples), dtype='i1')
+        if isinstance(gn, da.Array):
+            da.store(gn.astype('i1').rechunk((chunk_length, n_samples)), z, lock=False)
+        else:
+            for i in range(0, n_variants, chunk_length):
+                z[i:i + chunk_length] = np.asarray(gn[i:i + chunk_length], dtype='i1')
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(temp_path, path)
+
+    def clear(self):
+        """ Removes all cache entries. """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,168 @@
+""" Registry of benchmark operations. An operation declares the name under which it is selected in the configuration,
+the name under which its timings are recorded, the inputs it needs, and an implementation for each genotype array
+type (or one for all types), optionally with a Numba kernel used by the Numba compute engine. The benchmark prepares
+the inputs, times each selected operation and materializes its result (computing Dask-backed results), so adding an
+operation only requires registering it here or in a module listed in benchmark_operation_modules.
+
+Inputs are passed to implementations as keyword arguments:
+  - gt: the genotype array
+  - ac: allele counts per variant (in memory)
+  - gn: number of alternate alleles per call (persisted, if the genotype array is Dask-backed)
+  - positions: variant positions (in memory)
+Inputs other than gt are prepared once per benchmark run, outside the timed region of the operations using them. """
+
+import importlib
+from collections import OrderedDict
+import allel
+from genben import config, kernels
+
+OPERATION_INPUTS = OrderedDict([('gt', 'Genotype Array'),
+                                ('ac', 'Allele Counts'),
+                                ('gn', 'Alternate Allele Counts per Call'),
+                                ('positions', 'Variant Positions')])
+
+# Key of the implementation used for genotype array types without a specific implementation
+ANY_ARRAY_TYPE = None
+
+_operations = OrderedDict()
+
+
+class Operation:
+    """ A benchmark operation. """
+
+    def __init__(self, key, name, inputs, implementations, kernel=None, tags=(), group=None):
+        """
+        :param key: name used to select the operation in the configuration
+        :param name: name under which the operation's timings are recorded
+        :param inputs: names of the inputs passed to the implementations, from OPERATION_INPUTS
+        :param implementations: dictionary mapping genotype array types (config.GENOTYPE_ARRAY_*) to implementations,
+                                each a callable taking the inputs as keyword arguments; the implementation for
+                                ANY_ARRAY_TYPE is used for types without a specific implementation
+        :param kernel: implementation used by the Numba compute engine, for all genotype array types. Its result is
+                       cross-checked against the array type's implementation if cross-checking is enabled.
+        :param tags: names of groups of operations which the operation is selected with
+        :param group: name of an operation which the timings of consecutive operations of the group are nested in
+        :type key: str
+        :type name: str
+        :type inputs: list
+        :type implementations: dict
+        :type kernel: callable
+        :type tags: tuple
+        :type group: str
+        """
+        self.key = key
+        self.name = name
+        self.inputs = list(inputs)
+        self.implementations = dict(implementations)
+        self.kernel = kernel
+        self.tags = tuple(tags)
+        self.group = group
+
+    def implementation(self, genotype_array_type):
+        """
+        :param genotype_array_type: genotype array type (config.GENOTYPE_ARRAY_*)
+        :return: the implementation for the genotype array type, or None if the operation does not support it
+        """
+        return self.implementations.get(genotype_array_type, self.implementations.get(ANY_ARRAY_TYPE))
+
+
+def register_operation(operation):
+    """
+    Adds an operation to the registry. Operations run in the order in which they are registered.
+    :param operation: the operation
+    :type operation: Operation
+    :return: the operation
+    """
+    if operation.key in _operations:
+        raise ValueError('A benchmark operation named {} is already registered.'.format(operation.key))
+    if operation.key in operation_tags():
+        raise ValueError('Benchmark operation name {} is already used as a tag.'.format(operation.key))
+    for tag in operation.tags:
+        if tag in _operations:
+            raise ValueError('Tag {} is already used as a benchmark operation name.'.format(tag))
+    for name in operation.inputs:
+        if name not in OPERATION_INPUTS:
+            raise ValueError('Unknown input {} of benchmark operation {} (expected one of {}).'.format(
+                name, operation.key, ', '.join(OPERATION_INPUTS.keys())))
+    if len(operation.implementations) == 0 and operation.kernel is None:
+        raise ValueError('Benchmark operation {} has no implementations.'.format(operation.key))
+    _operations[operation.key] = operation
+    return operation
+
+
+def registered_operations():
+    """
+    :return: list of the registered operations, in registration order
+    """
+    return list(_operations.values())
+
+
+def operation_tags():
+    """
+    :return: set of the tags of the registered operations
+    """
+    return set(tag for operation in _operations.values() for tag in operation.tags)
+
+
+def select_operations(selectors):
+    """
+    Selects the operations with the given names, or with any of the given tags.
+    :param selectors: operation names and tags
+    :type selectors: list
+    :return: list of the selected operations, in registration order
+    """
+    for selector in selectors:
+        if selector not in _operations and selector not in operation_tags():
+            raise ValueError('Unknown benchmark operation or tag: {}'.format(selector))
+    selectors = set(selectors)
+    return [operation for operation in _operations.values()
+            if operation.key in selectors or selectors.intersection(operation.tags)]
+
+
+def import_operation_modules(module_names):
+    """
+    Imports modules which register additional operations.
+    :param module_names: names of the modules
+    :type module_names: list
+    """
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            raise ValueError('Could not import benchmark operation module {}: {}'.format(module_name, e))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Built-in operations
+# ----------------------------------------------------------------------------------------------------------------------
+
+for _key, _name, _implementation, _kernel in [
+        ('allele_count', 'Allele Count (All Samples)',
+         lambda gt: gt.count_alleles(), lambda gt: kernels.count_alleles(gt)),
+        ('count_het_per_variant', 'Genotype Count: Heterozygous per Variant',
+         lambda gt: gt.count_het(axis=1), lambda gt: kernels.count_het(gt, axis=1)),
+        ('count_hom_per_variant', 'Genotype Count: Homozygous per Variant',
+         lambda gt: gt.count_hom(axis=1), lambda gt: kernels.count_hom(gt, axis=1)),
+        ('count_het_per_sample', 'Genotype Count: Heterozygous per Sample',
+         lambda gt: gt.count_het(axis=0), lambda gt: kernels.count_het(gt, axis=0)),
+        ('count_hom_per_sample', 'Genotype Count: Homozygous per Sample',
+         lambda gt: gt.count_hom(axis=0), lambda gt: kernels.count_hom(gt, axis=0))]:
+    register_operation(Operation(key=_key, name=_name, inputs=['gt'], implementations={ANY_ARRAY_TYPE: _implementation},
+                                 kernel=_kernel, tags=('aggregations',), group='Simple aggregations'))
+
+register_operation(Operation(key='allele_frequencies', name='Statistics: Allele Frequencies', inputs=['ac'],
+                             implementations={ANY_ARRAY_TYPE: lambda ac: ac.to_frequencies()},
+                             tags=('statistics',), group='Statistics'))
+# Chunked arrays have no mean, so they are summed block-wise instead
+register_operation(Operation(key='mean_n_alt_per_sample', name='Statistics: Mean Alternate Allele Count per Sample',
+                             inputs=['gn'],
+                             implementations={config.GENOTYPE_ARRAY_CHUNKED:
+                                              lambda gn: allel.chunked.asum(gn, axis=0)[:] / gn.shape[0],
+                                              ANY_ARRAY_TYPE: lambda gn: gn.mean(axis=0)},
+                             tags=('statistics',), group='Statistics'))
+# Positions must be increasing, i.e. the dataset must cover a single chromosome
+register_operation(Operation(key='sequence_diversity', name='Statistics: Sequence Diversity',
+                             inputs=['positions', 'ac'],
+                             implementations={ANY_ARRAY_TYPE: lambda positions, ac: allel.sequence_diversity(positions,
+                                                                                                             ac)},
+                             tags=('statistics',), group='Statistics'))
@@ -0,0 +1,308 @@
+""" 2-bit packed representation of diploid genotype data. Each biallelic call is stored across two bit-planes
+(one bit per sample in each), so that het/hom/allele counts can be computed using bitwise operations and popcounts
+instead of scanning int8 genotype values. Variants which cannot be represented in two bits (multiallelic sites or
+partially missing calls) are kept unpacked in a small fallback array. """
+
+import numpy as np
+import allel
+
+# Call encoding (lo, hi): hom ref = (0, 0), het = (1, 0), hom alt = (1, 1), missing = (0, 1)
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(packed, axis):
+        return np.bitwise_count(packed).sum(axis=axis, dtype=np.int64)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount(packed, axis):
+        return _POPCOUNT_TABLE[packed].sum(axis=axis, dtype=np.int64)
+
+
+def _unpack(packed, n_samples):
+    """
+    Unpacks bit-planes packed along samples, dropping the padding bits of the last byte.
+    :param packed: packed bit-plane with shape (n_variants, ceil(n_samples / 8))
+    :param n_samples: number of samples
+    :return: uint8 array with shape (n_variants, n_samples)
+    """
+    # np.unpackbits() only accepts a count from numpy 1.17
+    return np.unpackbits(packed, axis=1)[:, :n_samples]
+
+
+def _encode_block(g):
+    """
+    Encodes a block of diploid genotype data into packed bit-planes.
+    :param g: int8 genotype block with shape (n_variants, n_samples, 2)
+    :return: tuple (lo, hi, fallback) where lo and hi are packed along samples and fallback is a boolean mask of
+             variants that must be stored unpacked
+    """
+    a = g[:, :, 0]
+    b = g[:, :, 1]
+    missing_a = a < 0
+    missing_b = b < 0
+    missing = missing_a | missing_b
+    fallback = np.any((a > 1) | (b > 1) | (missing_a != missing_b), axis=1)
+    n_alt = (a > 0).astype(np.int8) + (b > 0)
+
+    lo = ~missing & (n_alt >= 1)
+    hi = missing | (n_alt == 2)
+
+    # Fallback variants are encoded as missing so that they do not contribute to per-sample counts
+    lo[fallback] = False
+    hi[fallback] = True
+
+    return np.packbits(lo, axis=1), np.packbits(hi, axis=1), fallback
+
+
+class PackedGenotypeArray:
+    """ Diploid genotype array stored as two packed bit-planes, with an unpacked fallback for variants that are
+    multiallelic or contain partially missing calls. """
+
+    ploidy = 2
+
+    def __init__(self, lo, hi, n_samples, fallback_index, fallback_values):
+        """
+        :param lo: packed low bit-plane with shape (n_variants, ceil(n_samples / 8))
+        :param hi: packed high bit-plane with shape (n_variants, ceil(n_samples / 8))
+        :param n_samples: number of samples represented in the bit-planes
+        :param fallback_index: sorted indices of variants stored unpacked
+        :param fallback_values: int8 genotype data of the fallback variants, with shape (n_fallback, n_samples, 2)
+        :type lo: numpy.ndarray
+        :type hi: numpy.ndarray
+        :type n_samples: int
+        :type fallback_index: numpy.ndarray
+        :type fallback_values: numpy.ndarray
+        """
+        self.lo = lo
+        self.hi = hi
+        self.n_samples = n_samples
+        self.fallback_index = fallback_index
+        self.fallback_values = fallback_values
+
+    @classmethod
+    def from_genotypes(cls, g, blen=None):
+        """
+        Creates a packed genotype array from int8 genotype data, encoding it block by block.
+        :param g: genotype data with shape (n_variants, n_samples, 2), e.g. a Zarr array or numpy array
+        :param blen: number of variants to encode per block. If None, the chunk length of g is used.
+        :return: PackedGenotypeArray
+        """
+        if len(g.shape) != 3 or g.shape[2] != 2:
+            raise ValueError('Packed genotype arrays only support diploid genotype data.')
+
+        n_variants, n_samples = g.shape[0], g.shape[1]
+        if blen is None:
+            blen = g.chunks[0] if getattr(g, 'chunks', None) is not None else 10000
+
+        lo_blocks, hi_blocks, fallback_index, fallback_values = [], [], [], []
+        for i in range(0, n_variants, blen):
+            block = np.asarray(g[i:i + blen])
+            lo, hi, fallback = _encode_block(block)
+            lo_blocks.append(lo)
+            hi_blocks.append(hi)
+            fallback_index.append(np.flatnonzero(fallback) + i)
+            fallback_values.append(block[fallback])
+
+        n_bytes = (n_samples + 7) // 8
+        if n_variants == 0:
+            return cls(lo=np.zeros((0, n_bytes), dtype=np.uint8),
+                       hi=np.zeros((0, n_bytes), dtype=np.uint8),
+                       n_samples=n_samples,
+                       fallback_index=np.zeros(0, dtype=np.int64),
+                       fallback_values=np.zeros((0, n_samples, 2), dtype=np.int8))
+
+        return cls(lo=np.concatenate(lo_blocks, axis=0),
+                   hi=np.concatenate(hi_blocks, axis=0),
+                   n_samples=n_samples,
+                   fallback_index=np.concatenate(fallback_index).astype(np.int64),
+                   fallback_values=np.concatenate(fallback_values, axis=0).astype(np.int8))
+
+    @classmethod
+    def concatenate(cls, arrays):
+        """
+        Concatenates packed genotype arrays along the variants axis.
+        :type arrays: list of PackedGenotypeArray
+        :return: PackedGenotypeArray
+        """
+        n_samples = arrays[0].n_samples
+        if any(a.n_samples != n_samples for a in arrays):
+            raise ValueError('Packed genotype arrays must have the same number of samples to be concatenated.')
+
+        offsets = np.cumsum([0] + [a.n_variants for a in arrays[:-1]])
+        return cls(lo=np.concatenate([a.lo for a in arrays], axis=0),
+                   hi=np.concatenate([a.hi for a in arrays], axis=0),
+                   n_samples=n_samples,
+                   fallback_index=np.concatenate([a.fallback_index + o for a, o in zip(arrays, offsets)]),
+                   fallback_values=np.concatenate([a.fallback_values for a in arrays], axis=0))
+
+    @property
+    def n_variants(self):
+        return self.lo.shape[0]
+
+    @property
+    def shape(self):
+        return self.n_variants, self.n_samples, self.ploidy
+
+    @property
+    def nbytes(self):
+        return self.lo.nbytes + self.hi.nbytes + self.fallback_index.nbytes + self.fallback_values.nbytes
+
+    @property
+    def nbytes_unpacked(self):
+        """ Number of bytes the same data occupies as an int8 genotype array. """
+        return self.n_variants * self.n_samples * self.ploidy
+
+    def _fallback_genotypes(self):
+        return allel.GenotypeArray(self.fallback_values)
+
+    def _select_variants(self, index):
+        """ Returns a new packed array with the variants at the given sorted integer indices. """
+        index = np.asarray(index, dtype=np.int64)
+        keep = np.isin(self.fallback_index, index)
+        positions = np.searchsorted(index, self.fallback_index[keep])
+        return PackedGenotypeArray(lo=self.lo[index],
+                                   hi=self.hi[index],
+                                   n_samples=self.n_samples,
+                                   fallback_index=positions.astype(np.int64),
+                                   fallback_values=self.fallback_values[keep])
+
+    def compress(self, condition, axis=0):
+        if axis != 0:
+            raise NotImplementedError('Packed genotype arrays only support selection along the variants axis.')
+        return self._select_variants(np.flatnonzero(np.asarray(condition)))
+
+    def take(self, indices, axis=0):
+        if axis != 0:
+            raise NotImplementedError('Packed genotype arrays only support selection along the variants axis.')
+        indices = np.asarray(indices)
+        if np.any(np.diff(indices) <= 0):
+            raise ValueError('Indices must be sorted and unique when taking from a packed genotype array.')
+        return self._select_variants(indices)
+
+    def __getitem__(self, item):
+        if not isinstance(item, tuple):
+            item = (item,)
+        if len(item) > 2 or not all(isinstance(s, slice) and s.step in (None, 1) for s in item):
+            raise IndexError('Packed genotype arrays only support contiguous slicing of variants and samples.')
+
+        variant_slice = item[0]
+        out = self._select_variants(np.arange(self.n_variants)[variant_slice])
+
+        if len(item) == 2 and item[1] != slice(None):
+            sample_index = np.arange(self.n_samples)[item[1]]
+            n_samples = len(sample_index)
+            out = PackedGenotypeArray(
+                lo=np.packbits(_unpack(out.lo, self.n_samples)[:, sample_index], axis=1),
+                hi=np.packbits(_unpack(out.hi, self.n_samples)[:, sample_index], axis=1),
+                n_samples=n_samples,
+                fallback_index=out.fallback_index,
+                fallback_values=out.fallback_values[:, sample_index])
+        return out
+
+    def _count_per_sample(self, plane_fn, blen=10000):
+        out = np.zeros(self.n_samples, dtype=np.int64)
+        for i in range(0, self.n_variants, blen):
+            plane = plane_fn(self.lo[i:i + blen], self.hi[i:i + blen])
+            out += _unpack(plane, self.n_samples).sum(axis=0, dtype=np.int64)
+        return out
+
+    def max(self):
+        """ Returns the highest allele index present in the data (-1 if all calls are missing). """
+        fallback_max = int(self.fallback_values.max()) if self.fallback_values.size > 0 else -1
+        if np.any(self.lo):
+            packed_max = 1
+        elif _popcount(~self.lo & self.hi, axis=None) < self.n_variants * self.n_samples:
+            packed_max = 0
+        else:
+            packed_max = -1
+        return max(packed_max, fallback_max)
+
+    def count_alleles(self, max_allele=None):
+        """
+        Counts the number of calls of each allele per variant.
+        :return: allel.AlleleCountsArray
+        """
+        if max_allele is None:
+            max_allele = self.max()
+        max_allele = max(max_allele, 0)
+
+        lo, hi = self.lo, self.hi
+        n_het = _popcount(lo & ~hi, axis=1)
+        n_hom_alt = _popcount(lo & hi, axis=1)
+        n_missing = _popcount(~lo & hi, axis=1)
+        n_hom_ref = self.n_samples - n_missing - n_het - n_hom_alt
+
+        out = np.zeros((self.n_variants, max_allele + 1), dtype=np.int32)
+        out[:, 0] = 2 * n_hom_ref + n_het
+        if max_allele >= 1:
+            out[:, 1] = 2 * n_hom_alt + n_het
+        if len(self.fallback_index) > 0:
+            out[self.fallback_index] = self._fallback_genotypes().count_alleles(max_allele=max_allele)
+        return allel.AlleleCountsArray(out)
+
+    def count_het(self, axis=None):
+        """
+        Counts heterozygous calls.
+        :param axis: 1 to count per variant, 0 to count per sample
+        """
+        if axis == 1:
+            out = _popcount(self.lo & ~self.hi, axis=1)
+        elif axis == 0:
+            out = self._count_per_sample(lambda lo, hi: lo & ~hi)
+        else:
+            raise ValueError('Packed genotype arrays only support counting along axis 0 or 1.')
+
+        if len(self.fallback_index) > 0:
+            if axis == 1:
+                out[self.fallback_index] = self._fallback_genotypes().count_het(axis=1)
+            else:
+                out += self._fallback_genotypes().count_het(axis=0)
+        return out
+
+    def count_hom(self, axis=None):
+        """
+        Counts homozygous calls.
+        :param axis: 1 to count per variant, 0 to count per sample
+        """
+        if axis == 1:
+            n_het = _popcount(self.lo & ~self.hi, axis=1)
+            n_missing = _popcount(~self.lo & self.hi, axis=1)
+            out = self.n_samples - n_missing - n_het
+        elif axis == 0:
+            out = self._count_per_sample(lambda lo, hi: ~(lo ^ hi))
+        else:
+            raise ValueError('Packed genotype arrays only support counting along axis 0 or 1.')
+
+        if len(self.fallback_index) > 0:
+            if axis == 1:
+                out[self.fallback_index] = self._fallback_genotypes().count_hom(axis=1)
+            else:
+                out += self._fallback_genotypes().count_hom(axis=0)
+        return out
+
+    def to_n_alt(self):
+        """
+        Transforms genotype calls into the number of non-reference alleles per call.
+        :return: int8 array with shape (n_variants, n_samples)
+        """
+        out = _unpack(self.lo, self.n_samples).astype(np.int8)
+        out += _unpack(self.lo & self.hi, self.n_samples).astype(np.int8)
+        if len(self.fallback_index) > 0:
+            out[self.fallback_index] = self._fallback_genotypes().to_n_alt()
+        return out
+
+    def to_genotype_array(self):
+        """
+        Unpacks the data into a scikit-allel genotype array (mainly for verification purposes). Phase is not
+        preserved for packed variants: heterozygous calls are returned as 0/1.
+        :return: allel.GenotypeArray
+        """
+        lo = _unpack(self.lo, self.n_samples).astype(bool)
+        hi = _unpack(self.hi, self.n_samples).astype(bool)
+        g = np.zeros((self.n_variants, self.n_samples, 2), dtype=np.int8)
+        g[:, :, 1] = lo
+        g[:, :, 0] = lo & hi
+        g[~lo & hi] = -1
+        if len(self.fallback_index) > 0:
+            g[self.fallback_index] = self.fallback_values
+        return allel.GenotypeArray(g)
@@ -0,0 +1,305 @@
+""" Alternative PCA engines for the benchmark. Both engines stream the (n_variants, n_samples) alternate allele
+count matrix block by block and scale each block independently, so their memory use does not grow with the number of
+variants:
+
+- The Gram-matrix engine accumulates the (n_samples, n_samples) Gram matrix, which is then eigendecomposed.
+- The incremental engine maintains a truncated SVD of the samples x variants matrix, updated with each block. It
+  holds only one block plus O(n_samples * n_components) of model state.
+
+The module also provides a registry of truncated SVD solvers (PCA_SOLVERS), which operate on the scaled matrix in
+memory and can be run via solver_pca() and compared against the exact solution.
+
+All engines compute in double precision by default; single precision (dtype=np.float32) halves their memory use and
+bandwidth compared with double precision, and projection_error() can be used to compare the resulting coordinates
+against double precision ones. (scikit-allel's own scalers instead cast integer input to half precision.) """
+
+from collections import OrderedDict
+import numpy as np
+import scipy.linalg
+import scipy.sparse.linalg
+import dask
+import dask.array as da
+
+
+class PCAModel:
+    """ Minimal fitted PCA model, mirroring the attributes of scikit-allel's PCA models used by the benchmark. """
+
+    def __init__(self, explained_variance, explained_variance_ratio):
+        self.explained_variance_ = explained_variance
+        self.explained_variance_ratio_ = explained_variance_ratio
+
+
+def scale_block(block, scaler, ploidy=2, dtype=np.float64):
+    """
+    Applies per-variant scaling to a block of alternate allele counts, matching scikit-allel's scalers.
+    Variants with zero variance are set to zero (scikit-allel would produce non-finite values for these).
+    :param block: alternate allele counts with shape (n_variants, n_samples)
+    :param scaler: 'standard', 'patterson' or None
+    :param ploidy: sample ploidy (used by the Patterson scaler)
+    :param dtype: floating point type used for the scaled values
+    :return: numpy array of dtype with the same shape as block
+    """
+    x = np.array(block, dtype=dtype)
+    if scaler is None:
+        return x
+
+    mean = np.mean(x, axis=1, keepdims=True)
+    if scaler == 'standard':
+        std = np.std(x, axis=1, keepdims=True)
+    elif scaler == 'patterson':
+        p = mean / ploidy
+        std = np.sqrt(p * (1 - p))
+    else:
+        raise ValueError('Unexpected scaler type specified: {}'.format(scaler))
+
+    x -= mean
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x /= std
+    x[~np.isfinite(x)] = 0
+    return x
+
+
+def _block_gram(block, scaler, ploidy, dtype):
+    x = scale_block(block, scaler, ploidy, dtype)
+    return np.dot(x.T, x)
+
+
+def _tree_sum(items):
+    """ Sums Dask delayed items pairwise, so that only a few partial results are held at once. """
+    while len(items) > 1:
+        items = [dask.delayed(np.add)(items[i], items[i + 1]) if i + 1 < len(items) else items[i]
+                 for i in range(0, len(items), 2)]
+    return items[0]
+
+
+def _block_length(gn, blen):
+    if blen is not None:
+        return blen
+    chunks = getattr(gn, 'chunks', None)
+    if chunks is None:
+        return 10000
+    return chunks[0][0] if isinstance(chunks[0], tuple) else chunks[0]
+
+
+def _iter_blocks(gn, blen=None):
+    """ Yields numpy blocks of gn along the variants axis, computing one block at a time for Dask arrays. """
+    if isinstance(gn, da.Array):
+        for block in gn.rechunk({1: -1}).to_delayed().ravel():
+            yield np.asarray(block.compute())
+        return
+
+    blen = _block_length(gn, blen)
+    for i in range(0, gn.shape[0], blen):
+        yield np.asarray(gn[i:i + blen])
+
+
+def gram_matrix(gn, scaler='patterson', ploidy=2, blen=None, dtype=np.float64):
+    """
+    Accumulates the scaled (n_samples, n_samples) Gram matrix of gn block by block.
+    For Dask arrays, the contribution of each chunk is computed in parallel and summed as a tree.
+    :param gn: alternate allele counts with shape (n_variants, n_samples); numpy, Zarr, chunked or Dask array
+    :param scaler: 'standard', 'patterson' or None
+    :param ploidy: sample ploidy
+    :param blen: number of variants per block for non-Dask input. If None, the chunk length is used.
+    :param dtype: floating point type used for scaling and accumulation
+    :return: numpy array of dtype with shape (n_samples, n_samples)
+    """
+    n_samples = gn.shape[1]
+
+    if isinstance(gn, da.Array):
+        blocks = gn.rechunk({1: -1}).to_delayed().ravel()
+        if len(blocks) == 0:
+            return np.zeros((n_samples, n_samples), dtype=dtype)
+        return _tree_sum([dask.delayed(_block_gram)(block, scaler, ploidy, dtype) for block in blocks]).compute()
+
+    gram = np.zeros((n_samples, n_samples), dtype=dtype)
+    for block in _iter_blocks(gn, blen):
+        gram += _block_gram(block, scaler, ploidy, dtype)
+    return gram
+
+
+def gram_pca(gn, n_components=10, scaler='patterson', ploidy=2, blen=None, dtype=np.float64):
+    """
+    Performs PCA by eigendecomposition of the streamed Gram matrix. Equivalent to the conventional SVD-based PCA
+    (up to the sign of each component), but never holds more than one block of variants in memory.
+    :param gn: alternate allele counts with shape (n_variants, n_samples)
+    :param n_components: number of components to keep
+    :param scaler: 'standard', 'patterson' or None
+    :param ploidy: sample ploidy
+    :param blen: number of variants per block for non-Dask input. If None, the chunk length is used.
+    :param dtype: floating point type used for scaling, accumulation and eigendecomposition
+    :return: tuple (coords, model) where coords has shape (n_samples, n_components)
+    """
+    gram = gram_matrix(gn, scaler=scaler, ploidy=ploidy, blen=blen, dtype=dtype)
+    n_samples = gram.shape[0]
+    n_components = min(n_components, n_samples)
+
+    # The Gram matrix is only samples x samples, so all eigenpairs are computed (eigh returns them in ascending order)
+    eigenvalues, eigenvectors = np.linalg.eigh(gram)
+    order = np.argsort(eigenvalues)[::-1][:n_components]
+    eigenvalues = np.clip(eigenvalues[order], 0, None)
+    eigenvectors = eigenvectors[:, order]
+
+    coords = eigenvectors * np.sqrt(eigenvalues)
+    explained_variance = eigenvalues / n_samples
+    total_variance = np.trace(gram) / n_samples
+    explained_variance_ratio = explained_variance / total_variance if total_variance > 0 else explained_variance
+
+    return coords, PCAModel(explained_variance=explained_variance,
+                            explained_variance_ratio=explained_variance_ratio)
+
+
+def incremental_pca(gn, n_components=10, scaler='patterson', ploidy=2, blen=None, n_oversamples=10,
+                    dtype=np.float64):
+    """
+    Performs PCA by incrementally updating a truncated SVD of the scaled samples x variants matrix with each block of
+    variants. After each update, n_components + n_oversamples singular vectors are retained; the result is exact if
+    this is at least the number of samples, and otherwise approximates the leading components.
+    :param gn: alternate allele counts with shape (n_variants, n_samples); numpy, Zarr, chunked or Dask array
+    :param n_components: number of components to keep
+    :param scaler: 'standard', 'patterson' or None
+    :param ploidy: sample ploidy
+    :param blen: number of variants per block for non-Dask input. If None, the chunk length is used.
+    :param n_oversamples: number of additional singular vectors retained between updates
+    :param dtype: floating point type used for scaling and the SVD updates
+    :return: tuple (coords, model) where coords has shape (n_samples, n_components)
+    """
+    n_samples = gn.shape[1]
+    n_components = min(n_components, n_samples)
+    rank = min(n_components + n_oversamples, n_samples)
+
+    u = np.zeros((n_samples, 0), dtype=dtype)
+    s = np.zeros(0, dtype=dtype)
+    total_sum_squares = 0.0
+    for block in _iter_blocks(gn, blen):
+        x = scale_block(block, scaler, ploidy, dtype)
+        total_sum_squares += float(np.einsum('ij,ij->', x, x, dtype=np.float64))
+        u, s, _ = scipy.linalg.svd(np.hstack([u * s, x.T]), full_matrices=False)
+        u, s = u[:, :rank], s[:rank]
+
+    # Pad with zero components if fewer variants than components were seen
+    if s.shape[0] < n_components:
+        u = np.hstack([u, np.zeros((n_samples, n_components - s.shape[0]), dtype=dtype)])
+        s = np.concatenate([s, np.zeros(n_components - s.shape[0], dtype=dtype)])
+
+    coords = u[:, :n_components] * s[:n_components]
+    explained_variance = s[:n_components] ** 2 / n_samples
+    total_variance = total_sum_squares / n_samples
+    explained_variance_ratio = explained_variance / total_variance if total_variance > 0 else explained_variance
+
+    return coords, PCAModel(explained_variance=explained_variance,
+                            explained_variance_ratio=explained_variance_ratio)
+
+
+def projection_error(coords, reference):
+    """
+    Computes the relative error of PCA coordinates against reference coordinates (e.g. from a double precision run),
+    after aligning the sign of each component with the reference.
+    :param coords: coordinates with shape (n_samples, n_components)
+    :param reference: reference coordinates with the same shape
+    :return: Frobenius norm of the difference divided by the Frobenius norm of the reference
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    reference = np.asarray(reference, dtype=np.float64)
+    signs = np.where(np.sum(coords * reference, axis=0) < 0, -1, 1)
+    norm = np.linalg.norm(reference)
+    error = np.linalg.norm(coords * signs - reference)
+    return error / norm if norm > 0 else error
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Truncated SVD solvers
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _svd_exact(x, n_components, n_oversamples, n_iter, random_state):
+    u, s, _ = scipy.linalg.svd(x, full_matrices=False)
+    return u[:, :n_components], s[:n_components]
+
+
+def _svd_arpack(x, n_components, n_oversamples, n_iter, random_state):
+    if n_components >= min(x.shape):
+        # ARPACK requires n_components < min(x.shape)
+        return _svd_exact(x, n_components, n_oversamples, n_iter, random_state)
+    v0 = random_state.uniform(-1, 1, size=min(x.shape)).astype(x.dtype)
+    u, s, _ = scipy.sparse.linalg.svds(x, k=n_components, solver='arpack', v0=v0)
+    order = np.argsort(s)[::-1]
+    return u[:, order], s[order]
+
+
+def _svd_block_krylov(x, n_components, n_oversamples, n_iter, random_state):
+    """ Randomized block Krylov method (Musco and Musco, 2015), with the block re-orthonormalized at each step. """
+    block_size = min(n_components + n_oversamples, min(x.shape))
+    q, _ = scipy.linalg.qr(np.dot(x, random_state.normal(size=(x.shape[1], block_size)).astype(x.dtype)),
+                           mode='economic')
+    blocks = [q]
+    for i in range(n_iter):
+        q, _ = scipy.linalg.qr(np.dot(x, np.dot(x.T, q)), mode='economic')
+        blocks.append(q)
+    q, _ = scipy.linalg.qr(np.hstack(blocks), mode='economic')
+    u, s, _ = scipy.linalg.svd(np.dot(q.T, x), full_matrices=False)
+    return np.dot(q, u[:, :n_components]), s[:n_components]
+
+
+def _svd_randomized(x, n_components, n_oversamples, n_iter, random_state):
+    from sklearn.utils.extmath import randomized_svd
+    u, s, _ = randomized_svd(x, n_components, n_oversamples=n_oversamples, n_iter=n_iter,
+                             random_state=random_state)
+    return u, s
+
+
+PCA_SOLVERS = OrderedDict([('exact', _svd_exact),
+                           ('arpack', _svd_arpack),
+                           ('block_krylov', _svd_block_krylov),
+                           ('randomized', _svd_randomized)])
+
+
+def solver_pca(gn, n_components=10, scaler='patterson', ploidy=2, solver='exact', n_oversamples=10, n_iter=4,
+               random_state=0, dtype=np.float64):
+    """
+    Performs PCA with a truncated SVD solver from PCA_SOLVERS. The scaled matrix is held in memory (Dask input is
+    computed first).
+    :param gn: alternate allele counts with shape (n_variants, n_samples)
+    :param n_components: number of components to keep
+    :param scaler: 'standard', 'patterson' or None
+    :param ploidy: sample ploidy
+    :param solver: 'exact' (full SVD), 'arpack' (implicitly restarted Lanczos), 'block_krylov' or 'randomized'
+    :param n_oversamples: number of additional vectors in the random block (block Krylov and randomized solvers)
+    :param n_iter: number of power (randomized) or Krylov (block Krylov) iterations
+    :param random_state: seed for the random starting vectors
+    :param dtype: floating point type used for scaling and the SVD
+    :return: tuple (coords, model) where coords has shape (n_samples, n_components)
+    """
+    if solver not in PCA_SOLVERS:
+        raise ValueError('Unexpected PCA solver specified: {}'.format(solver))
+
+    gn = gn.compute() if isinstance(gn, da.Array) else np.asarray(gn[:])
+    x = scale_block(gn, scaler, ploidy, dtype).T
+    n_samples = x.shape[0]
+    n_components = min(n_components, min(x.shape))
+
+    u, s = PCA_SOLVERS[solver](x, n_components, n_oversamples, n_iter, np.random.RandomState(random_state))
+
+    coords = u * s
+    explained_variance = s ** 2 / n_samples
+    total_variance = float(np.einsum('ij,ij->', x, x, dtype=np.float64)) / n_samples
+    explained_variance_ratio = explained_variance / total_variance if total_variance > 0 else explained_variance
+
+    return coords, PCAModel(explained_variance=explained_variance,
+                            explained_variance_ratio=explained_variance_ratio)
+
+
+def explained_variance_deviation(model, reference):
+    """
+    Computes the largest relative deviation of the explained variance of each component from a reference model.
+    :param model: fitted PCA model
+    :param reference: reference PCA model (e.g. from the exact solver) with at least as many components
+    :return: float
+    """
+    explained_variance = np.asarray(model.explained_variance_, dtype=np.float64)
+    expected = np.asarray(reference.explained_variance_, dtype=np.float64)[:explained_variance.shape[0]]
+    if explained_variance.shape[0] == 0:
+        return 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        deviation = np.abs(explained_variance - expected) / expected
+    deviation[expected == 0] = np.abs(explained_variance - expected)[expected == 0]
+    return float(np.max(deviation))
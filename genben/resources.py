@@ -0,0 +1,240 @@
+""" Process resource measurement for benchmark operations. The peak resident set size (RSS) of an operation is found
+without sampling, by resetting the kernel's peak RSS (VmHWM, via /proc/self/clear_refs) when the operation starts and
+reading it when it stops, so that no thread competes with the timed code. Where the peak cannot be reset, the
+lifetime peak is used if it increased during the operation. I/O byte counts and context switches are read as
+cumulative counters, so the usage of an operation is the difference between readings taken before and after it. """
+
+import os
+import re
+import resource
+import tracemalloc
+
+
+def _page_size():
+    try:
+        return os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return 4096
+
+
+PAGE_SIZE = _page_size()
+
+
+def current_rss():
+    """
+    Returns the current resident set size of this process in bytes. Where /proc is not available, the lifetime peak
+    RSS reported by getrusage() is returned instead.
+    :return: int
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (IOError, OSError, IndexError, ValueError):
+        return lifetime_peak_rss()
+
+
+def lifetime_peak_rss():
+    """
+    Returns the peak resident set size of this process over its lifetime in bytes.
+    :return: int
+    """
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def high_water_mark():
+    """
+    Returns the peak resident set size of this process since it started or since the peak was last reset.
+    :return: int, or None if /proc is not available
+    """
+    try:
+        with open('/proc/self/status') as f:
+            match = re.search(r'^VmHWM:\s+(\d+)\s+kB', f.read(), re.MULTILINE)
+    except (IOError, OSError):
+        return None
+    return int(match.group(1)) * 1024 if match is not None else None
+
+
+def reset_high_water_mark():
+    """
+    Resets the peak resident set size of this process to its current RSS (Linux 4.0 or later).
+    :return: True if the peak was reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except (IOError, OSError):
+        return False
+
+
+class PeakRSSTracker:
+    """ Tracks the peak RSS of this process while it is running, without sampling. Trackers can be nested: a tracker
+    started within another (its parent) records the parent's peak before resetting it and passes on the peak it
+    observes, so the parent reports the peak over its whole duration. Where the peak cannot be reset, the lifetime
+    peak is used if it increased while tracking, and the larger of the RSS at start and stop (a lower bound) if not.
+    """
+
+    def __init__(self, parent=None):
+        """
+        :param parent: tracker which is running while this tracker runs, if any
+        :type parent: PeakRSSTracker
+        """
+        self.parent = parent
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._reset = False
+        self._lifetime_peak_start = 0
+
+    def start(self):
+        if self.parent is not None:
+            self.parent._record_peak()
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._lifetime_peak_start = lifetime_peak_rss()
+        self._reset = reset_high_water_mark()
+
+    def stop(self):
+        """
+        Stops tracking.
+        :return: peak RSS in bytes since start()
+        """
+        self._record_peak()
+        if self.parent is not None:
+            self.parent.peak_rss = max(self.parent.peak_rss, self.peak_rss)
+        return self.peak_rss
+
+    @property
+    def peak_increase(self):
+        """ Increase of the peak RSS over the RSS when tracking started, in bytes. """
+        return max(self.peak_rss - self.start_rss, 0)
+
+    def _record_peak(self):
+        peak = high_water_mark() if self._reset else None
+        if peak is None:
+            lifetime_peak = lifetime_peak_rss()
+            peak = lifetime_peak if lifetime_peak > self._lifetime_peak_start else current_rss()
+        self.peak_rss = max(self.peak_rss, peak)
+
+
+def io_counters():
+    """
+    Returns the number of bytes this process has caused to be read from and written to storage, from /proc/self/io.
+    :return: tuple (read_bytes, write_bytes), or (None, None) if the counters are not available
+    """
+    counters = {}
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                counters[name.strip()] = int(value)
+    except (IOError, OSError, ValueError):
+        return None, None
+    return counters.get('read_bytes'), counters.get('write_bytes')
+
+
+def context_switches():
+    """
+    Returns the number of context switches of this process (all threads) so far.
+    :return: tuple (voluntary, involuntary)
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw, usage.ru_nivcsw
+
+
+def _difference(end, start):
+    return end - start if end is not None and start is not None else None
+
+
+class AllocationTracer:
+    """ Traces Python memory allocations with tracemalloc and reports the peak traced memory while it is running.
+    Tracers can be nested: a tracer started within another (its parent) passes on the peak it observes, so the
+    parent reports the peak over its whole duration. Note that tracing slows down allocation-heavy code considerably.
+    """
+
+    def __init__(self, parent=None):
+        """
+        :param parent: tracer which is running while this tracer runs, if any
+        :type parent: AllocationTracer
+        """
+        self.parent = parent
+        self._peak = 0
+        self._started_tracing = False
+
+    def start(self):
+        self._peak = 0
+        if tracemalloc.is_tracing():
+            if self.parent is not None:
+                self.parent._record_peak()
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.clear_traces()
+        else:
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _record_peak(self):
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+
+    def stop(self):
+        """
+        Stops tracing (if it was started by this tracer).
+        :return: peak traced memory in bytes since start()
+        """
+        self._record_peak()
+        if self.parent is not None:
+            self.parent._peak = max(self.parent._peak, self._peak)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self._peak
+
+
+class OperationResourceMonitor:
+    """ Measures the resource usage of a single operation: peak RSS, peak traced allocations (optional), storage I/O
+    bytes and context switches. """
+
+    def __init__(self, trace_allocations=False, parent=None):
+        """
+        :param trace_allocations: whether to trace allocations with tracemalloc
+        :param parent: monitor of the enclosing operation, if this operation is nested within another
+        :type trace_allocations: bool
+        :type parent: OperationResourceMonitor
+        """
+        self.trace_allocations = trace_allocations
+        self._rss_tracker = PeakRSSTracker(parent=parent._rss_tracker if parent is not None else None)
+        if trace_allocations:
+            parent_tracer = parent._allocation_tracer if parent is not None else None
+            self._allocation_tracer = AllocationTracer(parent=parent_tracer)
+        else:
+            self._allocation_tracer = None
+        self._io_start = (None, None)
+        self._context_switches_start = (0, 0)
+
+        self.peak_rss = None
+        self.tracemalloc_peak = None
+        self.io_read_bytes = None
+        self.io_write_bytes = None
+        self.voluntary_context_switches = None
+        self.involuntary_context_switches = None
+
+    def start(self):
+        self._io_start = io_counters()
+        self._context_switches_start = context_switches()
+        if self._allocation_tracer is not None:
+            self._allocation_tracer.start()
+        self._rss_tracker.start()
+
+    def stop(self):
+        self.peak_rss = self._rss_tracker.stop()
+        if self._allocation_tracer is not None:
+            self.tracemalloc_peak = self._allocation_tracer.stop()
+
+        io_end = io_counters()
+        self.io_read_bytes = _difference(io_end[0], self._io_start[0])
+        self.io_write_bytes = _difference(io_end[1], self._io_start[1])
+
+        context_switches_end = context_switches()
+        self.voluntary_context_switches = context_switches_end[0] - self._context_switches_start[0]
+        self.involuntary_context_switches = context_switches_end[1] - self._context_switches_start[1]
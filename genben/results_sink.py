@@ -0,0 +1,279 @@
+""" Buffered output of benchmark results. Results are added to an in-memory buffer, which is written out in batches by
+a background thread, so that writing results (to CSV files and InfluxDB) happens outside of the timed operations.
+The buffer is also flushed on request (e.g. at the end of each benchmark run) and when the interpreter exits. A
+single InfluxDB client, and therefore a single HTTP connection pool, is reused for all writes. Dask diagnostics of
+operations are buffered in the same way and written as JSON lines to "<benchmark_label>_dask_diagnostics.jsonl". """
+
+import os
+import json
+import math
+import atexit
+import datetime
+import threading
+from collections import OrderedDict
+import pandas as pd
+from influxdb import InfluxDBClient
+
+
+class ResultsSink:
+    """ Buffers benchmark results and writes them to the configured outputs in batches. """
+
+    def __init__(self, output_config, benchmark_label):
+        """
+        :param output_config: results output configuration
+        :param benchmark_label: label to use when saving benchmark results
+        :type output_config: config.OutputConfigurationRepresentation
+        :type benchmark_label: str
+        """
+        self.output_config = output_config
+        self.benchmark_label = benchmark_label
+        self.batch_size = output_config.output_batch_size
+        self.flush_interval = output_config.output_flush_interval
+
+        self._rows = []
+        self._points = []
+        self._diagnostics = []
+        self._lock = threading.Lock()  # Guards the buffers
+        self._write_lock = threading.Lock()  # Serializes writes, so batches are written in order
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._influxdb_client = None
+
+    def add(self, results):
+        """
+        Adds a benchmark results entry to the buffer. The entry is converted immediately, so later changes to the
+        results object are not reflected in the output.
+        :param results: results entry of a single operation
+        :type results: core.BenchmarkResultsData
+        """
+        with self._lock:
+            if self.output_config.output_csv_enabled:
+                self._rows.append(results.to_dict())
+            if self.output_config.output_influxdb_enabled:
+                self._points.append(results.to_influxdb_point(benchmark_label=self.benchmark_label,
+                                                              additional_tags=self._influxdb_tags()))
+            buffered = max(len(self._rows), len(self._points))
+
+        self._ensure_started()
+        if buffered >= self.batch_size:
+            self._wake.set()
+
+    def add_diagnostics(self, diagnostics):
+        """
+        Adds the Dask diagnostics of a single operation to the buffer.
+        :param diagnostics: JSON-serializable dictionary, including the run number and operation name
+        :type diagnostics: dict
+        """
+        with self._lock:
+            self._diagnostics.append(diagnostics)
+            buffered = len(self._diagnostics)
+
+        self._ensure_started()
+        if buffered >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Writes all buffered results. Each output is written separately: results which could not be written to an
+        output (e.g. because InfluxDB is unreachable) stay at the front of its buffer and are retried by the next
+        flush, without writing them again to the outputs which succeeded.
+        :return: True if all buffered results were written
+        """
+        written = True
+        with self._write_lock:
+            for output, buffer_name, write, batch_size in [('CSV file', '_rows', self._write_csv, None),
+                                                           ('InfluxDB', '_points', self._write_influxdb,
+                                                            self.batch_size),
+                                                           ('Dask diagnostics', '_diagnostics',
+                                                            self._write_diagnostics, None)]:
+                with self._lock:
+                    pending, buffer = getattr(self, buffer_name), []
+                    setattr(self, buffer_name, buffer)
+                try:
+                    # Remove each batch from the pending results once it has been written
+                    while len(pending) > 0:
+                        batch_length = len(pending) if batch_size is None else batch_size
+                        write(pending[:batch_length])
+                        pending = pending[batch_length:]
+                except Exception as e:
+                    print('[Output] Error: Could not write {} benchmark results to {} (will retry): {}'.format(
+                        len(pending), output, e))
+                    written = False
+                finally:
+                    if len(pending) > 0:
+                        with self._lock:
+                            setattr(self, buffer_name, pending + getattr(self, buffer_name))
+        return written
+
+    def write_summary(self, summary, parameters=None):
+        """
+        Writes a summary of the execution times of each operation over all runs, immediately. CSV output goes to a
+        separate file ("<benchmark_label>_summary.csv") and InfluxDB output to the "benchmark_summary" measurement.
+        :param summary: OrderedDict mapping operation names to their summary statistics, as returned by
+                        core.BenchmarkProfiler.get_timing_summary()
+        :param parameters: parameter values to record with each row (e.g. of a parameter sweep point)
+        """
+        rows = []
+        for operation_name, statistics in summary.items():
+            row = OrderedDict([('operation', operation_name)])
+            row.update(statistics)
+            if parameters is not None:
+                row.update(parameters)
+            rows.append(row)
+        self.write_operation_table(rows, name='summary')
+
+    def write_operation_table(self, rows, name):
+        """
+        Writes a table of per-operation values (e.g. timing summaries or scaling results), immediately. CSV output
+        goes to a separate file ("<benchmark_label>_<name>.csv") and InfluxDB output to the "benchmark_<name>"
+        measurement, with the operation name as a tag and numeric values as fields.
+        :param rows: list of dictionaries, each with an "operation" entry
+        :param name: name of the table
+        :type rows: list
+        :type name: str
+        """
+        if len(rows) == 0:
+            return
+        timestamp = datetime.datetime.utcnow()
+        with self._write_lock:
+            if self.output_config.output_csv_enabled:
+                csv_rows = []
+                for row in rows:
+                    csv_row = OrderedDict([('log_timestamp', timestamp)])
+                    csv_row.update(row)
+                    csv_rows.append(csv_row)
+                self._write_csv(csv_rows, filename='{}_{}.csv'.format(self.benchmark_label, name))
+            if self.output_config.output_influxdb_enabled:
+                points = []
+                for row in rows:
+                    tags = {'operation_name': row['operation'], 'benchmark_label': self.benchmark_label}
+                    tags.update(self._influxdb_tags())
+                    fields = {}
+                    for field, value in row.items():
+                        if field == 'operation':
+                            continue
+                        # InfluxDB fields cannot be infinite or NaN
+                        if isinstance(value, str) or (isinstance(value, (int, float)) and math.isfinite(value)):
+                            fields[field] = value
+                    points.append({'measurement': 'benchmark_{}'.format(name),
+                                   'tags': tags,
+                                   'time': timestamp,
+                                   'fields': fields})
+                self._write_influxdb(points)
+
+    def write_metadata(self, metadata):
+        """
+        Writes metadata describing the benchmark environment (e.g. the Dask cluster parameters), immediately. Metadata
+        is appended as a JSON line to "<benchmark_label>_metadata.jsonl" and, if InfluxDB output is enabled, written
+        to the "benchmark_metadata" measurement (with nested values flattened into "<section>_<name>" fields).
+        :param metadata: JSON-serializable dictionary of metadata sections
+        :type metadata: dict
+        """
+        timestamp = datetime.datetime.utcnow()
+        with self._write_lock:
+            entry = OrderedDict([('log_timestamp', timestamp)])
+            entry.update(metadata)
+            with open('{}_metadata.jsonl'.format(self.benchmark_label), 'a') as metadata_file:
+                metadata_file.write(json.dumps(entry, default=str) + '\n')
+
+            if self.output_config.output_influxdb_enabled:
+                fields = {}
+                for section, values in metadata.items():
+                    for name, value in (values.items() if isinstance(values, dict) else [('', values)]):
+                        field = '{}_{}'.format(section, name) if name else section
+                        # InfluxDB fields must be scalars
+                        fields[field] = value if isinstance(value, (bool, int, float, str)) else str(value)
+                tags = {'benchmark_label': self.benchmark_label}
+                tags.update(self._influxdb_tags())
+                self._write_influxdb([{'measurement': 'benchmark_metadata',
+                                       'tags': tags,
+                                       'time': timestamp,
+                                       'fields': fields}])
+
+    def close(self):
+        """ Stops the background thread, writes all buffered results and closes the InfluxDB client. Results which
+        still cannot be written are reported and dropped. """
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        if not self.flush():
+            with self._lock:
+                print('[Output] Error: Dropping {} unwritten benchmark results.'.format(
+                    len(self._rows) + len(self._points) + len(self._diagnostics)))
+                self._rows, self._points, self._diagnostics = [], [], []
+        if self._influxdb_client is not None:
+            self._influxdb_client.close()
+            self._influxdb_client = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='genben-results-sink', daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            # Unwritten results stay buffered, and are retried by the next flush
+            self.flush()
+
+    def _write_csv(self, rows, filename=None):
+        if filename is None:
+            filename = '{}.csv'.format(self.benchmark_label)
+        header = not os.path.isfile(filename)
+
+        # Open the output file in append mode
+        with open(filename, 'a') as csv_file:
+            pd.DataFrame(rows, columns=list(rows[0].keys())).to_csv(
+                csv_file, sep=self.output_config.output_csv_delimiter, header=header, index=False)
+
+    def _write_diagnostics(self, diagnostics):
+        with open('{}_dask_diagnostics.jsonl'.format(self.benchmark_label), 'a') as diagnostics_file:
+            for entry in diagnostics:
+                diagnostics_file.write(json.dumps(entry, default=str) + '\n')
+
+    def _write_influxdb(self, points):
+        if self._influxdb_client is None:
+            self._influxdb_client = InfluxDBClient(host=self.output_config.output_influxdb_host,
+                                                   port=self.output_config.output_influxdb_port,
+                                                   username=self.output_config.output_influxdb_username,
+                                                   password=self.output_config.output_influxdb_password,
+                                                   database=self.output_config.output_influxdb_database_name)
+        self._influxdb_client.write_points(points, batch_size=self.batch_size)
+
+    def _influxdb_tags(self):
+        return {
+            'benchmark_group': self.output_config.output_influxdb_benchmark_group,
+            'device_name': self.output_config.output_influxdb_device_name
+        }
+
+
+class ConnectionResultsSink:
+    """ Sends benchmark results through a multiprocessing connection as they are added, instead of writing them, so
+    that a benchmark running in a subprocess passes its results to the parent process (which writes them). Results
+    sent before the subprocess fails are not lost. """
+
+    def __init__(self, connection):
+        """
+        :param connection: sending end of a multiprocessing pipe
+        :type connection: multiprocessing.connection.Connection
+        """
+        self.connection = connection
+
+    def add(self, results):
+        self.connection.send(('results', results))
+
+    def add_diagnostics(self, diagnostics):
+        self.connection.send(('diagnostics', diagnostics))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
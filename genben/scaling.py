@@ -0,0 +1,162 @@
+""" Strong and weak scaling experiments. The configured benchmarks are run once for each of a list of worker (or
+thread) counts, each time on a new local Dask cluster, and the median execution time of each operation is compared
+with its time at the smallest count.
+
+For strong scaling the data size is fixed, and the speedup at relative count p is S = T(1) / T(p). For weak scaling
+the data size grows with the count, and the (scaled) speedup is S = p * T(1) / T(p). In both cases the parallel
+efficiency is E = S / p and the Karp-Flatt metric, the experimentally determined serial fraction, is
+e = (1 / S - 1 / p) / (1 - 1 / p). A serial fraction which grows with p points to parallel overhead (e.g. scheduling
+or data transfer) rather than to inherently serial work.
+
+For weak scaling, the number of variants actually benchmarked at each count is recorded, and the scaled speedup
+uses the actual growth of the data size: if the data set has fewer variants than requested, the larger counts are
+run on all of them, and p * T(1) / T(p) would overstate the speedup. """
+
+import copy
+from collections import OrderedDict
+from genben import config, core, dask_utils
+from genben.results_sink import ResultsSink
+
+
+def scaling_metrics(counts, times, mode='strong', sizes=None):
+    """
+    Computes the speedup, parallel efficiency and Karp-Flatt serial fraction of an operation, relative to the
+    smallest count.
+    :param counts: worker (or thread) counts, in ascending order
+    :param times: execution time at each count
+    :param mode: 'strong' (fixed data size) or 'weak' (data size proportional to the count)
+    :param sizes: data size (e.g. number of variants) at each count; for weak scaling, the speedup is scaled by the
+                  growth of the data size (by the relative count, if not given)
+    :return: list of OrderedDicts, one per count
+    """
+    base_count, base_time = counts[0], times[0]
+    if sizes is None:
+        sizes = [None] * len(counts)
+    metrics = []
+    for count, time, size in zip(counts, times, sizes):
+        p = count / base_count
+        if time > 0:
+            speedup = base_time / time
+            if mode == 'weak':
+                speedup *= size / sizes[0] if size is not None else p
+        else:
+            speedup = float('nan')
+        if p > 1 and speedup > 0:
+            karp_flatt = (1 / speedup - 1 / p) / (1 - 1 / p)
+        else:
+            karp_flatt = float('nan')
+        metrics.append(OrderedDict([('count', count),
+                                    ('median_time', time),
+                                    ('speedup', speedup),
+                                    ('efficiency', speedup / p),
+                                    ('karp_flatt', karp_flatt)]))
+    return metrics
+
+
+class ScalingExperiment:
+    """ Runs the configured benchmarks across worker (or thread) counts and reports their scaling. """
+
+    def __init__(self, bench_conf, dask_config, scaling_config, data_dirs, benchmark_label):
+        """
+        :param bench_conf: benchmark configuration; for weak scaling, benchmark_num_variants is the number of
+                           variants per worker (or thread)
+        :param dask_config: Dask configuration, for the local cluster memory limit, spill directory and processes
+        :param scaling_config: scaling experiment configuration
+        :param data_dirs: working data directories
+        :param benchmark_label: label to use when saving results; results of each count are saved with the label
+                                "<benchmark_label>_<unit><count>"
+        :type bench_conf: config.BenchmarkConfigurationRepresentation
+        :type dask_config: config.DaskSchedulerConfigurationRepresentation
+        :type scaling_config: config.ScalingConfigurationRepresentation
+        :type data_dirs: config.DataDirectoriesConfigurationRepresentation
+        :type benchmark_label: str
+        """
+        self.bench_conf = bench_conf
+        self.dask_config = dask_config
+        self.scaling_config = scaling_config
+        self.data_dirs = data_dirs
+        self.benchmark_label = benchmark_label
+
+    def run(self):
+        """
+        Runs the scaling experiment, prints the results and writes them to the configured outputs.
+        :return: list of OrderedDicts, one per operation and count
+        """
+        if self.bench_conf.genotype_array_type != config.GENOTYPE_ARRAY_DASK:
+            print('[Scaling] Error: Scaling experiments require the Dask genotype array type.')
+            exit(1)
+        if self.scaling_config.mode == 'weak' and self.bench_conf.benchmark_num_variants <= 0:
+            print('[Scaling] Error: Weak scaling requires benchmark_num_variants to be set (variants per {}).'.format(
+                self.scaling_config.unit[:-1]))
+            exit(1)
+
+        # Median execution time of each operation, and number of variants benchmarked, by count
+        medians = OrderedDict()
+        n_variants = OrderedDict()
+        for count in self.scaling_config.counts:
+            print('[Scaling] Running benchmark with {} {} ({} scaling).'.format(count, self.scaling_config.unit,
+                                                                               self.scaling_config.mode))
+            summary, n_variants[count] = self._run_count(count)
+            for operation_name, statistics in summary.items():
+                medians.setdefault(operation_name, OrderedDict())[count] = statistics['median']
+
+        rows = []
+        for operation_name, times in medians.items():
+            print('[Scaling] {}:'.format(operation_name))
+            sizes = [n_variants[count] for count in times.keys()]
+            for metrics in scaling_metrics(list(times.keys()), list(times.values()), self.scaling_config.mode,
+                                           sizes=sizes if None not in sizes else None):
+                print('  - {} {}: {:.6f}s, speedup {:.3f}, efficiency {:.3f}, serial fraction {:.3f}'.format(
+                    metrics['count'], self.scaling_config.unit, metrics['median_time'], metrics['speedup'],
+                    metrics['efficiency'], metrics['karp_flatt']))
+                row = OrderedDict([('operation', operation_name),
+                                   ('mode', self.scaling_config.mode),
+                                   ('unit', self.scaling_config.unit)])
+                row.update(metrics)
+                row['n_variants'] = n_variants[metrics['count']]
+                rows.append(row)
+
+        results_sink = ResultsSink(self.bench_conf.results_output_config, self.benchmark_label)
+        results_sink.write_operation_table(rows, name='scaling')
+        results_sink.close()
+        return rows
+
+    def _run_count(self, count):
+        """
+        Runs the benchmark on a new local cluster with the given worker (or thread) count.
+        :return: tuple (summary, n_variants) of the timing summary of each operation, as returned by
+                 core.BenchmarkProfiler.get_timing_summary(), and the number of variants benchmarked (None if no run
+                 completed)
+        """
+        bench_conf = copy.copy(self.bench_conf)
+        if self.scaling_config.mode == 'weak':
+            bench_conf.benchmark_num_variants = self.bench_conf.benchmark_num_variants * count
+
+        if self.scaling_config.unit == 'workers':
+            n_workers, threads_per_worker = count, self.scaling_config.threads_per_worker
+        else:
+            n_workers, threads_per_worker = 1, count
+
+        du = dask_utils.DaskUtils()
+        du.start_local_cluster(n_workers=n_workers,
+                               threads_per_worker=threads_per_worker,
+                               memory_limit=self.dask_config.local_cluster_memory_limit,
+                               spill_dir=self.dask_config.local_cluster_spill_dir or None,
+                               processes=self.dask_config.local_cluster_processes)
+        try:
+            benchmark = core.Benchmark(bench_conf=bench_conf,
+                                       data_dirs=self.data_dirs,
+                                       benchmark_label='{}_{}{}'.format(self.benchmark_label,
+                                                                        self.scaling_config.unit, count),
+                                       dask_cluster_parameters=du.get_cluster_parameters())
+            benchmark.run_benchmark()
+        finally:
+            du.close()
+
+        n_variants = benchmark.genotype_array_shape[0] if benchmark.genotype_array_shape is not None else None
+        if self.scaling_config.mode == 'weak' and n_variants is not None and \
+                n_variants < bench_conf.benchmark_num_variants:
+            print('[Scaling] Warning: Only {} of the {} variants requested for {} {} are available. The scaled '
+                  'speedup is computed from the number of variants benchmarked.'.format(
+                      n_variants, bench_conf.benchmark_num_variants, count, self.scaling_config.unit))
+        return benchmark.benchmark_profiler.get_timing_summary(), n_variants
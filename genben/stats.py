@@ -0,0 +1,107 @@
+""" Robust summary statistics and comparisons of benchmark timings. Timing distributions are typically skewed and
+contain outliers (e.g. from background activity), so they are summarized by the median with a distribution-free
+confidence interval and by robust measures of dispersion, and compared with rank-based tests and bootstrap intervals
+rather than tests which assume normality. """
+
+from collections import OrderedDict
+import numpy as np
+import scipy.stats
+
+
+def median_ci(samples, confidence=0.95):
+    """
+    Computes a distribution-free confidence interval for the median, using order statistics of the samples
+    (the binomial method). With too few samples for the requested confidence, the full range is returned.
+    :param samples: sequence of timings
+    :param confidence: confidence level of the interval
+    :return: tuple (low, high)
+    """
+    x = np.sort(np.asarray(samples, dtype=np.float64))
+    n = x.shape[0]
+    if n == 0:
+        return np.nan, np.nan
+
+    # Largest rank j such that P(X < j) <= alpha / 2 for X ~ Binomial(n, 0.5); the interval is [x_(j), x_(n-j+1)]
+    alpha = 1 - confidence
+    j = int(scipy.stats.binom.ppf(alpha / 2, n, 0.5))
+    if scipy.stats.binom.cdf(j, n, 0.5) > alpha / 2:
+        j -= 1
+    if j < 0:
+        return x[0], x[-1]
+    return x[j], x[n - j - 1]
+
+
+def relative_ci_half_width(samples, confidence=0.95):
+    """
+    Computes the half-width of the confidence interval of the median, relative to the median.
+    :param samples: sequence of timings
+    :param confidence: confidence level of the interval
+    :return: float (inf if the median is zero but the interval is not)
+    """
+    low, high = median_ci(samples, confidence)
+    median = np.median(samples)
+    half_width = (high - low) / 2
+    if median == 0:
+        return 0.0 if half_width == 0 else np.inf
+    return half_width / abs(median)
+
+
+def summarize(samples, confidence=0.95):
+    """
+    Summarizes a set of timings.
+    :param samples: sequence of timings
+    :param confidence: confidence level of the interval for the median
+    :return: OrderedDict with the sample count, median and its confidence interval, and dispersion statistics
+    """
+    x = np.asarray(samples, dtype=np.float64)
+    low, high = median_ci(x, confidence)
+    median = np.median(x)
+    q1, q3 = np.percentile(x, [25, 75])
+    return OrderedDict([('n_samples', int(x.shape[0])),
+                        ('median', median),
+                        ('ci_low', low),
+                        ('ci_high', high),
+                        ('ci_relative_half_width', relative_ci_half_width(x, confidence)),
+                        ('mean', np.mean(x)),
+                        ('std', np.std(x, ddof=1) if x.shape[0] > 1 else 0.0),
+                        ('min', np.min(x)),
+                        ('max', np.max(x)),
+                        ('mad', np.median(np.abs(x - median))),
+                        ('iqr', q3 - q1)])
+
+
+def mann_whitney_p_value(a, b):
+    """
+    Tests whether two sets of timings come from the same distribution, using the two-sided Mann-Whitney U test.
+    :param a: first sequence of timings
+    :param b: second sequence of timings
+    :return: p-value (1.0 if either set is empty or all timings are identical)
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if a.shape[0] == 0 or b.shape[0] == 0 or np.all(np.concatenate([a, b]) == a[0]):
+        return 1.0
+    return float(scipy.stats.mannwhitneyu(a, b, alternative='two-sided').pvalue)
+
+
+def bootstrap_median_ratio_ci(baseline, candidate, confidence=0.95, n_resamples=2000, random_state=0):
+    """
+    Computes a percentile bootstrap confidence interval for the ratio of the median of the candidate timings to the
+    median of the baseline timings. Ratios above 1 mean the candidate is slower.
+    :param baseline: sequence of baseline timings
+    :param candidate: sequence of candidate timings
+    :param confidence: confidence level of the interval
+    :param n_resamples: number of bootstrap resamples
+    :param random_state: seed of the random number generator
+    :return: tuple (low, high)
+    """
+    baseline = np.asarray(baseline, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    rng = np.random.RandomState(random_state)
+    baseline_medians = np.median(rng.choice(baseline, size=(n_resamples, baseline.shape[0])), axis=1)
+    candidate_medians = np.median(rng.choice(candidate, size=(n_resamples, candidate.shape[0])), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = candidate_medians / baseline_medians
+    alpha = 1 - confidence
+    low, high = np.nanpercentile(ratios, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return low, high
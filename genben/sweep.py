@@ -0,0 +1,169 @@
+""" Parameter sweeps over configuration keys. Each point of a sweep assigns one value to every swept [benchmark] or
+[vcf_to_zarr] key; the benchmark is run once per point, in a single session, with every result tagged with the
+point's parameter values. Points are either the full Cartesian product of the values, or a Latin hypercube subset of
+it (each value of each key is used in as equal a share of the points as possible).
+
+Completed points are recorded in "<label>_sweep_state.jsonl". Running a sweep again with the same label skips the
+points which were completed, so an interrupted sweep can be resumed; an interrupted point is run again from the
+start. Results are written after each run, so the rows of an interrupted point stay in the results files; every row
+is tagged with the ID of the attempt at running its point ("sweep.attempt"), and the state file records the attempt
+which completed each point, so that rows of interrupted attempts can be told apart. """
+
+import os
+import copy
+import uuid
+import json
+import itertools
+from collections import OrderedDict
+import numpy as np
+from genben import config, core, n_alt_cache
+
+
+def cartesian_points(parameters):
+    """
+    Returns all combinations of the values of the swept keys.
+    :param parameters: OrderedDict mapping each swept key to its list of values
+    :return: list of OrderedDicts, each mapping every swept key to a value
+    """
+    keys = list(parameters.keys())
+    return [OrderedDict(zip(keys, values)) for values in itertools.product(*parameters.values())]
+
+
+def latin_hypercube_points(parameters, samples, seed=0):
+    """
+    Returns a Latin hypercube sample of the combinations of the values of the swept keys. For each key, the samples
+    are spread across equal strata of its list of values, in an independent random order, so that each value is used
+    about equally often. Duplicate points are removed.
+    :param parameters: OrderedDict mapping each swept key to its list of values
+    :param samples: number of points to sample
+    :param seed: seed of the random number generator
+    :return: list of OrderedDicts, each mapping every swept key to a value
+    """
+    random_state = np.random.RandomState(seed)
+    indices = []
+    for values in parameters.values():
+        strata = (random_state.permutation(samples) + random_state.uniform(size=samples)) / samples
+        indices.append(np.minimum((strata * len(values)).astype(int), len(values) - 1))
+
+    keys = list(parameters.keys())
+    points = []
+    for i in range(samples):
+        point = OrderedDict((key, parameters[key][indices[j][i]]) for j, key in enumerate(keys))
+        if point not in points:
+            points.append(point)
+    return points
+
+
+def point_id(point):
+    """
+    Identifies a sweep point by its parameter values, independently of the order of the points.
+    :param point: OrderedDict mapping each swept key to a value
+    :return: hexadecimal digest string
+    """
+    return n_alt_cache.cache_key([[name, value] for name, value in point.items()])
+
+
+def point_runtime_config(runtime_config, point):
+    """
+    Returns a copy of the runtime configuration with the values of a sweep point applied.
+    :param runtime_config: runtime configuration
+    :param point: OrderedDict mapping each (section, key) to a value
+    :type runtime_config: config.ConfigurationRepresentation
+    :return: config.ConfigurationRepresentation
+    """
+    point_config = copy.deepcopy(runtime_config)
+    for (section, key), value in point.items():
+        if not hasattr(point_config, section):
+            setattr(point_config, section, {})
+        point_config[section][key] = value
+    return point_config
+
+
+class SweepRunner:
+    """ Runs the benchmark for each point of a parameter sweep. """
+
+    def __init__(self, runtime_config, sweep_config, data_dirs, benchmark_label, dask_cluster_parameters=None):
+        """
+        :param runtime_config: runtime configuration, with the default values of the swept keys
+        :param sweep_config: parameter sweep configuration
+        :param data_dirs: working data directories
+        :param benchmark_label: label to use when saving results; all points are saved with the same label
+        :param dask_cluster_parameters: parameters of the Dask cluster used by the benchmark, recorded with the results
+        :type runtime_config: config.ConfigurationRepresentation
+        :type sweep_config: config.SweepConfigurationRepresentation
+        :type data_dirs: config.DataDirectoriesConfigurationRepresentation
+        :type benchmark_label: str
+        :type dask_cluster_parameters: dict
+        """
+        self.runtime_config = runtime_config
+        self.sweep_config = sweep_config
+        self.data_dirs = data_dirs
+        self.benchmark_label = benchmark_label
+        self.dask_cluster_parameters = dask_cluster_parameters
+        self.state_file = '{}_sweep_state.jsonl'.format(benchmark_label)
+
+    def points(self):
+        """
+        :return: list of sweep points, each an OrderedDict mapping every (section, key) to a value
+        """
+        if self.sweep_config.method == 'latin_hypercube':
+            return latin_hypercube_points(self.sweep_config.parameters, self.sweep_config.samples,
+                                          self.sweep_config.seed)
+        return cartesian_points(self.sweep_config.parameters)
+
+    def completed_point_ids(self):
+        """
+        :return: set of IDs of the points completed by previous runs of this sweep
+        """
+        completed = set()
+        if os.path.isfile(self.state_file):
+            with open(self.state_file, 'r') as f:
+                for line in f:
+                    if line.strip() != '':
+                        completed.add(json.loads(line)['point_id'])
+        return completed
+
+    def run(self):
+        """
+        Runs the benchmark for each point of the sweep which has not been completed yet.
+        :return: number of points run
+        """
+        points = self.points()
+
+        # Check the configuration of every point before starting, so that an invalid value fails the sweep early
+        bench_confs = [config.BenchmarkConfigurationRepresentation(point_runtime_config(self.runtime_config, point))
+                       for point in points]
+
+        completed = self.completed_point_ids()
+        remaining = [(point, bench_conf) for point, bench_conf in zip(points, bench_confs)
+                     if point_id(self._parameters(point)) not in completed]
+        print('[Sweep] {} points ({} method); {} already completed.'.format(
+            len(points), self.sweep_config.method, len(points) - len(remaining)))
+
+        for i, (point, bench_conf) in enumerate(remaining, start=1):
+            parameters = self._parameters(point)
+            print('[Sweep] Running point {} of {}: {}'.format(
+                i, len(remaining), ', '.join('{} = {}'.format(name, value) for name, value in parameters.items())))
+
+            # Tag the results with the attempt, as the results of an interrupted attempt are not removed
+            attempt = uuid.uuid4().hex[:16]
+            recorded_parameters = OrderedDict(parameters)
+            recorded_parameters['sweep.attempt'] = attempt
+
+            benchmark = core.Benchmark(bench_conf=bench_conf,
+                                       data_dirs=self.data_dirs,
+                                       benchmark_label=self.benchmark_label,
+                                       dask_cluster_parameters=self.dask_cluster_parameters,
+                                       parameters=recorded_parameters)
+            benchmark.run_benchmark()
+
+            # Record the point as completed (its results have been written by run_benchmark)
+            with open(self.state_file, 'a') as f:
+                f.write(json.dumps(OrderedDict([('point_id', point_id(parameters)),
+                                                ('attempt', attempt),
+                                                ('parameters', parameters)])) + '\n')
+        return len(remaining)
+
+    @staticmethod
+    def _parameters(point):
+        return OrderedDict(('{}.{}'.format(section, key), value) for (section, key), value in point.items())
@@ -0,0 +1,535 @@
+""" Synthetic genotype datasets, written directly to Zarr with the same layout as the output of
+data_service.convert_to_zarr() ("calldata/GT", "variants/POS", "variants/CHROM", "variants/REF", "variants/ALT",
+"variants/numalt" and "samples"), so that callsets of any size can be benchmarked without downloading or converting
+VCF files, or written as (plain, gzip or BGZF compressed) VCF files, so that VCF to Zarr conversion can be benchmarked
+on inputs of any size.
+
+Variants are biallelic or (at the configured rate) multiallelic SNPs. The frequency of the non-reference alleles of a
+variant is drawn from the neutral site frequency spectrum, whose density is proportional to 1 / p between
+1 / (number of haplotypes) and 1, so most variants are rare; for multiallelic variants this frequency is split between
+the ALT alleles at random. Genotype calls are drawn independently (assuming Hardy-Weinberg equilibrium) and are
+missing at the configured rate.
+
+Each chunk is generated independently, from a random number generator seeded with the dataset seed and the chunk's
+index, so the output does not depend on the order in which chunks are written or on the number of Dask workers. """
+
+import os
+import gzip
+import zlib
+import struct
+import collections
+import multiprocessing
+import concurrent.futures
+from collections import OrderedDict
+import numpy as np
+import dask.array as da
+import zarr
+import numcodecs
+import allel.io.vcf_read
+from numcodecs import Blosc
+from genben import config
+
+BASES = np.array(['A', 'C', 'G', 'T'], dtype=object)
+MAX_SNP_ALT_ALLELES = len(BASES) - 1
+PLOIDY = 2
+
+# Seed stream identifiers, so that variant and genotype chunks use independent random number generators
+_VARIANTS_STREAM = 0
+_GENOTYPES_STREAM = 1
+
+# Maximum number of random values generated at once for a genotype chunk, to limit temporary memory use
+_GENOTYPE_BATCH_SIZE = 2 ** 22
+
+
+def allele_frequencies(n_variants, n_haplotypes, random_state):
+    """
+    Draws the total frequency of the non-reference alleles of each variant from the neutral site frequency spectrum.
+    :param n_variants: number of variants
+    :param n_haplotypes: number of haplotypes (samples times ploidy); the lowest frequency is 1 / n_haplotypes
+    :param random_state: random number generator
+    :type random_state: numpy.random.RandomState
+    :return: float64 array of shape (n_variants,)
+    """
+    # Inverse transform sampling of the density 1 / p on [1 / n_haplotypes, 1]
+    min_frequency = 1.0 / max(n_haplotypes, 2)
+    return min_frequency ** (1.0 - random_state.random_sample(n_variants))
+
+
+def variant_chunk(seed, chunk_index, chunk_length, n_variants, n_haplotypes, alt_number, multiallelic_rate,
+                  position_spacing):
+    """
+    Generates the variants of a single chunk.
+    :param seed: seed of the dataset
+    :param chunk_index: index of the chunk along the variants dimension
+    :param chunk_length: number of variants per chunk
+    :param n_variants: total number of variants
+    :param n_haplotypes: number of haplotypes (samples times ploidy)
+    :param alt_number: number of ALT allele columns
+    :param multiallelic_rate: fraction of variants with more than one ALT allele
+    :param position_spacing: average distance between the positions of consecutive variants
+    :return: OrderedDict with "POS", "REF", "ALT" and "numalt" arrays, and "thresholds", the cumulative allele
+             frequencies (of shape (n, alt_number)) from which genotype calls are drawn
+    """
+    start = chunk_index * chunk_length
+    n = min(chunk_length, n_variants - start)
+    random_state = np.random.RandomState([seed, _VARIANTS_STREAM, chunk_index])
+
+    # Each variant is placed at a random offset within its own stretch of position_spacing bases
+    positions = 1 + (start + np.arange(n)) * position_spacing + random_state.randint(0, position_spacing, size=n)
+
+    numalt = np.ones(n, dtype=np.int32)
+    max_numalt = min(alt_number, MAX_SNP_ALT_ALLELES)
+    if max_numalt > 1:
+        multiallelic = random_state.random_sample(n) < multiallelic_rate
+        numalt[multiallelic] = random_state.randint(2, max_numalt + 1, size=int(np.sum(multiallelic)))
+
+    # ALT alleles are distinct bases which differ from the REF allele; unused ALT columns are empty
+    ref = random_state.randint(0, len(BASES), size=n)
+    offsets = np.argsort(random_state.random_sample((n, MAX_SNP_ALT_ALLELES)), axis=1) + 1
+    alt = np.full((n, alt_number), '', dtype=object)
+    for k in range(max_numalt):
+        used = numalt > k
+        alt[used, k] = BASES[(ref[used] + offsets[used, k]) % len(BASES)]
+
+    # Split the non-reference allele frequency between the ALT alleles, and convert to cumulative thresholds: a
+    # uniform random value u is drawn for each allele call, and the allele is the number of thresholds below u.
+    # Thresholds of unused ALT columns are 1, so they are never exceeded
+    frequencies = np.zeros((n, alt_number))
+    weights = (1.0 - random_state.random_sample((n, max_numalt))) * (np.arange(max_numalt) < numalt[:, np.newaxis])
+    frequencies[:, :max_numalt] = weights / np.sum(weights, axis=1, keepdims=True)
+    frequencies *= allele_frequencies(n, n_haplotypes, random_state)[:, np.newaxis]
+    thresholds = 1.0 - np.cumsum(frequencies[:, ::-1], axis=1)[:, ::-1]
+
+    return OrderedDict([('POS', positions.astype(np.int32)),
+                        ('REF', BASES[ref]),
+                        ('ALT', alt),
+                        ('numalt', numalt),
+                        ('thresholds', thresholds)])
+
+
+def genotype_chunk(seed, variant_chunk_index, sample_chunk_index, chunk_length, chunk_width, n_variants, n_samples,
+                   alt_number, multiallelic_rate, missing_rate, position_spacing):
+    """
+    Generates the genotype calls of a single chunk.
+    :return: int8 array of shape (variants in the chunk, samples in the chunk, 2)
+    """
+    variants = variant_chunk(seed, variant_chunk_index, chunk_length, n_variants, n_samples * PLOIDY, alt_number,
+                             multiallelic_rate, position_spacing)
+    thresholds = variants['thresholds']
+    n = thresholds.shape[0]
+    width = min(chunk_width, n_samples - sample_chunk_index * chunk_width)
+    random_state = np.random.RandomState([seed, _GENOTYPES_STREAM, variant_chunk_index, sample_chunk_index])
+
+    gt = np.empty((n, width, PLOIDY), dtype=np.int8)
+    batch_length = max(1, _GENOTYPE_BATCH_SIZE // (width * PLOIDY))
+    for batch_start in range(0, n, batch_length):
+        batch = slice(batch_start, min(batch_start + batch_length, n))
+        u = random_state.random_sample((batch.stop - batch.start, width, PLOIDY))
+        alleles = np.zeros(u.shape, dtype=np.int8)
+        for k in range(alt_number):
+            alleles += u >= thresholds[batch, k, np.newaxis, np.newaxis]
+        if missing_rate > 0:
+            alleles[random_state.random_sample(u.shape[:2]) < missing_rate] = -1
+        gt[batch] = alleles
+    return gt
+
+
+def _variant_field_block(field, seed, chunk_length, n_variants, n_haplotypes, alt_number, multiallelic_rate,
+                         position_spacing, block_id=None):
+    return variant_chunk(seed, block_id[0], chunk_length, n_variants, n_haplotypes, alt_number, multiallelic_rate,
+                         position_spacing)[field]
+
+
+def _genotype_block(seed, chunk_length, chunk_width, n_variants, n_samples, alt_number, multiallelic_rate,
+                    missing_rate, position_spacing, block_id=None):
+    return genotype_chunk(seed, block_id[0], block_id[1], chunk_length, chunk_width, n_variants, n_samples,
+                          alt_number, multiallelic_rate, missing_rate, position_spacing)
+
+
+def _check_parameters(n_variants, n_samples, missing_rate, multiallelic_rate, alt_number, position_spacing):
+    if n_variants <= 0 or n_samples <= 0:
+        raise ValueError('The number of variants and samples must be positive.')
+    if alt_number < 1:
+        raise ValueError('alt_number must be at least 1.')
+    if not 0 <= missing_rate <= 1 or not 0 <= multiallelic_rate <= 1:
+        raise ValueError('missing_rate and multiallelic_rate must be between 0 and 1.')
+    if multiallelic_rate > 0 and alt_number < 2:
+        raise ValueError('Multiallelic variants require alt_number to be at least 2.')
+    if position_spacing < 1 or n_variants * position_spacing >= np.iinfo(np.int32).max:
+        raise ValueError('Variant positions must fit in 32-bit integers: reduce position_spacing or the number of '
+                         'variants.')
+
+
+def _chunk_sizes(total, size):
+    return tuple(min(size, total - start) for start in range(0, total, size))
+
+
+def generate_zarr(output_zarr_path, n_variants, n_samples, seed=0, missing_rate=0.0, multiallelic_rate=0.0,
+                  alt_number=3, chunk_length=None, chunk_width=None, compressor=None, chromosome='1',
+                  position_spacing=100):
+    """
+    Generates a synthetic genotype dataset and writes it to a Zarr group. Chunks are generated and written in parallel
+    by Dask (using the distributed client, if one is connected).
+    :param output_zarr_path: The desired Zarr output location; existing data there is overwritten
+    :param n_variants: number of variants
+    :param n_samples: number of samples
+    :param seed: seed of the random number generators; the same seed, parameters and chunk sizes produce the same
+                 dataset
+    :param missing_rate: fraction of genotype calls which are missing
+    :param multiallelic_rate: fraction of variants with more than one ALT allele
+    :param alt_number: number of ALT allele columns (as for convert_to_zarr); at most 3 are used, as all variants are
+                       SNPs
+    :param chunk_length: number of variants per chunk. If None, scikit-allel's default is used
+    :param chunk_width: number of samples per genotype chunk. If None, scikit-allel's default is used
+    :param compressor: compressor of the Zarr arrays. If None, the default Blosc compressor is used
+    :param chromosome: name of the chromosome of all variants
+    :param position_spacing: average distance between the positions of consecutive variants
+    :type output_zarr_path: str
+    :type n_variants: int
+    :type n_samples: int
+    :type seed: int
+    :type missing_rate: float
+    :type multiallelic_rate: float
+    :type alt_number: int
+    :type chunk_length: int
+    :type chunk_width: int
+    :type chromosome: str
+    :type position_spacing: int
+    :return: the Zarr group written
+    """
+    _check_parameters(n_variants, n_samples, missing_rate, multiallelic_rate, alt_number, position_spacing)
+
+    if chunk_length is None:
+        chunk_length = allel.io.vcf_read.DEFAULT_CHUNK_LENGTH
+    if chunk_width is None:
+        chunk_width = allel.io.vcf_read.DEFAULT_CHUNK_WIDTH
+    if compressor is None:
+        compressor = Blosc(cname='lz4', clevel=5, shuffle=Blosc.SHUFFLE)
+
+    print('[Generate] Generating {} variants x {} samples (seed {}, missing rate {}, multiallelic rate {}).'.format(
+        n_variants, n_samples, seed, missing_rate, multiallelic_rate))
+
+    variant_chunks = _chunk_sizes(n_variants, chunk_length)
+    sample_chunks = _chunk_sizes(n_samples, chunk_width)
+    variant_args = (seed, chunk_length, n_variants, n_samples * PLOIDY, alt_number, multiallelic_rate,
+                    position_spacing)
+
+    root = zarr.open_group(str(output_zarr_path), mode='w')
+    root.create_dataset('samples', data=np.array(_sample_names(n_samples), dtype=object),
+                        object_codec=numcodecs.VLenUTF8())
+    variants_group = root.create_group('variants')
+    calldata_group = root.create_group('calldata')
+
+    sources = [
+        da.map_blocks(_genotype_block, seed, chunk_length, chunk_width, n_variants, n_samples, alt_number,
+                      multiallelic_rate, missing_rate, position_spacing,
+                      chunks=(variant_chunks, sample_chunks, (PLOIDY,)), dtype=np.int8),
+        da.map_blocks(_variant_field_block, 'POS', *variant_args, chunks=(variant_chunks,), dtype=np.int32),
+        da.full((n_variants,), chromosome, dtype=object, chunks=(variant_chunks,)),
+        da.map_blocks(_variant_field_block, 'REF', *variant_args, chunks=(variant_chunks,), dtype=object),
+        da.map_blocks(_variant_field_block, 'ALT', *variant_args, chunks=(variant_chunks, (alt_number,)),
+                      dtype=object),
+        da.map_blocks(_variant_field_block, 'numalt', *variant_args, chunks=(variant_chunks,), dtype=np.int32)
+    ]
+    targets = [
+        calldata_group.create_dataset('GT', shape=(n_variants, n_samples, PLOIDY), dtype=np.int8,
+                                      chunks=(chunk_length, chunk_width, PLOIDY), compressor=compressor),
+        variants_group.create_dataset('POS', shape=(n_variants,), dtype=np.int32, chunks=(chunk_length,),
+                                      compressor=compressor),
+        variants_group.create_dataset('CHROM', shape=(n_variants,), dtype=object, chunks=(chunk_length,),
+                                      compressor=compressor, object_codec=numcodecs.VLenUTF8()),
+        variants_group.create_dataset('REF', shape=(n_variants,), dtype=object, chunks=(chunk_length,),
+                                      compressor=compressor, object_codec=numcodecs.VLenUTF8()),
+        variants_group.create_dataset('ALT', shape=(n_variants, alt_number), dtype=object,
+                                      chunks=(chunk_length, alt_number), compressor=compressor,
+                                      object_codec=numcodecs.VLenUTF8()),
+        variants_group.create_dataset('numalt', shape=(n_variants,), dtype=np.int32, chunks=(chunk_length,),
+                                      compressor=compressor)
+    ]
+
+    # Dask chunks are aligned with the Zarr chunks, so they can be written concurrently without locking
+    da.store(sources, targets, lock=False)
+
+    print('[Generate] Synthetic dataset written to {}.'.format(output_zarr_path))
+    return root
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# VCF output
+# ----------------------------------------------------------------------------------------------------------------------
+
+VCF_INFO_FIELDS = OrderedDict([
+    ('NS', '<ID=NS,Number=1,Type=Integer,Description="Number of samples with data">'),
+    ('AN', '<ID=AN,Number=1,Type=Integer,Description="Total number of alleles in called genotypes">'),
+    ('AC', '<ID=AC,Number=A,Type=Integer,Description="Allele count in genotypes, for each ALT allele">'),
+    ('AF', '<ID=AF,Number=A,Type=Float,Description="Allele frequency, for each ALT allele">'),
+    ('DP', '<ID=DP,Number=1,Type=Integer,Description="Combined depth across samples">')
+])
+VCF_FORMAT_FIELDS = OrderedDict([
+    ('GT', '<ID=GT,Number=1,Type=String,Description="Genotype">'),
+    ('DP', '<ID=DP,Number=1,Type=Integer,Description="Read depth">'),
+    ('GQ', '<ID=GQ,Number=1,Type=Integer,Description="Genotype quality">'),
+    ('AD', '<ID=AD,Number=R,Type=Integer,Description="Read depth for each allele">')
+])
+VCF_COMPRESSION_TYPES = config.synthetic_vcf_compression_types
+
+_VCF_FIELDS_STREAM = 2
+_MEAN_DEPTH = 30
+
+# Approximate number of genotype calls per block of VCF records, to limit the memory used by each worker
+_VCF_BLOCK_CALLS = 2 ** 20
+
+# Maximum uncompressed size of a BGZF block (as used by htslib), and the empty block which marks the end of a BGZF file
+_BGZF_BLOCK_SIZE = 0xff00
+_BGZF_EOF = bytes.fromhex('1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+
+def bgzf_compress(data, compression_level=6):
+    """
+    Compresses data into BGZF blocks (gzip members of at most 64 KiB, which record their compressed size, so that the
+    file can be read from any block). BGZF files are valid gzip files. The end-of-file marker block is not included.
+    :param data: data to compress
+    :param compression_level: zlib compression level
+    :type data: bytes
+    :type compression_level: int
+    :return: bytes
+    """
+    blocks = []
+    for start in range(0, len(data), _BGZF_BLOCK_SIZE):
+        block = data[start:start + _BGZF_BLOCK_SIZE]
+        compressed = _deflate(block, compression_level)
+        if len(compressed) + 26 > 65536:
+            # Incompressible data: store the block uncompressed, which always fits
+            compressed = _deflate(block, 0)
+        blocks.append(struct.pack('<BBBBIBBHBBHH', 31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, len(compressed) + 25))
+        blocks.append(compressed)
+        blocks.append(struct.pack('<II', zlib.crc32(block) & 0xffffffff, len(block)))
+    return b''.join(blocks)
+
+
+def _deflate(data, compression_level):
+    compressor = zlib.compressobj(compression_level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_block(data, compression, compression_level=6):
+    """
+    Compresses a block of output, so that the compressed blocks of a file can be produced independently and
+    concatenated. Gzip blocks are separate gzip members, which gzip readers decompress as a single stream.
+    :param data: data to compress
+    :param compression: 'none', 'gzip' or 'bgzf'
+    :param compression_level: zlib compression level
+    :return: bytes
+    """
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=compression_level)
+    elif compression == 'bgzf':
+        return bgzf_compress(data, compression_level)
+    return data
+
+
+def vcf_header(n_samples, info_fields, format_fields, chromosome='1', contig_length=None):
+    """
+    Returns the header of a synthetic VCF file, including the line with the column names.
+    :param n_samples: number of samples
+    :param info_fields: names of the INFO fields, from VCF_INFO_FIELDS
+    :param format_fields: names of the FORMAT fields, from VCF_FORMAT_FIELDS
+    :param chromosome: name of the chromosome of all variants
+    :param contig_length: length of the chromosome, if known
+    :return: str
+    """
+    lines = ['##fileformat=VCFv4.2', '##source=genben']
+    if contig_length is not None:
+        lines.append('##contig=<ID={},length={}>'.format(chromosome, contig_length))
+    else:
+        lines.append('##contig=<ID={}>'.format(chromosome))
+    lines.append('##FILTER=<ID=PASS,Description="All filters passed">')
+    lines.extend('##INFO={}'.format(VCF_INFO_FIELDS[field]) for field in info_fields)
+    lines.extend('##FORMAT={}'.format(VCF_FORMAT_FIELDS[field]) for field in format_fields)
+    columns = ['#CHROM', 'POS', 'ID', 'REF', 'ALT', 'QUAL', 'FILTER', 'INFO', 'FORMAT']
+    columns.extend(_sample_names(n_samples))
+    lines.append('\t'.join(columns))
+    return '\n'.join(lines) + '\n'
+
+
+def vcf_block(seed, block_index, block_length, n_variants, n_samples, alt_number, multiallelic_rate, missing_rate,
+              position_spacing, chromosome, info_fields, format_fields):
+    """
+    Generates a block of VCF records. Variants and genotype calls are generated as for a Zarr chunk (with all samples
+    in a single chunk), and the other INFO and FORMAT values are derived from them or drawn at random.
+    :param block_index: index of the block
+    :param block_length: number of records per block
+    :return: str
+    """
+    variants = variant_chunk(seed, block_index, block_length, n_variants, n_samples * PLOIDY, alt_number,
+                             multiallelic_rate, position_spacing)
+    gt = genotype_chunk(seed, block_index, 0, block_length, n_samples, n_variants, n_samples, alt_number,
+                        multiallelic_rate, missing_rate, position_spacing)
+    numalt = variants['numalt']
+    random_state = np.random.RandomState([seed, _VCF_FIELDS_STREAM, block_index])
+
+    called = gt[:, :, 0] >= 0
+    if 'DP' in info_fields or 'DP' in format_fields or 'AD' in format_fields:
+        depth = random_state.poisson(_MEAN_DEPTH, size=called.shape)
+        depth[~called] = 0
+
+    # Sample columns: missing calls are written as "./." alone (trailing FORMAT fields may be omitted)
+    codes = (gt[:, :, 0].astype(np.intp) + 1) * (alt_number + 2) + gt[:, :, 1] + 1
+    calls = _genotype_strings(alt_number)[codes]
+    if len(format_fields) > 1:
+        values = np.full(called.shape, '', dtype=object)
+        for field in format_fields[1:]:
+            if field == 'DP':
+                field_values = _to_strings(depth)
+            elif field == 'GQ':
+                field_values = _to_strings(random_state.randint(0, 100, size=called.shape))
+            else:
+                # Depth of each allele of the call (0 for the other alleles of the variant)
+                allele_depths = [_to_strings(depth * np.sum(gt == allele, axis=2) // PLOIDY)
+                                 for allele in range(alt_number + 1)]
+                field_values = allele_depths[0]
+                for allele in range(1, alt_number + 1):
+                    field_values = np.where(numalt[:, np.newaxis] >= allele,
+                                            field_values + ',' + allele_depths[allele], field_values)
+            values = values + ':' + field_values
+        calls = np.where(called, calls + values, calls)
+
+    ns = np.sum(called, axis=1)
+    an = ns * PLOIDY
+    if 'AC' in info_fields or 'AF' in info_fields:
+        ac = np.stack([np.sum(gt == allele, axis=(1, 2)) for allele in range(1, alt_number + 1)], axis=1)
+    if 'DP' in info_fields:
+        total_depth = np.sum(depth, axis=1)
+    format_column = ':'.join(format_fields)
+
+    lines = []
+    for i, (pos, ref, alt, sample_calls) in enumerate(zip(variants['POS'], variants['REF'], variants['ALT'],
+                                                          calls.tolist())):
+        info = []
+        for field in info_fields:
+            if field == 'NS':
+                info.append('NS={}'.format(ns[i]))
+            elif field == 'AN':
+                info.append('AN={}'.format(an[i]))
+            elif field == 'AC':
+                info.append('AC=' + ','.join(str(count) for count in ac[i, :numalt[i]]))
+            elif field == 'AF':
+                info.append('AF=' + ','.join('{:.4g}'.format(count / an[i]) if an[i] > 0 else '.'
+                                             for count in ac[i, :numalt[i]]))
+            else:
+                info.append('DP={}'.format(total_depth[i]))
+        lines.append('\t'.join([chromosome, str(pos), '.', ref, ','.join(alt[:numalt[i]]), '.', 'PASS',
+                                ';'.join(info) if len(info) > 0 else '.', format_column] + sample_calls))
+    return '\n'.join(lines) + '\n'
+
+
+def _vcf_block_compressed(compression, compression_level, *args):
+    return compress_block(vcf_block(*args).encode('ascii'), compression, compression_level)
+
+
+def _genotype_strings(alt_number):
+    alleles = range(-1, alt_number + 1)
+    return np.array(['./.' if a < 0 or b < 0 else '{}/{}'.format(a, b) for a in alleles for b in alleles],
+                    dtype=object)
+
+
+def _to_strings(values):
+    return values.astype(str).astype(object)
+
+
+def _sample_names(n_samples):
+    return ['SYN{:08d}'.format(i) for i in range(n_samples)]
+
+
+def generate_vcf(output_vcf_path, n_variants, n_samples, seed=0, missing_rate=0.0, multiallelic_rate=0.0,
+                 alt_number=3, info_fields=('NS', 'AN', 'AC', 'AF'), format_fields=('GT',), compression=None,
+                 compression_level=6, n_workers=None, chromosome='1', position_spacing=100):
+    """
+    Generates a synthetic VCF file. Blocks of records are generated and compressed in parallel by worker processes,
+    and written out in order as they complete, so that the file is streamed to disk rather than held in memory.
+    :param output_vcf_path: The desired VCF output location; an existing file there is overwritten
+    :param n_variants: number of variants
+    :param n_samples: number of samples
+    :param seed: seed of the random number generators; the same seed and parameters produce the same file
+    :param missing_rate: fraction of genotype calls which are missing
+    :param multiallelic_rate: fraction of variants with more than one ALT allele
+    :param alt_number: maximum number of ALT alleles of a variant; at most 3 are used, as all variants are SNPs
+    :param info_fields: names of the INFO fields to write, from VCF_INFO_FIELDS
+    :param format_fields: names of the FORMAT fields to write, from VCF_FORMAT_FIELDS (GT is always written first)
+    :param compression: 'none', 'gzip' or 'bgzf'. If None, BGZF is used for paths ending with ".gz"
+    :param compression_level: zlib compression level
+    :param n_workers: number of worker processes. If None, the number of CPU cores is used
+    :param chromosome: name of the chromosome of all variants
+    :param position_spacing: average distance between the positions of consecutive variants
+    :type output_vcf_path: str
+    :type n_variants: int
+    :type n_samples: int
+    :type seed: int
+    :type missing_rate: float
+    :type multiallelic_rate: float
+    :type alt_number: int
+    :type info_fields: list
+    :type format_fields: list
+    :type compression: str
+    :type compression_level: int
+    :type n_workers: int
+    :type chromosome: str
+    :type position_spacing: int
+    :return: number of bytes written
+    """
+    _check_parameters(n_variants, n_samples, missing_rate, multiallelic_rate, alt_number, position_spacing)
+    for field in info_fields:
+        if field not in VCF_INFO_FIELDS:
+            raise ValueError('Unsupported INFO field: {} (expected one of {}).'.format(
+                field, ', '.join(VCF_INFO_FIELDS.keys())))
+    for field in format_fields:
+        if field not in VCF_FORMAT_FIELDS:
+            raise ValueError('Unsupported FORMAT field: {} (expected one of {}).'.format(
+                field, ', '.join(VCF_FORMAT_FIELDS.keys())))
+    format_fields = ['GT'] + [field for field in format_fields if field != 'GT']
+
+    output_vcf_path = str(output_vcf_path)
+    if compression is None:
+        compression = 'bgzf' if output_vcf_path.endswith('.gz') else 'none'
+    if compression not in VCF_COMPRESSION_TYPES:
+        raise ValueError('Unsupported compression: {} (expected one of {}).'.format(
+            compression, ', '.join(VCF_COMPRESSION_TYPES)))
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    block_length = max(1, _VCF_BLOCK_CALLS // n_samples)
+    n_blocks = (n_variants + block_length - 1) // block_length
+    block_args = [(compression, compression_level, seed, block_index, block_length, n_variants, n_samples,
+                   alt_number, multiallelic_rate, missing_rate, position_spacing, chromosome, list(info_fields),
+                   format_fields)
+                  for block_index in range(n_blocks)]
+
+    print('[Generate] Generating VCF with {} variants x {} samples (seed {}, {} compression, {} workers).'.format(
+        n_variants, n_samples, seed, compression, n_workers))
+
+    bytes_written = 0
+    with open(output_vcf_path, 'wb') as vcf_file:
+        header = vcf_header(n_samples, info_fields, format_fields, chromosome,
+                            contig_length=(n_variants + 1) * position_spacing)
+        bytes_written += vcf_file.write(compress_block(header.encode('ascii'), compression, compression_level))
+
+        if n_workers <= 1:
+            for args in block_args:
+                bytes_written += vcf_file.write(_vcf_block_compressed(*args))
+        else:
+            # Keep a bounded number of blocks in flight, and write them in order
+            with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers,
+                                                        mp_context=multiprocessing.get_context('spawn')) as executor:
+                pending = collections.deque()
+                for args in block_args:
+                    pending.append(executor.submit(_vcf_block_compressed, *args))
+                    if len(pending) >= 2 * n_workers:
+                        bytes_written += vcf_file.write(pending.popleft().result())
+                while len(pending) > 0:
+                    bytes_written += vcf_file.write(pending.popleft().result())
+
+        if compression == 'bgzf':
+            bytes_written += vcf_file.write(_BGZF_EOF)
+
+    print('[Generate] Synthetic VCF file written to {} ({} bytes).'.format(output_vcf_path, bytes_written))
+    return bytes_written
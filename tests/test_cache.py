@@ -0,0 +1,64 @@
+""" Unit test for the intermediate result cache.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_cache
+"""
+import unittest
+import numpy as np
+import dask.array as da
+import allel
+
+from genben.cache import IntermediateResultCache
+
+
+class TestIntermediateResultCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = IntermediateResultCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return np.arange(10)
+
+        for _ in range(3):
+            result = cache.get('values', compute)
+            np.testing.assert_array_equal(np.arange(10), result)
+
+        self.assertEqual(1, len(calls), msg='Cached result was recomputed.')
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(np.arange(10).nbytes, cache.nbytes)
+
+    def test_evict(self):
+        cache = IntermediateResultCache()
+        cache.get('a', lambda: np.zeros(100))
+        cache.get('b', lambda: np.zeros(50))
+        cache.evict('a')
+        self.assertNotIn('a', cache)
+        self.assertIn('b', cache)
+        self.assertEqual(np.zeros(50).nbytes, cache.nbytes)
+
+        cache.clear()
+        self.assertEqual(0, cache.nbytes)
+
+    def test_disabled(self):
+        cache = IntermediateResultCache(enabled=False)
+        cache.get('values', lambda: np.arange(10))
+        cache.get('values', lambda: np.arange(10))
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(0, cache.nbytes)
+
+    def test_persist_dask(self):
+        cache = IntermediateResultCache()
+        g = np.random.RandomState(0).randint(0, 2, size=(100, 10, 2)).astype('i1')
+        gt = allel.GenotypeDaskArray(da.from_array(g, chunks=(20, 5, 2)))
+
+        ac = cache.get('ac', lambda: gt.count_alleles())
+        self.assertIsInstance(ac, allel.AlleleCountsDaskArray)
+        # A persisted collection has one materialized task per chunk
+        self.assertEqual(len(ac.values.__dask_keys__()), len(ac.values.__dask_graph__()))
+        np.testing.assert_array_equal(allel.GenotypeArray(g).count_alleles(), ac.compute())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,10 @@
 
 """
 import unittest
+import os
 import sys
+import json
+import subprocess
 
 try:
     from unittest.mock import patch
@@ -12,6 +15,13 @@ except ImportError:
     from mock import patch
 from genben import cli
 
+# Maximum time to import the command line interface, in seconds
+IMPORT_TIME_BUDGET = 0.5
+
+# Libraries which only the commands that need them should load
+DEFERRED_MODULES = ['allel', 'dask', 'distributed', 'influxdb', 'numcodecs', 'numpy', 'pandas', 'scipy', 'sklearn',
+                    'zarr']
+
 
 class TestCommandLineInterface(unittest.TestCase):
 
@@ -37,6 +47,57 @@ class TestCommandLineInterface(unittest.TestCase):
         # Test group 3 - Tests if it the argparser is setting default values """
         self.run_subparser_test("exec", "config_file", "./benchmark.conf")
 
+    def test_compare_command_arguments(self):
+        """ Tests parsing of the compare command, which takes a baseline and one or more candidate result sets. """
+        testargs = ["prog", "compare", "baseline.csv", "candidate_1.csv", "candidate_2", "--threshold", "0.1"]
+        with patch.object(sys, 'argv', testargs):
+            args = cli.get_cli_arguments()
+            self.assertEqual(args["command"], "compare")
+            self.assertEqual(args["baseline"], "baseline.csv")
+            self.assertEqual(args["candidates"], ["candidate_1.csv", "candidate_2"])
+            self.assertEqual(args["threshold"], 0.1)
+            self.assertEqual(args["metric"], "execution_time")
+
+        # At least one candidate is required
+        testargs = ["prog", "compare", "baseline.csv"]
+        with patch.object(sys, 'argv', testargs):
+            with self.assertRaises(SystemExit):
+                cli.get_cli_arguments()
+
+    def test_generate_command_arguments(self):
+        """ Tests parsing of the generate command, which requires the dataset dimensions. """
+        testargs = ["prog", "generate", "--num_variants", "1000", "--num_samples", "20", "--missing_rate", "0.1"]
+        with patch.object(sys, 'argv', testargs):
+            args = cli.get_cli_arguments()
+            self.assertEqual(args["command"], "generate")
+            self.assertEqual(args["num_variants"], 1000)
+            self.assertEqual(args["num_samples"], 20)
+            self.assertEqual(args["missing_rate"], 0.1)
+            self.assertEqual(args["seed"], 0)
+            self.assertIsNone(args["chunk_length"])
+
+        testargs = ["prog", "generate", "--num_variants", "1000"]
+        with patch.object(sys, 'argv', testargs):
+            with self.assertRaises(SystemExit):
+                cli.get_cli_arguments()
+
+    def test_import_time(self):
+        """ Tests that importing the command line interface does not load the benchmark libraries, and stays within
+        the startup time budget. """
+        # Measured directly (rather than with python -X importtime, which needs Python 3.7)
+        code = ("import sys, json, time\n"
+                "start = time.perf_counter()\n"
+                "import genben.cli\n"
+                "import_time = time.perf_counter() - start\n"
+                "print(json.dumps([[m for m in {} if m in sys.modules], import_time]))".format(DEFERRED_MODULES))
+        process = subprocess.run([sys.executable, "-c", code],
+                                 cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        imported_modules, import_time = json.loads(process.stdout)
+        self.assertEqual([], imported_modules, "Modules imported at startup.")
+        self.assertLess(import_time, IMPORT_TIME_BUDGET,
+                        "Importing genben took {:.3f}s (budget {}s).".format(import_time, IMPORT_TIME_BUDGET))
+
     def test_parser_expected_failing(self):
         """ Test that parsing fails on no command option (a choice of a subparser), or an unrecognized command ("something") """
         testargs = ["prog"]
@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+from genben import cli, compare
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+def _results(timings):
+    rows = []
+    for operation_name, samples in timings.items():
+        for run_number, sample in enumerate(samples, start=1):
+            rows.append({'run_number': run_number, 'operation': operation_name, 'execution_time': sample})
+    return pd.DataFrame(rows)
+
+
+class TestCompare(unittest.TestCase):
+    def test_compare_results(self):
+        rng = np.random.RandomState(0)
+        baseline = _results({'Unchanged': 1.0 + 0.01 * rng.rand(10),
+                             'Faster': 2.0 + 0.01 * rng.rand(10),
+                             'Slower': 1.0 + 0.01 * rng.rand(10),
+                             'Baseline only': [1.0]})
+        candidate = _results({'Unchanged': 1.0 + 0.01 * rng.rand(10),
+                              'Faster': 1.0 + 0.01 * rng.rand(10),
+                              'Slower': 1.5 + 0.01 * rng.rand(10)})
+
+        comparisons = {c['operation']: c for c in compare.compare_results(baseline, candidate, threshold=0.1)}
+        self.assertEqual(['Unchanged', 'Faster', 'Slower'], list(comparisons.keys()))
+
+        self.assertFalse(comparisons['Unchanged']['regression'])
+        self.assertGreater(comparisons['Unchanged']['ratio_ci_high'], 0.99)
+        self.assertLess(comparisons['Unchanged']['ratio_ci_low'], 1.01)
+
+        self.assertTrue(comparisons['Faster']['significant'])
+        self.assertFalse(comparisons['Faster']['regression'])
+        self.assertAlmostEqual(2.0, comparisons['Faster']['speedup'], delta=0.05)
+        self.assertIn('faster', compare.format_comparison(comparisons['Faster']))
+
+        self.assertTrue(comparisons['Slower']['regression'])
+        self.assertLess(comparisons['Slower']['speedup'], 1)
+        self.assertIn('REGRESSION', compare.format_comparison(comparisons['Slower']))
+
+        # A slowdown within the threshold is not a regression
+        comparisons = compare.compare_results(baseline, candidate, threshold=1.0)
+        self.assertFalse(any(c['regression'] for c in comparisons))
+
+    def test_load_results(self):
+        results_file = 'test_compare_load_results.csv'
+        for delimiter in ['|', ',']:
+            _results({'Operation': [1.0, 2.0]}).to_csv(results_file, sep=delimiter, index=False)
+            results = compare.load_results(results_file)
+            self.assertEqual(['run_number', 'operation', 'execution_time'], list(results.columns))
+            self.assertEqual([1.0, 2.0], list(results['execution_time']))
+        self.assertEqual(results_file, compare.results_path(results_file))
+        self.assertEqual('some_label.csv', compare.results_path('some_label'))
+        os.remove(results_file)
+
+    def test_compare_command_exit_status(self):
+        baseline_file = 'test_compare_baseline.csv'
+        candidate_file = 'test_compare_candidate.csv'
+        _results({'Operation': [1.0, 1.01, 0.99, 1.02, 0.98]}).to_csv(baseline_file, sep='|', index=False)
+
+        # No regression: the command completes normally
+        _results({'Operation': [1.0, 1.01, 0.99, 1.02, 0.98]}).to_csv(candidate_file, sep='|', index=False)
+        with patch.object(sys, 'argv', ['prog', 'compare', baseline_file, candidate_file]):
+            cli._main()
+
+        # Regression: the command exits with a non-zero status
+        _results({'Operation': [2.0, 2.01, 1.99, 2.02, 1.98]}).to_csv(candidate_file, sep='|', index=False)
+        with patch.object(sys, 'argv', ['prog', 'compare', baseline_file, candidate_file]):
+            with self.assertRaises(SystemExit) as cm:
+                cli._main()
+            self.assertEqual(1, cm.exception.code)
+
+        os.remove(baseline_file)
+        os.remove(candidate_file)
+
+
+if __name__ == "__main__":
+    unittest.main()
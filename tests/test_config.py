@@ -26,6 +26,13 @@ class TestConfigurationFile(unittest.TestCase):
             self.assertEqual(runtime_configuration.output["output_results"], "~/benchmark/results.psv",
                              "Runtime configuration did not have the right output file.")
 
+    def test_blosc_shuffle_modes(self):
+        """ Tests that the Blosc shuffle modes accepted in the configuration are those of numcodecs. """
+        from numcodecs import Blosc
+        self.assertEqual([Blosc.NOSHUFFLE, Blosc.SHUFFLE, Blosc.BITSHUFFLE, Blosc.AUTOSHUFFLE],
+                         config.vcf_to_zarr_blosc_shuffle_types)
+        self.assertEqual(Blosc.AUTOSHUFFLE, config.VCFtoZarrConfigurationRepresentation.blosc_shuffle_mode)
+
     def test_generate_default_config(self):
         location = "./test_generate_default_config.conf"
         location_expected = "./genben/config/benchmark.conf.default"
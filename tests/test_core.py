@@ -7,8 +7,14 @@ from genben.config import \
     DataDirectoriesConfigurationRepresentation
 from time import sleep
 import os
+import json
 import shutil
 
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
 
 class TestCoreBenchmark(unittest.TestCase):
     def test_benchmark_profiler_results(self):
@@ -47,6 +53,141 @@ class TestCoreBenchmark(unittest.TestCase):
 
             i += 1
 
+    def test_benchmark_profiler_cpu_time(self):
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = False
+        output_config.output_influxdb_enabled = False
+        profiler = BenchmarkProfiler(output_config, 'test_benchmark_profiler_cpu_time')
+
+        # Operations shorter than a millisecond are still resolved by the monotonic timer
+        profiler.start_benchmark('Empty operation')
+        profiler.end_benchmark()
+        results = profiler.get_benchmark_results()
+        self.assertGreater(results.exec_time, 0)
+        self.assertLess(results.exec_time, 0.1)
+
+        # A busy loop in a single thread uses about as much CPU time as wall time
+        profiler.start_benchmark('Busy loop')
+        end = time.perf_counter() + 0.2
+        while time.perf_counter() < end:
+            pass
+        profiler.end_benchmark()
+        results = profiler.get_benchmark_results()
+        self.assertGreater(results.cpu_time, 0)
+        self.assertGreater(results.cpu_wall_ratio, 0.5)
+        self.assertLess(results.cpu_wall_ratio, 1.5)
+
+    def test_benchmark_profiler_resources(self):
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = False
+        output_config.output_influxdb_enabled = False
+        profiler = BenchmarkProfiler(output_config, 'test_benchmark_profiler_resources', trace_allocations=True)
+
+        profiler.start_benchmark('Allocate memory')
+        data = np.ones(32 * 2 ** 20, dtype='i1')
+        sleep(0.05)
+        del data
+        profiler.end_benchmark()
+
+        results = profiler.get_benchmark_results()
+        self.assertGreater(results.peak_rss_bytes, 32 * 2 ** 20)
+        self.assertGreaterEqual(results.tracemalloc_peak_bytes, 32 * 2 ** 20)
+        self.assertGreaterEqual(results.voluntary_context_switches, 0)
+        self.assertGreaterEqual(results.involuntary_context_switches, 0)
+        if os.path.exists('/proc/self/io'):
+            self.assertGreaterEqual(results.io_read_bytes, 0)
+            self.assertGreaterEqual(results.io_write_bytes, 0)
+
+        # Allocations are not traced unless enabled
+        profiler = BenchmarkProfiler(output_config, 'test_benchmark_profiler_resources')
+        profiler.start_benchmark('Empty operation')
+        profiler.end_benchmark()
+        self.assertIsNone(profiler.get_benchmark_results().tracemalloc_peak_bytes)
+
+    def test_benchmark_profiler_spans(self):
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        profiler_label = 'test_benchmark_profiler_spans'
+        csv_file = '{}.csv'.format(profiler_label)
+        if os.path.exists(csv_file):
+            os.remove(csv_file)
+
+        profiler = BenchmarkProfiler(output_config, profiler_label)
+        profiler.set_run_number(1)
+
+        @profiler.span('Child 2')
+        def child():
+            sleep(0.2)
+
+        # Nest operations using both the context manager and start/end calls
+        with profiler.span('Parent'):
+            sleep(0.1)
+            profiler.start_benchmark('Child 1')
+            with profiler.span('Grandchild'):
+                sleep(0.1)
+            profiler.end_benchmark()
+            child()
+        self.assertFalse(profiler.benchmark_running)
+        profiler.close()
+
+        with open(csv_file, 'r') as f:
+            csv_lines = [line.rstrip('\n').split(',') for line in f]
+        os.remove(csv_file)
+
+        header = csv_lines[0]
+        rows = {line[header.index('operation')]: dict(zip(header, line)) for line in csv_lines[1:]}
+
+        # Operations are recorded as they end, i.e. children before their parents
+        self.assertEqual(['Grandchild', 'Child 1', 'Child 2', 'Parent'], [line[2] for line in csv_lines[1:]])
+
+        # Parent IDs link the flattened operations into a tree
+        self.assertEqual('', rows['Parent']['parent_id'])
+        self.assertEqual(rows['Parent']['span_id'], rows['Child 1']['parent_id'])
+        self.assertEqual(rows['Parent']['span_id'], rows['Child 2']['parent_id'])
+        self.assertEqual(rows['Child 1']['span_id'], rows['Grandchild']['parent_id'])
+        self.assertEqual('1', rows['Grandchild']['run_number'])
+
+        # Self time excludes nested operations, total time includes them
+        parent_total = float(rows['Parent']['execution_time'])
+        parent_self = float(rows['Parent']['self_time'])
+        self.assertGreaterEqual(parent_total, 0.4)
+        self.assertAlmostEqual(0.1, parent_self, delta=0.05)
+        self.assertAlmostEqual(parent_total, parent_self + float(rows['Child 1']['execution_time']) +
+                               float(rows['Child 2']['execution_time']), places=6)
+        self.assertAlmostEqual(0.0, float(rows['Child 1']['self_time']), delta=0.05)
+        self.assertEqual(rows['Grandchild']['execution_time'], rows['Grandchild']['self_time'])
+
+    def test_benchmark_profiler_dask_diagnostics(self):
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = False
+        output_config.output_influxdb_enabled = False
+        profiler_label = 'test_benchmark_profiler_dask_diagnostics'
+        diagnostics_file = '{}_dask_diagnostics.jsonl'.format(profiler_label)
+        if os.path.isfile(diagnostics_file):
+            os.remove(diagnostics_file)
+
+        profiler = BenchmarkProfiler(output_config, profiler_label, dask_diagnostics=True)
+        profiler.set_run_number(1)
+        with profiler.span('Dask sum'):
+            da.ones((1000, 10), chunks=(100, 10)).sum().compute(scheduler='threads')
+        span_id = profiler.get_benchmark_results().span_id
+        profiler.close()
+
+        # Diagnostics are linked to the results by run number, operation name and span ID
+        with open(diagnostics_file, 'r') as f:
+            diagnostics = [json.loads(line) for line in f]
+        self.assertEqual(1, len(diagnostics))
+        self.assertEqual(1, diagnostics[0]['run_number'])
+        self.assertEqual('Dask sum', diagnostics[0]['operation'])
+        self.assertEqual(span_id, diagnostics[0]['span_id'])
+        self.assertGreater(diagnostics[0]['n_tasks'], 0)
+        self.assertEqual(diagnostics[0]['n_tasks'], len(diagnostics[0]['task_stream']))
+
+        os.remove(diagnostics_file)
+
     def test_benchmark_results_csv(self):
         # Set up output results config for test
         output_config = OutputConfigurationRepresentation()
@@ -81,6 +222,9 @@ class TestCoreBenchmark(unittest.TestCase):
 
             i += 1
 
+        # Write buffered results
+        profiler.close()
+
         # Read results csv file
         csv_file = '{}.csv'.format(profiler_label)
 
@@ -96,7 +240,10 @@ class TestCoreBenchmark(unittest.TestCase):
             self.assertEqual(num_lines_expected, num_lines, msg='Line count in resulting csv file is incorrect.')
 
             # Ensure header (first line) of csv file is correct
-            header_expected = 'log_timestamp,run_number,operation,execution_time'
+            header_expected = 'log_timestamp,run_number,operation,execution_time,cpu_time,cpu_wall_ratio,cache_hits,' \
+                              'cache_memory_bytes,peak_rss_bytes,tracemalloc_peak_bytes,io_read_bytes,io_write_bytes,' \
+                              'voluntary_context_switches,involuntary_context_switches,span_id,parent_id,self_time,' \
+                              'status,data_type'
             header_actual = csv_lines[0]
             self.assertEqual(header_expected, header_actual)
 
@@ -107,7 +254,7 @@ class TestCoreBenchmark(unittest.TestCase):
 
                 # Ensure column count is correct
                 num_columns = len(content)
-                num_columns_expected = 4
+                num_columns_expected = 19
                 self.assertEqual(num_columns_expected, num_columns, msg='Column count for csv data is incorrect.')
 
                 # Ensure run number is correct
@@ -125,6 +272,10 @@ class TestCoreBenchmark(unittest.TestCase):
                 execution_time_expected = benchmark_times[i - 1]
                 self.assertEqual(execution_time_expected, execution_time_csv, msg='Execution time is incorrect')
 
+                # Ensure CPU time is recorded (sleeping uses little CPU time)
+                cpu_wall_ratio_csv = float(content[5])
+                self.assertLess(cpu_wall_ratio_csv, 0.5, msg='CPU/wall ratio is incorrect')
+
                 i += 1
 
         else:
@@ -183,7 +334,7 @@ class TestCoreBenchmark(unittest.TestCase):
 
             # Check line count of csv file
             num_lines = len(csv_lines)
-            num_lines_expected = 11
+            num_lines_expected = 13
             self.assertEqual(num_lines_expected, num_lines, msg='Unexpected line count in resulting csv file.')
 
             csv_operation_names = []
@@ -191,7 +342,7 @@ class TestCoreBenchmark(unittest.TestCase):
             for csv_line in csv_lines:
                 line_split = csv_line.split(',')
                 line_cols_actual = len(line_split)
-                line_cols_expected = 4
+                line_cols_expected = 19
 
                 # Ensure correct number of data columns exist for current line of data
                 self.assertEqual(line_cols_expected, line_cols_actual,
@@ -217,9 +368,10 @@ class TestCoreBenchmark(unittest.TestCase):
         if os.path.isdir(test_dir):
             shutil.rmtree(test_dir)
 
-        # Remove the csv file from this unit test
-        if os.path.isfile(csv_file):
-            os.remove(csv_file)
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
 
     def test_benchmark_pca(self):
         test_dir = './tests_temp/'
@@ -252,6 +404,10 @@ class TestCoreBenchmark(unittest.TestCase):
         bench_conf.pca_data_scaler = config.benchmark_pca_data_scaler_types[config.PCA_DATA_SCALER_PATTERSON]
         bench_conf.genotype_array_type = config.GENOTYPE_ARRAY_CHUNKED
         bench_conf.pca_ld_enabled = True
+        bench_conf.pca_gram_enabled = True
+        bench_conf.pca_incremental_enabled = True
+        bench_conf.pca_solvers = ['arpack', 'block_krylov', 'randomized']
+        bench_conf.pca_solver_exact_reference = True
 
         data_dirs = DataDirectoriesConfigurationRepresentation()
         data_dirs.vcf_dir = './tests/data/'
@@ -273,7 +429,7 @@ class TestCoreBenchmark(unittest.TestCase):
 
             # Check line count of csv file
             num_lines = len(csv_lines)
-            num_lines_expected = 14
+            num_lines_expected = 23
             self.assertEqual(num_lines_expected, num_lines, msg='Unexpected line count in resulting csv file.')
 
             csv_operation_names = []
@@ -281,7 +437,7 @@ class TestCoreBenchmark(unittest.TestCase):
             for csv_line in csv_lines:
                 line_split = csv_line.split(',')
                 line_cols_actual = len(line_split)
-                line_cols_expected = 4
+                line_cols_expected = 19
 
                 # Ensure correct number of data columns exist for current line of data
                 self.assertEqual(line_cols_expected, line_cols_actual,
@@ -296,9 +452,15 @@ class TestCoreBenchmark(unittest.TestCase):
                                     'PCA: Count biallelic singletons',
                                     'PCA: Remove singletons and multiallelic SNPs',
                                     'PCA: Transform genotype data for PCA',
+                                    'PCA: Select random subset of variants',
                                     'PCA: Apply LD pruning',
                                     'PCA: Run conventional PCA analysis (scaler: patterson)',
-                                    'PCA: Run randomized PCA analysis (scaler: patterson)']
+                                    'PCA: Run randomized PCA analysis (scaler: patterson)',
+                                    'PCA: Run Gram-matrix PCA analysis (scaler: patterson)',
+                                    'PCA: Run incremental PCA analysis (scaler: patterson)',
+                                    'PCA: Run arpack solver PCA analysis (scaler: patterson)',
+                                    'PCA: Run block_krylov solver PCA analysis (scaler: patterson)',
+                                    'PCA: Run randomized solver PCA analysis (scaler: patterson)']
 
             for test_operation_name in test_operation_names:
                 if test_operation_name not in csv_operation_names:
@@ -310,10 +472,563 @@ class TestCoreBenchmark(unittest.TestCase):
         if os.path.isdir(test_dir):
             shutil.rmtree(test_dir)
 
-        # Remove the csv file from this unit test
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_numba_engine_cross_check(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_numba_engine_cross_check'
+        csv_file = '{}.csv'.format(benchmark_label)
+
+        # Remove the test data directory from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv file from any previous unit tests
+        if os.path.isfile(csv_file):
+            os.remove(csv_file)
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        for genotype_array_type in [config.GENOTYPE_ARRAY_NORMAL,
+                                    config.GENOTYPE_ARRAY_DASK,
+                                    config.GENOTYPE_ARRAY_CHUNKED]:
+            bench_conf = BenchmarkConfigurationRepresentation()
+            bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+            bench_conf.results_output_config = output_config
+            bench_conf.benchmark_number_runs = 1
+            bench_conf.benchmark_data_input = 'vcf'
+            bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+            bench_conf.benchmark_aggregations = True
+            bench_conf.benchmark_pca = True
+            bench_conf.genotype_array_type = genotype_array_type
+            bench_conf.compute_engine = config.COMPUTE_ENGINE_NUMBA
+            bench_conf.compute_engine_cross_check = True
+            bench_conf.pca_ld_enabled = True
+
+            # Run the benchmark and ensure the Numba kernels match scikit-allel (a mismatch exits)
+            benchmark = Benchmark(bench_conf=bench_conf,
+                                  data_dirs=data_dirs,
+                                  benchmark_label=benchmark_label)
+            benchmark.run_benchmark()
+
+        # Remove the test data directory from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_operations(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_operations'
+        csv_file = '{}.csv'.format(benchmark_label)
+
+        # Remove the test data directory from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv file from any previous unit tests
         if os.path.isfile(csv_file):
             os.remove(csv_file)
 
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        # Run the operations on each genotype array type, and once with the Numba kernels
+        runs = [(genotype_array_type, config.COMPUTE_ENGINE_ALLEL)
+                for genotype_array_type in sorted(config.genotype_array_types)]
+        runs.append((config.GENOTYPE_ARRAY_DASK, config.COMPUTE_ENGINE_NUMBA))
+        for genotype_array_type, compute_engine in runs:
+            bench_conf = BenchmarkConfigurationRepresentation()
+            bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+            bench_conf.results_output_config = output_config
+            bench_conf.benchmark_number_runs = 1
+            bench_conf.benchmark_data_input = 'vcf'
+            bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+            bench_conf.benchmark_operations = ['allele_count', 'statistics']
+            bench_conf.genotype_array_type = genotype_array_type
+            bench_conf.compute_engine = compute_engine
+            bench_conf.compute_engine_cross_check = True
+
+            benchmark = Benchmark(bench_conf=bench_conf,
+                                  data_dirs=data_dirs,
+                                  benchmark_label=benchmark_label)
+            benchmark.run_benchmark()
+
+        # Ensure the selected operations, their groups and the preparation of their inputs were recorded for each run
+        results = pd.read_csv(csv_file)
+        operation_names = ['Simple aggregations',
+                           'Allele Count (All Samples)',
+                           'Statistics',
+                           'Prepare Input: Allele Counts',
+                           'Statistics: Allele Frequencies',
+                           'Prepare Input: Alternate Allele Counts per Call',
+                           'Statistics: Mean Alternate Allele Count per Sample',
+                           'Statistics: Sequence Diversity']
+        for operation_name in operation_names:
+            self.assertEqual(len(runs), np.sum(results['operation'] == operation_name),
+                             msg='Operation {} was not recorded for each run.'.format(operation_name))
+        self.assertNotIn('Genotype Count: Heterozygous per Variant', set(results['operation']))
+
+        # Remove the test data directory from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_packed_genotype_array(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_packed_genotype_array'
+        csv_file = '{}.csv'.format(benchmark_label)
+
+        # Remove the test data directory from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv file from any previous unit tests
+        if os.path.isfile(csv_file):
+            os.remove(csv_file)
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 1
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_aggregations = True
+        bench_conf.benchmark_pca = True
+        bench_conf.genotype_array_type = config.GENOTYPE_ARRAY_PACKED
+        bench_conf.pca_ld_enabled = True
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        # Run the benchmark and ensure nothing fails
+        benchmark = Benchmark(bench_conf=bench_conf,
+                              data_dirs=data_dirs,
+                              benchmark_label=benchmark_label)
+        benchmark.run_benchmark()
+
+        # Ensure csv file was created with all aggregation and PCA operations
+        if os.path.exists(csv_file):
+            with open(csv_file, 'r') as f:
+                csv_lines = [line.rstrip('\n') for line in f]
+
+            num_lines = len(csv_lines)
+            num_lines_expected = 24
+            self.assertEqual(num_lines_expected, num_lines, msg='Unexpected line count in resulting csv file.')
+        else:
+            self.fail(msg='Resulting csv file could not be found.')
+
+        # Remove the test data directory from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_pca_intermediate_cache(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_pca_intermediate_cache'
+        csv_file = '{}.csv'.format(benchmark_label)
+
+        # Remove the test data directory from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv file from any previous unit tests
+        if os.path.isfile(csv_file):
+            os.remove(csv_file)
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 1
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_pca = True
+        bench_conf.genotype_array_type = config.GENOTYPE_ARRAY_DASK
+        bench_conf.pca_cache_intermediate_results = True
+        bench_conf.pca_subset_size = 200
+        bench_conf.pca_subset_method = config.PCA_SUBSET_METHOD_CHUNKED
+        bench_conf.pca_gram_enabled = True
+        bench_conf.pca_incremental_enabled = True
+        bench_conf.pca_data_precision = config.benchmark_pca_data_precision_types[config.PCA_DATA_PRECISION_FLOAT32]
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        # Run the benchmark and ensure nothing fails
+        benchmark = Benchmark(bench_conf=bench_conf,
+                              data_dirs=data_dirs,
+                              benchmark_label=benchmark_label)
+        benchmark.run_benchmark()
+
+        # Ensure cache usage was recorded for the PCA stages
+        if os.path.exists(csv_file):
+            with open(csv_file, 'r') as f:
+                csv_lines = [line.rstrip('\n').split(',') for line in f]
+
+            cache_results = {line[2]: (int(line[6]), int(line[7])) for line in csv_lines[1:]}
+            self.assertIn('PCA: Persist intermediate results', cache_results)
+
+            # The singleton count reuses the max allele computed for the multiallelic count
+            cache_hits, cache_memory_bytes = cache_results['PCA: Count biallelic singletons']
+            self.assertEqual(1, cache_hits)
+            self.assertGreater(cache_memory_bytes, 0)
+
+            # Single precision is used by genben's engines, while scikit-allel's PCA keeps its float16 default
+            data_types = {line[2]: line[18] for line in csv_lines[1:]}
+            self.assertEqual('float16', data_types['PCA: Run conventional PCA analysis (scaler: patterson)'])
+            self.assertEqual('float16', data_types['PCA: Run randomized PCA analysis (scaler: patterson)'])
+            self.assertEqual('float32', data_types['PCA: Run Gram-matrix PCA analysis (scaler: patterson)'])
+            self.assertEqual('float32', data_types['PCA: Run incremental PCA analysis (scaler: patterson)'])
+            self.assertEqual('', data_types['PCA: Persist intermediate results'])
+        else:
+            self.fail(msg='Resulting csv file could not be found.')
+
+        # Remove the test data directory from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_pca_n_alt_cache(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_pca_n_alt_cache'
+        csv_file = '{}.csv'.format(benchmark_label)
+
+        # Remove the test data directory from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv file from any previous unit tests
+        if os.path.isfile(csv_file):
+            os.remove(csv_file)
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 2
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_pca = True
+        bench_conf.genotype_array_type = config.GENOTYPE_ARRAY_DASK
+        bench_conf.pca_subset_size = 200
+        bench_conf.pca_subset_seed = 42
+        bench_conf.pca_n_alt_cache_enabled = True
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+        data_dirs.cache_dir = './tests_temp/cache/'
+
+        # Run the benchmark and ensure nothing fails
+        benchmark = Benchmark(bench_conf=bench_conf,
+                              data_dirs=data_dirs,
+                              benchmark_label=benchmark_label)
+        benchmark.run_benchmark()
+
+        # The first run stores the PCA input; the second run loads it instead of transforming the genotype data
+        if os.path.exists(csv_file):
+            with open(csv_file, 'r') as f:
+                csv_lines = [line.rstrip('\n').split(',') for line in f]
+
+            operations = {1: [], 2: []}
+            for line in csv_lines[1:]:
+                operations[int(line[1])].append(line[2])
+
+            self.assertIn('PCA: Transform genotype data for PCA', operations[1])
+            self.assertIn('PCA: Store transformed genotype data in cache', operations[1])
+            self.assertNotIn('PCA: Load transformed genotype data from cache', operations[1])
+
+            self.assertIn('PCA: Load transformed genotype data from cache', operations[2])
+            self.assertNotIn('PCA: Transform genotype data for PCA', operations[2])
+            self.assertNotIn('PCA: Select random subset of variants', operations[2])
+            self.assertIn('PCA: Run conventional PCA analysis (scaler: patterson)', operations[2])
+        else:
+            self.fail(msg='Resulting csv file could not be found.')
+
+        # Remove the test data directory from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+
+        # Remove the csv files from this unit test
+        for output_file in [csv_file, '{}_summary.csv'.format(benchmark_label)]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_warmup_and_adaptive_runs(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_warmup_and_adaptive_runs'
+        csv_file = '{}.csv'.format(benchmark_label)
+        summary_csv_file = '{}_summary.csv'.format(benchmark_label)
+        metadata_file = '{}_metadata.jsonl'.format(benchmark_label)
+
+        # Remove the test data directory and output files from any previous unit tests
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+        for output_file in [csv_file, summary_csv_file, metadata_file]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        # An unreachable confidence interval target, so that adaptive runs continue up to the maximum
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 2
+        bench_conf.benchmark_warmup_runs = 1
+        bench_conf.benchmark_adaptive_enabled = True
+        bench_conf.benchmark_adaptive_ci_target = 1e-12
+        bench_conf.benchmark_adaptive_max_runs = 3
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_aggregations = True
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        dask_cluster_parameters = {'mode': 'local_cluster', 'n_workers': 2}
+        benchmark = Benchmark(bench_conf=bench_conf,
+                              data_dirs=data_dirs,
+                              benchmark_label=benchmark_label,
+                              dask_cluster_parameters=dask_cluster_parameters)
+        benchmark.run_benchmark()
+
+        # The Dask cluster parameters are recorded with the results
+        with open(metadata_file, 'r') as f:
+            metadata = [json.loads(line) for line in f]
+        self.assertEqual(1, len(metadata))
+        self.assertEqual(dask_cluster_parameters, metadata[0]['dask_cluster'])
+
+        # Only the measured runs are recorded
+        results = pd.read_csv(csv_file)
+        self.assertEqual([1, 2, 3], sorted(results['run_number'].unique()))
+
+        # Each operation's summary covers one sample per measured run
+        summary = pd.read_csv(summary_csv_file)
+        self.assertIn('Allele Count (All Samples)', list(summary['operation']))
+        self.assertTrue((summary['n_samples'] == 3).all())
+        self.assertTrue((summary['ci_low'] <= summary['median']).all())
+        self.assertTrue((summary['median'] <= summary['ci_high']).all())
+
+        # Remove the test data directory and output files from this unit test
+        if os.path.isdir(test_dir):
+            shutil.rmtree(test_dir)
+        for output_file in [csv_file, summary_csv_file, metadata_file]:
+            if os.path.isfile(output_file):
+                os.remove(output_file)
+
+    def test_benchmark_isolated_runs(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_isolated_runs'
+        csv_file = '{}.csv'.format(benchmark_label)
+        summary_csv_file = '{}_summary.csv'.format(benchmark_label)
+
+        def remove_output():
+            if os.path.isdir(test_dir):
+                shutil.rmtree(test_dir)
+            for output_file in [csv_file, summary_csv_file]:
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+
+        def run_isolated(number_runs, memory_limit=0, timeout=0):
+            remove_output()
+
+            vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+            vcf_to_zar_config.enabled = True
+
+            output_config = OutputConfigurationRepresentation()
+            output_config.output_csv_enabled = True
+            output_config.output_csv_delimiter = ','
+            output_config.output_influxdb_enabled = False
+
+            bench_conf = BenchmarkConfigurationRepresentation()
+            bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+            bench_conf.results_output_config = output_config
+            bench_conf.benchmark_number_runs = number_runs
+            bench_conf.benchmark_data_input = 'vcf'
+            bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+            bench_conf.benchmark_aggregations = True
+            bench_conf.benchmark_isolation_enabled = True
+            bench_conf.benchmark_isolation_memory_limit = memory_limit
+            bench_conf.benchmark_isolation_timeout = timeout
+
+            data_dirs = DataDirectoriesConfigurationRepresentation()
+            data_dirs.vcf_dir = './tests/data/'
+            data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+            data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+            data_dirs.temp_dir = './tests_temp/temp/'
+
+            benchmark = Benchmark(bench_conf=bench_conf,
+                                  data_dirs=data_dirs,
+                                  benchmark_label=benchmark_label)
+            benchmark.run_benchmark()
+            return pd.read_csv(csv_file)
+
+        # Results of the subprocess are recorded by the parent process
+        results = run_isolated(1)
+        self.assertIn('Allele Count (All Samples)', list(results['operation']))
+        self.assertEqual(['ok'], list(results['status'].unique()))
+        self.assertEqual([1], list(results['run_number'].unique()))
+
+        # Failed runs are recorded, and the benchmark continues with the next run
+        results = run_isolated(2, timeout=0.01)
+        self.assertEqual(['Benchmark run', 'Benchmark run'], list(results['operation']))
+        self.assertEqual(['timeout', 'timeout'], list(results['status']))
+        self.assertEqual([1, 2], list(results['run_number']))
+
+        # A memory limit far below the size of the interpreter leaves no room to run the benchmark
+        results = run_isolated(1, memory_limit=10 ** 8)
+        self.assertEqual('oom', results['status'].iloc[-1])
+        self.assertEqual('Benchmark run', results['operation'].iloc[-1])
+
+        remove_output()
+
+    def test_benchmark_isolated_run_timeout(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_benchmark_isolated_run_timeout'
+        csv_file = '{}.csv'.format(benchmark_label)
+        summary_csv_file = '{}_summary.csv'.format(benchmark_label)
+
+        def remove_output():
+            if os.path.isdir(test_dir):
+                shutil.rmtree(test_dir)
+            for output_file in [csv_file, summary_csv_file]:
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+
+        remove_output()
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 1
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_aggregations = True
+        bench_conf.benchmark_isolation_enabled = True
+        bench_conf.benchmark_isolation_timeout = 0.01
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        benchmark = Benchmark(bench_conf=bench_conf,
+                              data_dirs=data_dirs,
+                              benchmark_label=benchmark_label)
+
+        # Process.kill() is not available before Python 3.7, so the timeout must not depend on it
+        started_processes = []
+        start_process = multiprocessing.process.BaseProcess.start
+
+        def start(process):
+            start_process(process)
+            started_processes.append(process)
+
+        with patch.object(multiprocessing.process.BaseProcess, 'start', start), \
+                patch.object(multiprocessing.process.BaseProcess, 'kill', side_effect=AttributeError,
+                                  create=True):
+            benchmark.run_benchmark()
+
+        # The timed out run is recorded, and its subprocess is killed
+        results = pd.read_csv(csv_file)
+        self.assertEqual(['Benchmark run'], list(results['operation']))
+        self.assertEqual(['timeout'], list(results['status']))
+        self.assertEqual(1, len(started_processes))
+        self.assertEqual(-signal.SIGKILL, started_processes[0].exitcode)
+
+        remove_output()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,62 @@
+""" Unit test for Dask diagnostics of benchmark operations.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_dask_diagnostics
+"""
+import unittest
+import dask.array as da
+from dask.distributed import Client, LocalCluster
+
+from genben import dask_diagnostics
+
+
+class TestDaskDiagnostics(unittest.TestCase):
+    def test_local_scheduler(self):
+        x = da.ones((1000, 10), chunks=(100, 10))
+        graph_size = len(x.sum().__dask_graph__())
+
+        self.assertIsNone(dask_diagnostics.current_client())
+        diagnostics = dask_diagnostics.OperationDaskDiagnostics()
+        diagnostics.start()
+        x.sum().compute(scheduler='threads')
+        summary = diagnostics.stop()
+
+        self.assertEqual('local', summary['scheduler'])
+        # Graphs are recorded as executed, i.e. after optimization (fusion)
+        self.assertGreater(summary['graph_size'], 0)
+        self.assertLessEqual(summary['graph_size'], graph_size)
+        self.assertGreater(summary['n_tasks'], 0)
+        self.assertEqual(summary['n_tasks'], summary['n_compute_events'])
+        self.assertEqual(0, summary['transfer_bytes'])
+        self.assertEqual(0, summary['n_spill_events'])
+        for entry in summary['task_stream']:
+            self.assertLessEqual(entry['start'], entry['stop'])
+
+        # Computations after stop() are not recorded
+        x.sum().compute(scheduler='threads')
+        self.assertEqual(summary['n_tasks'], len(diagnostics.summary['task_stream']))
+
+    def test_distributed_scheduler(self):
+        cluster = LocalCluster(n_workers=2, threads_per_worker=1, processes=False, dashboard_address=None)
+        client = Client(cluster)
+        try:
+            self.assertIs(client, dask_diagnostics.current_client())
+
+            x = da.random.random((1000, 1000), chunks=(250, 250))
+            diagnostics = dask_diagnostics.OperationDaskDiagnostics(client=client)
+            diagnostics.start()
+            (x @ x.T).sum().compute()
+            summary = diagnostics.stop()
+
+            self.assertEqual('distributed', summary['scheduler'])
+            self.assertGreater(summary['n_tasks'], 0)
+            self.assertGreater(summary['compute_time'], 0)
+            self.assertGreaterEqual(summary['transfer_bytes'], 0)
+            self.assertEqual(summary['n_transfer_events'],
+                             len([entry for entry in summary['task_stream'] if entry['action'] == 'transfer']))
+        finally:
+            client.close()
+            cluster.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+""" Unit test for Dask utility functions.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_dask_utils
+"""
+import unittest
+import os
+import shutil
+import numpy as np
+import dask.array as da
+
+from genben import dask_utils
+
+
+class TestDaskUtils(unittest.TestCase):
+    def test_allocate_subset_sizes(self):
+        chunk_lengths = (100, 100, 37, 250, 1)
+        for n in [0, 1, 10, 123, 488]:
+            sizes = dask_utils.allocate_subset_sizes(chunk_lengths, n)
+            self.assertEqual(n, sizes.sum())
+            self.assertTrue(np.all(sizes <= np.asarray(chunk_lengths)))
+
+        # Sizes should be proportional to chunk length
+        np.testing.assert_array_equal([10, 10, 5], dask_utils.allocate_subset_sizes((100, 100, 50), 25))
+
+        with self.assertRaises(ValueError):
+            dask_utils.allocate_subset_sizes((10, 10), 21)
+
+    def test_chunked_random_subset(self):
+        x_np = np.arange(1000 * 4).reshape(1000, 4)
+        x = da.from_array(x_np, chunks=(100, 2))
+
+        subset = dask_utils.chunked_random_subset(x, 250, seed=42)
+        indices = dask_utils.chunked_random_subset_indices(x.chunks[0], 250, seed=42)
+
+        self.assertEqual((250, 4), subset.shape)
+        self.assertEqual(len(np.unique(indices)), 250)
+        np.testing.assert_array_equal(x_np[indices], subset.compute())
+
+        # One output chunk per input chunk, and the same seed selects the same items
+        self.assertEqual(len(x.chunks[0]), len(subset.chunks[0]))
+        np.testing.assert_array_equal(subset.compute(), dask_utils.chunked_random_subset(x, 250, seed=42).compute())
+
+    def test_chunked_random_subset_graph_size(self):
+        x = da.zeros((10000, 10), chunks=(100, 10))
+        vidx = np.sort(np.random.RandomState(0).choice(10000, 5000, replace=False))
+        subset_chunked = dask_utils.chunked_random_subset(x, 5000, seed=0)
+        subset_global = x[vidx]
+        self.assertLessEqual(len(subset_chunked.__dask_graph__()), len(subset_global.__dask_graph__()))
+
+    def test_local_cluster(self):
+        spill_dir = './tests_temp_dask_spill/'
+        du = dask_utils.DaskUtils()
+        du.start_local_cluster(n_workers=2, threads_per_worker=1, memory_limit='1GB', spill_dir=spill_dir,
+                               processes=False)
+        try:
+            self.assertEqual(10, da.ones(10, chunks=5).sum().compute())
+
+            parameters = du.get_cluster_parameters()
+            self.assertEqual('local_cluster', parameters['mode'])
+            self.assertEqual(2, parameters['n_workers'])
+            self.assertEqual([1], parameters['threads_per_worker'])
+            self.assertEqual(2, parameters['total_threads'])
+            self.assertEqual([10 ** 9], parameters['memory_limit_per_worker'])
+            self.assertEqual(spill_dir, parameters['spill_dir'])
+            self.assertFalse(parameters['processes'])
+            self.assertTrue(os.path.isdir(spill_dir))
+        finally:
+            du.close()
+
+        # The cluster is shut down and the client disconnected
+        self.assertIsNone(du.client)
+        self.assertIsNone(du.cluster)
+        self.assertIsNone(du.get_cluster_parameters())
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+""" Unit test for the Numba-compiled genotype kernels.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_kernels
+"""
+import unittest
+import numpy as np
+import dask.array as da
+import allel
+import zarr
+
+from genben import kernels
+
+
+def create_test_genotype_data(n_variants=500, n_samples=20, ploidy=2, seed=42):
+    """ Creates random genotype data containing missing calls and multiallelic sites. """
+    random_state = np.random.RandomState(seed)
+    g = random_state.choice([-1, 0, 1, 2], size=(n_variants, n_samples, ploidy), p=[0.05, 0.6, 0.3, 0.05])
+    return g.astype('i1')
+
+
+class TestKernels(unittest.TestCase):
+    def setUp(self):
+        self.g = create_test_genotype_data()
+        self.genotype_arrays = {
+            'normal': allel.GenotypeArray(self.g),
+            'chunked': allel.GenotypeChunkedArray(zarr.array(self.g, chunks=(64, 20, 2))),
+            'dask': allel.GenotypeDaskArray(da.from_array(self.g, chunks=(64, 8, 2)))
+        }
+
+    def assertResultEqual(self, expected, actual, msg=None):
+        if hasattr(expected, 'compute'):
+            expected = expected.compute()
+        if hasattr(actual, 'compute'):
+            actual = actual.compute()
+        np.testing.assert_array_equal(np.asarray(expected), np.asarray(actual), err_msg=msg)
+
+    def test_count_alleles(self):
+        for name, gt in self.genotype_arrays.items():
+            self.assertResultEqual(gt.count_alleles(), kernels.count_alleles(gt),
+                                   msg='Allele count mismatch for {} array.'.format(name))
+
+    def test_count_het_hom(self):
+        for name, gt in self.genotype_arrays.items():
+            for axis in [0, 1]:
+                self.assertResultEqual(gt.count_het(axis=axis), kernels.count_het(gt, axis=axis),
+                                       msg='Het count mismatch for {} array (axis {}).'.format(name, axis))
+                self.assertResultEqual(gt.count_hom(axis=axis), kernels.count_hom(gt, axis=axis),
+                                       msg='Hom count mismatch for {} array (axis {}).'.format(name, axis))
+
+    def test_to_n_alt(self):
+        for name, gt in self.genotype_arrays.items():
+            gn = kernels.to_n_alt(gt)
+            self.assertEqual(np.dtype('i1'), gn.dtype)
+            self.assertResultEqual(gt.to_n_alt(), gn, msg='to_n_alt mismatch for {} array.'.format(name))
+
+    def test_pca_filters(self):
+        gt = self.genotype_arrays['normal']
+        ac_expected = gt.count_alleles()
+        ac = kernels.count_alleles(gt)
+
+        self.assertResultEqual(ac_expected.max_allele(), kernels.max_allele(ac))
+        self.assertResultEqual((ac_expected.max_allele() == 1) & ac_expected.is_singleton(1),
+                               kernels.locate_biallelic_singletons(ac))
+        self.assertResultEqual((ac_expected.max_allele() == 1) & (ac_expected[:, :2].min(axis=1) > 1),
+                               kernels.locate_common_biallelic(ac))
+
+        # Filters should also accept Dask-backed allele counts
+        ac_dask = kernels.count_alleles(self.genotype_arrays['dask'])
+        self.assertResultEqual(ac_expected.max_allele(), kernels.max_allele(ac_dask))
+
+    def test_count_het_invalid_axis(self):
+        with self.assertRaises(ValueError):
+            kernels.count_het(self.genotype_arrays['normal'], axis=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+""" Unit test for LD pruning of Dask-backed genotype data.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_ld
+"""
+import unittest
+import numpy as np
+import dask.array as da
+import allel
+
+from genben import ld
+
+
+def create_test_alt_counts(n_variants, n_samples, seed):
+    """ Creates alternate allele counts with blocks of linked variants and some missing calls. """
+    random_state = np.random.RandomState(seed)
+    base = random_state.randint(0, 3, size=(n_variants // 5 + 1, n_samples))
+    gn = np.repeat(base, 5, axis=0)[:n_variants]
+    noise = random_state.rand(n_variants, n_samples) < 0.2
+    gn = np.where(noise, random_state.randint(-1, 3, size=(n_variants, n_samples)), gn)
+    return gn.astype('i1')
+
+
+class TestLDPruning(unittest.TestCase):
+    def test_locate_unlinked_matches_allel(self):
+        parameters = [(100, 20, 0.1, 64), (10, 3, 0.01, 37), (25, 25, 0.5, 200), (7, 10, 0.2, 1000)]
+        for seed, (size, step, threshold, chunk_length) in enumerate(parameters):
+            gn = create_test_alt_counts(n_variants=700, n_samples=30, seed=seed)
+            expected = allel.locate_unlinked(gn, size=size, step=step, threshold=threshold, blen=size * 10)
+            actual = ld.locate_unlinked(da.from_array(gn, chunks=(chunk_length, 10)), size=size, step=step,
+                                        threshold=threshold, blen=size * 10)
+            np.testing.assert_array_equal(expected, actual,
+                                          err_msg='LD pruning mismatch (size={}, step={}, threshold={}).'.format(
+                                              size, step, threshold))
+
+    def test_locate_unlinked_bounded_memory(self):
+        """ Tests that chunks computed a few at a time give the same result, holding only the linked pairs of a few
+        chunks and blocks on the client. """
+        size, step, threshold, blen = 10, 3, 0.01, 100
+        gn = create_test_alt_counts(n_variants=2000, n_samples=30, seed=5)
+        expected = allel.locate_unlinked(gn, size=size, step=step, threshold=threshold, blen=blen)
+
+        replay_block = ld._replay_block
+        linked_rows = []
+
+        def record_replay_block(linked, *args):
+            linked_rows.append(linked.shape[0])
+            return replay_block(linked, *args)
+
+        ld._replay_block = record_replay_block
+        try:
+            for n_parallel_chunks in [1, 3]:
+                del linked_rows[:]
+                actual = ld.locate_unlinked(da.from_array(gn, chunks=(64, 10)), size=size, step=step,
+                                            threshold=threshold, blen=blen, n_parallel_chunks=n_parallel_chunks)
+                np.testing.assert_array_equal(expected, actual)
+                self.assertLessEqual(max(linked_rows), blen + size + 64 * n_parallel_chunks)
+        finally:
+            ld._replay_block = replay_block
+
+    def test_locate_unlinked_invalid_dimensions(self):
+        with self.assertRaises(ValueError):
+            ld.locate_unlinked(da.zeros((10, 4, 2), dtype='i1'))
+
+
+if __name__ == "__main__":
+    unittest.main()
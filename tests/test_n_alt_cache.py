@@ -0,0 +1,79 @@
+""" Unit test for the on-disk alt allele count cache.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_n_alt_cache
+"""
+import unittest
+import os
+import shutil
+import numpy as np
+import dask.array as da
+import zarr
+
+from genben import config
+from genben.n_alt_cache import NAltMatrixCache, cache_key, dataset_fingerprint
+
+
+class TestNAltMatrixCache(unittest.TestCase):
+    cache_dir = './tests_temp_n_alt_cache/'
+
+    def setUp(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.gn = np.random.RandomState(0).randint(-1, 3, size=(250, 7)).astype('i1')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_store_and_load(self):
+        cache = NAltMatrixCache(self.cache_dir)
+        sources = {'numpy': self.gn,
+                   'zarr': zarr.array(self.gn, chunks=(64, 7)),
+                   'dask': da.from_array(self.gn, chunks=(64, 3))}
+        for name, source in sources.items():
+            key = cache_key({'source': name})
+            self.assertNotIn(key, cache)
+            self.assertIsNone(cache.load(key, config.GENOTYPE_ARRAY_NORMAL))
+
+            cache.store(key, source, params={'source': name}, chunk_length=64)
+            self.assertIn(key, cache)
+            self.assertFalse(os.path.exists(cache.path(key) + '.tmp'))
+
+            loaded = cache.load(key, config.GENOTYPE_ARRAY_NORMAL)
+            self.assertIsInstance(loaded, np.ndarray)
+            np.testing.assert_array_equal(self.gn, loaded)
+
+            loaded = cache.load(key, config.GENOTYPE_ARRAY_DASK)
+            self.assertIsInstance(loaded, da.Array)
+            self.assertEqual(64, loaded.chunks[0][0])
+            np.testing.assert_array_equal(self.gn, loaded.compute())
+
+            loaded = cache.load(key, config.GENOTYPE_ARRAY_CHUNKED)
+            self.assertEqual(np.int8, loaded.dtype)
+            np.testing.assert_array_equal(self.gn, loaded[:])
+
+    def test_cache_key(self):
+        self.assertEqual(cache_key({'a': 1, 'b': [1, 2]}), cache_key({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(cache_key({'a': 1}), cache_key({'a': 2}))
+
+    def test_dataset_fingerprint(self):
+        os.makedirs(self.cache_dir)
+        path = os.path.join(self.cache_dir, 'data.txt')
+        with open(path, 'w') as f:
+            f.write('a')
+        fingerprint = dataset_fingerprint([path])
+        with open(path, 'w') as f:
+            f.write('ab')
+        self.assertNotEqual(fingerprint, dataset_fingerprint([path]))
+
+        # Rewriting a chunk inside a Zarr data set changes its fingerprint, even if the directory itself is unchanged
+        zarr_path = os.path.join(self.cache_dir, 'data.zarr')
+        zarr.open(zarr_path, mode='w', shape=(4, 4), chunks=(2, 2), dtype='i1')[:] = 0
+        directory_stat = os.stat(zarr_path)
+        fingerprint = dataset_fingerprint([zarr_path])
+        zarr.open(zarr_path, mode='r+')[:2, :2] = 1
+        os.utime(zarr_path, ns=(directory_stat.st_atime_ns, directory_stat.st_mtime_ns))
+        self.assertNotEqual(fingerprint, dataset_fingerprint([zarr_path]))
+        self.assertEqual(dataset_fingerprint([zarr_path]), dataset_fingerprint([zarr_path]))
+
+
+if __name__ == "__main__":
+    unittest.main()
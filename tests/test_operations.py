@@ -0,0 +1,111 @@
+""" Unit test for the registry of benchmark operations.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_operations
+"""
+import unittest
+import os
+import allel
+import numpy as np
+
+from genben import config, operations
+
+
+class TestOperations(unittest.TestCase):
+    config_file = './test_operations.conf'
+
+    def tearDown(self):
+        operations._operations.pop('test_operation', None)
+        if os.path.isfile(self.config_file):
+            os.remove(self.config_file)
+
+    def test_built_in_operations(self):
+        """ Tests that the aggregations tag selects the simple aggregations, recorded under their existing names. """
+        selected = operations.select_operations(['aggregations'])
+        self.assertEqual(['Allele Count (All Samples)',
+                          'Genotype Count: Heterozygous per Variant',
+                          'Genotype Count: Homozygous per Variant',
+                          'Genotype Count: Heterozygous per Sample',
+                          'Genotype Count: Homozygous per Sample'], [operation.name for operation in selected])
+        self.assertEqual({'Simple aggregations'}, set(operation.group for operation in selected))
+        self.assertEqual({'aggregations', 'statistics'}, operations.operation_tags())
+
+    def test_select_operations(self):
+        """ Tests that operations are selected by name or tag, in registration order and without duplicates. """
+        selected = operations.select_operations(['sequence_diversity', 'allele_count', 'statistics'])
+        self.assertEqual(['allele_count', 'allele_frequencies', 'mean_n_alt_per_sample', 'sequence_diversity'],
+                         [operation.key for operation in selected])
+        self.assertEqual([], operations.select_operations([]))
+        with self.assertRaises(ValueError):
+            operations.select_operations(['allele_count', 'unknown_operation'])
+
+    def test_chunked_mean_n_alt(self):
+        """ Tests that the block-wise mean of chunked alternate allele counts matches the in-memory mean. """
+        gt = allel.GenotypeArray([[[0, 1], [-1, -1]], [[1, 1], [0, 0]], [[0, 0], [1, 1]]])
+        operation = operations.select_operations(['mean_n_alt_per_sample'])[0]
+        gn = allel.GenotypeChunkedArray(gt).to_n_alt()
+        np.testing.assert_array_almost_equal(gt.to_n_alt().mean(axis=0),
+                                             operation.implementation(config.GENOTYPE_ARRAY_CHUNKED)(gn=gn))
+
+    def test_register_operation(self):
+        """ Tests that a registered operation is selectable, with a fallback for other genotype array types. """
+        normal = lambda gt: gt.count_called(axis=1)
+        fallback = lambda gt: gt.count_missing(axis=1)
+        operation = operations.register_operation(operations.Operation(
+            key='test_operation', name='Test Operation', inputs=['gt'],
+            implementations={config.GENOTYPE_ARRAY_NORMAL: normal, operations.ANY_ARRAY_TYPE: fallback},
+            tags=('statistics',)))
+
+        self.assertIn(operation, operations.select_operations(['test_operation']))
+        self.assertIn(operation, operations.select_operations(['statistics']))
+        self.assertIs(normal, operation.implementation(config.GENOTYPE_ARRAY_NORMAL))
+        self.assertIs(fallback, operation.implementation(config.GENOTYPE_ARRAY_DASK))
+
+        gt = allel.GenotypeArray([[[0, 1], [-1, -1]], [[1, 1], [0, 0]]])
+        np.testing.assert_array_equal([1, 0], operation.implementation(config.GENOTYPE_ARRAY_DASK)(gt=gt))
+
+        # Operations without a fallback do not support other genotype array types
+        operations._operations.pop('test_operation')
+        operation = operations.register_operation(operations.Operation(
+            key='test_operation', name='Test Operation', inputs=['gt'],
+            implementations={config.GENOTYPE_ARRAY_NORMAL: normal}))
+        self.assertIsNone(operation.implementation(config.GENOTYPE_ARRAY_DASK))
+
+    def test_register_invalid_operation(self):
+        implementations = {operations.ANY_ARRAY_TYPE: lambda gt: gt.count_alleles()}
+        with self.assertRaises(ValueError):
+            operations.register_operation(operations.Operation(
+                key='allele_count', name='Test Operation', inputs=['gt'], implementations=implementations))
+        with self.assertRaises(ValueError):
+            operations.register_operation(operations.Operation(
+                key='statistics', name='Test Operation', inputs=['gt'], implementations=implementations))
+        with self.assertRaises(ValueError):
+            operations.register_operation(operations.Operation(
+                key='test_operation', name='Test Operation', inputs=['gt'], implementations=implementations,
+                tags=('allele_count',)))
+        with self.assertRaises(ValueError):
+            operations.register_operation(operations.Operation(
+                key='test_operation', name='Test Operation', inputs=['haplotypes'], implementations=implementations))
+        with self.assertRaises(ValueError):
+            operations.register_operation(operations.Operation(
+                key='test_operation', name='Test Operation', inputs=['gt'], implementations={}))
+        self.assertNotIn('test_operation', [operation.key for operation in operations.registered_operations()])
+
+    def test_operations_configuration(self):
+        with open(self.config_file, 'w') as f:
+            f.write('[benchmark]\n'
+                    'benchmark_operations = allele_count, statistics,\n'
+                    'benchmark_operation_modules = json\n')
+        bench_conf = config.BenchmarkConfigurationRepresentation(config.read_configuration(location=self.config_file))
+        self.assertEqual(['allele_count', 'statistics'], bench_conf.benchmark_operations)
+        self.assertEqual(['json'], bench_conf.benchmark_operation_modules)
+
+        for content in ['benchmark_operations = allele_count, unknown_operation\n',
+                        'benchmark_operations = allele_count\nbenchmark_operation_modules = genben.unknown_module\n']:
+            with open(self.config_file, 'w') as f:
+                f.write('[benchmark]\n' + content)
+            with self.assertRaises(ValueError):
+                config.BenchmarkConfigurationRepresentation(config.read_configuration(location=self.config_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+""" Unit test for the 2-bit packed genotype array.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_packed
+"""
+import unittest
+import numpy as np
+import allel
+import zarr
+
+from genben.packed import PackedGenotypeArray
+
+
+def create_test_genotype_data(n_variants=300, n_samples=21, seed=7):
+    """ Creates random diploid genotype data with missing calls, partially missing calls and multiallelic sites. """
+    random_state = np.random.RandomState(seed)
+    g = random_state.choice([-1, 0, 1], size=(n_variants, n_samples, 2), p=[0.05, 0.6, 0.35])
+    multiallelic = random_state.choice(n_variants, 10, replace=False)
+    g[multiallelic, 0, 0] = 2
+    return g.astype('i1')
+
+
+class TestPackedGenotypeArray(unittest.TestCase):
+    def setUp(self):
+        self.g = create_test_genotype_data()
+        self.gt = allel.GenotypeArray(self.g)
+        self.packed = PackedGenotypeArray.from_genotypes(zarr.array(self.g, chunks=(64, 21, 2)))
+
+    def assertPackedEqual(self, gt, packed):
+        np.testing.assert_array_equal(gt.count_alleles(), packed.count_alleles())
+        for axis in [0, 1]:
+            np.testing.assert_array_equal(gt.count_het(axis=axis), packed.count_het(axis=axis))
+            np.testing.assert_array_equal(gt.count_hom(axis=axis), packed.count_hom(axis=axis))
+        np.testing.assert_array_equal(gt.to_n_alt(), packed.to_n_alt())
+
+    def assertUnphasedEqual(self, gt, gt_unpacked):
+        # Phase of heterozygous calls is not preserved by the packed representation
+        np.testing.assert_array_equal(gt.is_missing(), gt_unpacked.is_missing())
+        np.testing.assert_array_equal(gt.is_het(), gt_unpacked.is_het())
+        np.testing.assert_array_equal(gt.to_n_alt(), gt_unpacked.to_n_alt())
+
+    def test_round_trip(self):
+        self.assertUnphasedEqual(self.gt, self.packed.to_genotype_array())
+        self.assertEqual(self.gt.shape, self.packed.shape)
+
+    def test_counts_match_allel(self):
+        self.assertPackedEqual(self.gt, self.packed)
+
+    def test_memory_footprint(self):
+        biallelic = np.clip(self.g, 0, 1)
+        packed = PackedGenotypeArray.from_genotypes(biallelic)
+        self.assertEqual(0, len(packed.fallback_index))
+        self.assertLessEqual(packed.nbytes * 4, packed.nbytes_unpacked)
+
+    def test_selection(self):
+        flt = self.gt.count_alleles().max_allele() == 1
+        self.assertPackedEqual(self.gt.compress(flt, axis=0), self.packed.compress(flt, axis=0))
+
+        vidx = np.sort(np.random.RandomState(0).choice(self.gt.shape[0], 50, replace=False))
+        self.assertPackedEqual(self.gt.take(vidx, axis=0), self.packed.take(vidx, axis=0))
+
+        self.assertPackedEqual(self.gt[:100, :], self.packed[:100, :])
+        self.assertPackedEqual(self.gt[:, :13], self.packed[:, :13])
+
+    def test_concatenate(self):
+        packed = PackedGenotypeArray.concatenate([PackedGenotypeArray.from_genotypes(self.g[:120]),
+                                                  PackedGenotypeArray.from_genotypes(self.g[120:])])
+        self.assertUnphasedEqual(self.gt, packed.to_genotype_array())
+
+    def test_invalid_ploidy(self):
+        with self.assertRaises(ValueError):
+            PackedGenotypeArray.from_genotypes(np.zeros((10, 4, 3), dtype='i1'))
+
+
+if __name__ == "__main__":
+    unittest.main()
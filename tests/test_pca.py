@@ -0,0 +1,141 @@
+""" Unit test for the alternative PCA engines.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_pca
+"""
+import unittest
+import numpy as np
+import dask.array as da
+import zarr
+import allel
+
+from genben import config, pca
+
+
+def create_test_alt_counts(n_variants=400, n_samples=30, seed=3):
+    """ Creates alternate allele counts with population structure, so that leading components are well separated. """
+    random_state = np.random.RandomState(seed)
+    frequencies = random_state.uniform(0.1, 0.9, size=(n_variants, 1))
+    shift = np.where(np.arange(n_samples) < n_samples // 2, -0.08, 0.08)
+    p = np.clip(frequencies + shift * random_state.randn(n_variants, 1), 0.05, 0.95)
+    return random_state.binomial(2, p).astype('i1')
+
+
+def reference_pca(gn, n_components, scaler):
+    """ Conventional float64 SVD-based PCA on the same scaled data. """
+    x = pca.scale_block(gn, scaler).T
+    u, s, v = np.linalg.svd(x, full_matrices=False)
+    coords = u[:, :n_components] * s[:n_components]
+    explained_variance = s ** 2 / x.shape[0]
+    return coords, explained_variance[:n_components], (explained_variance / explained_variance.sum())[:n_components]
+
+
+class TestGramPCA(unittest.TestCase):
+    def assertCoordsClose(self, expected, actual, **kwargs):
+        # Components are only defined up to their sign
+        signs = np.sign(np.sum(expected * actual, axis=0))
+        np.testing.assert_allclose(expected, actual * signs, **kwargs)
+
+    def test_gram_pca_matches_svd(self):
+        gn = create_test_alt_counts()
+        sources = {'numpy': gn,
+                   'zarr': zarr.array(gn, chunks=(64, 30)),
+                   'dask': da.from_array(gn, chunks=(64, 10))}
+        for scaler in ['patterson', 'standard', None]:
+            coords_expected, variance_expected, ratio_expected = reference_pca(gn, 5, scaler)
+            for name, source in sources.items():
+                coords, model = pca.gram_pca(source, n_components=5, scaler=scaler, blen=50)
+                self.assertEqual((30, 5), coords.shape)
+                self.assertCoordsClose(coords_expected, coords, rtol=1e-6, atol=1e-8)
+                np.testing.assert_allclose(variance_expected, model.explained_variance_, rtol=1e-8)
+                np.testing.assert_allclose(ratio_expected, model.explained_variance_ratio_, rtol=1e-8)
+
+    def test_gram_pca_matches_allel(self):
+        gn = create_test_alt_counts()
+        coords_allel, model_allel = allel.pca(gn, n_components=3, scaler='patterson')
+        coords, model = pca.gram_pca(gn, n_components=3, scaler='patterson')
+        # scikit-allel scales in half precision, so only approximate agreement is expected
+        self.assertCoordsClose(coords_allel, coords, rtol=0.05, atol=0.05)
+        np.testing.assert_allclose(model_allel.explained_variance_ratio_, model.explained_variance_ratio_, rtol=0.05)
+
+    def test_incremental_pca_matches_svd(self):
+        gn = create_test_alt_counts()
+        sources = {'numpy': gn,
+                   'zarr': zarr.array(gn, chunks=(64, 30)),
+                   'chunked': allel.GenotypeChunkedArray(zarr.array(np.stack([gn > 0, gn > 1], axis=2).astype('i1'),
+                                                                    chunks=(64, 30, 2))).to_n_alt(),
+                   'dask': da.from_array(gn, chunks=(64, 10))}
+        for scaler in ['patterson', 'standard', None]:
+            coords_expected, variance_expected, ratio_expected = reference_pca(gn, 5, scaler)
+            for name, source in sources.items():
+                # Retaining as many singular vectors as samples makes the incremental SVD exact
+                coords, model = pca.incremental_pca(source, n_components=5, scaler=scaler, blen=50, n_oversamples=25)
+                self.assertEqual((30, 5), coords.shape)
+                self.assertCoordsClose(coords_expected, coords, rtol=1e-6, atol=1e-8)
+                np.testing.assert_allclose(variance_expected, model.explained_variance_, rtol=1e-8)
+                np.testing.assert_allclose(ratio_expected, model.explained_variance_ratio_, rtol=1e-8)
+
+    def test_incremental_pca_truncated(self):
+        gn = create_test_alt_counts(n_variants=2000, n_samples=60)
+        coords_expected, variance_expected, _ = reference_pca(gn, 2, 'patterson')
+        coords, model = pca.incremental_pca(gn, n_components=2, scaler='patterson', blen=100, n_oversamples=10)
+        # With truncation between updates, the leading (population structure) component is approximated closely
+        np.testing.assert_allclose(variance_expected[0], model.explained_variance_[0], rtol=0.01)
+        self.assertCoordsClose(coords_expected[:, :1], coords[:, :1], rtol=0.05, atol=0.5)
+
+    def test_incremental_pca_fewer_variants_than_components(self):
+        gn = create_test_alt_counts(n_variants=3, n_samples=10)
+        coords, model = pca.incremental_pca(gn, n_components=5, scaler='patterson')
+        self.assertEqual((10, 5), coords.shape)
+        np.testing.assert_array_equal(np.zeros(10), coords[:, 4])
+
+    def test_single_precision(self):
+        gn = create_test_alt_counts()
+        sources = {'numpy': gn, 'dask': da.from_array(gn, chunks=(64, 10))}
+        for name, source in sources.items():
+            for engine in [pca.gram_pca, pca.incremental_pca]:
+                coords_reference, model_reference = engine(source, n_components=3, dtype=np.float64)
+                coords, model = engine(source, n_components=3, dtype=np.float32)
+                self.assertEqual(np.float32, coords.dtype)
+                self.assertLess(pca.projection_error(coords, coords_reference), 1e-4)
+                np.testing.assert_allclose(model_reference.explained_variance_, model.explained_variance_, rtol=1e-4)
+
+    def test_projection_error(self):
+        reference = np.array([[1., 2.], [3., 4.]])
+        self.assertEqual(0, pca.projection_error(reference, reference))
+        # Components are only defined up to their sign
+        self.assertEqual(0, pca.projection_error(reference * [-1, 1], reference))
+        self.assertAlmostEqual(0.1, pca.projection_error(reference * 1.1, reference))
+
+    def test_solvers_match_svd(self):
+        gn = create_test_alt_counts(n_variants=1000, n_samples=60)
+        coords_expected, variance_expected, ratio_expected = reference_pca(gn, 5, 'patterson')
+        _, model_exact = pca.solver_pca(gn, n_components=5, solver='exact')
+        for solver, rtol in [('exact', 1e-8), ('arpack', 1e-8), ('block_krylov', 1e-6), ('randomized', 0.1)]:
+            coords, model = pca.solver_pca(da.from_array(gn, chunks=(100, 60)), n_components=5, solver=solver,
+                                           n_oversamples=10, n_iter=4)
+            self.assertEqual((60, 5), coords.shape)
+            np.testing.assert_allclose(variance_expected, model.explained_variance_, rtol=rtol)
+            np.testing.assert_allclose(ratio_expected, model.explained_variance_ratio_, rtol=rtol)
+            self.assertLess(pca.explained_variance_deviation(model, model_exact), rtol)
+            if solver != 'randomized':
+                self.assertCoordsClose(coords_expected, coords, rtol=1e-4, atol=1e-6)
+
+    def test_solver_registry(self):
+        self.assertEqual(config.pca_solver_types, list(pca.PCA_SOLVERS.keys()))
+        with self.assertRaises(ValueError):
+            pca.solver_pca(create_test_alt_counts(), solver='unknown')
+
+    def test_solver_few_samples(self):
+        # ARPACK cannot compute as many components as samples; the exact solution is used instead
+        gn = create_test_alt_counts(n_variants=50, n_samples=3)
+        for solver in config.pca_solver_types:
+            coords, model = pca.solver_pca(gn, n_components=10, solver=solver)
+            self.assertEqual((3, 3), coords.shape)
+
+    def test_invalid_scaler(self):
+        with self.assertRaises(ValueError):
+            pca.scale_block(np.zeros((2, 2)), 'unknown')
+
+
+if __name__ == "__main__":
+    unittest.main()
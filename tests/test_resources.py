@@ -0,0 +1,55 @@
+""" Unit test for process resource measurement.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_resources
+"""
+import unittest
+import numpy as np
+
+from genben import resources
+
+
+class TestResources(unittest.TestCase):
+    def test_current_rss(self):
+        rss = resources.current_rss()
+        self.assertGreater(rss, 0)
+        self.assertLessEqual(rss, resources.lifetime_peak_rss() + resources.PAGE_SIZE * 1024)
+
+    def test_nested_peak_rss_trackers(self):
+        parent = resources.PeakRSSTracker()
+        parent.start()
+        data = np.ones(64 * 2 ** 20, dtype='i1')
+        del data
+        child = resources.PeakRSSTracker(parent=parent)
+        child.start()
+        small = np.ones(2 ** 20, dtype='i1')
+        child.stop()
+        del small
+        parent.stop()
+
+        # The parent keeps the peak from before the child started (which reset the kernel's peak, where possible)
+        self.assertGreaterEqual(parent.peak_increase, 32 * 2 ** 20)
+        self.assertGreaterEqual(parent.peak_rss, child.peak_rss)
+        self.assertGreaterEqual(child.peak_rss, child.start_rss)
+        if resources.reset_high_water_mark():
+            self.assertLess(child.peak_increase, 32 * 2 ** 20)
+
+    def test_nested_allocation_tracers(self):
+        parent = resources.AllocationTracer()
+        parent.start()
+        data = np.ones(16 * 2 ** 20, dtype='i1')
+        del data
+        child = resources.AllocationTracer(parent=parent)
+        child.start()
+        small = np.ones(2 ** 20, dtype='i1')
+        child_peak = child.stop()
+        del small
+        parent_peak = parent.stop()
+
+        # The child only sees its own allocations, while the parent keeps the peak from before the child started
+        self.assertGreaterEqual(child_peak, 2 ** 20)
+        self.assertLess(child_peak, 16 * 2 ** 20)
+        self.assertGreaterEqual(parent_peak, 16 * 2 ** 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
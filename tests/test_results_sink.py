@@ -0,0 +1,168 @@
+""" Unit test for the buffered benchmark results sink.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_results_sink
+"""
+import unittest
+import os
+import threading
+import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from genben.config import OutputConfigurationRepresentation
+from genben.core import BenchmarkResultsData
+from genben.results_sink import ResultsSink
+
+
+class InfluxDBStandInHandler(BaseHTTPRequestHandler):
+    """ Accepts InfluxDB write requests and records the points received in each request. """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+        if self.server.failing:
+            # Fail like an unavailable InfluxDB server
+            self.send_response(503)
+            self.end_headers()
+            return
+        self.server.writes.append((self.path, [line for line in body.split('\n') if line != '']))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_results(operation_name, run_number=1):
+    results = BenchmarkResultsData()
+    results.run_number = run_number
+    results.operation_name = operation_name
+    results.start_time = datetime.datetime.utcnow()
+    results.exec_time = 0.5
+    results.span_id = '{:016x}'.format(run_number)
+    return results
+
+
+class TestResultsSink(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), InfluxDBStandInHandler)
+        self.server.writes = []
+        self.server.failing = False
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+        self.output_config = OutputConfigurationRepresentation()
+        self.output_config.output_csv_enabled = False
+        self.output_config.output_influxdb_enabled = True
+        self.output_config.output_influxdb_host = '127.0.0.1'
+        self.output_config.output_influxdb_port = self.server.server_address[1]
+        self.output_config.output_flush_interval = 60
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_influxdb_batches(self):
+        self.output_config.output_batch_size = 25
+        sink = ResultsSink(self.output_config, 'test_influxdb_batches')
+
+        # Nothing is written while results are buffered
+        for i in range(10):
+            sink.add(create_results('Operation {}'.format(i)))
+        self.assertEqual([], self.server.writes)
+
+        sink.flush()
+        self.assertEqual(1, len(self.server.writes))
+        self.assertTrue(self.server.writes[0][0].startswith('/write'))
+        self.assertEqual(10, len(self.server.writes[0][1]))
+        client = sink._influxdb_client
+
+        # Remaining results are written in batches of at most batch_size points
+        for i in range(60):
+            sink.add(create_results('Operation {}'.format(i)))
+        sink.flush()
+        self.assertIs(client, sink._influxdb_client)  # One client is reused for all writes
+        sink.close()
+        points_per_write = [len(points) for _, points in self.server.writes[1:]]
+        self.assertEqual(60, sum(points_per_write))
+        self.assertLessEqual(max(points_per_write), 25)
+
+    def test_background_flush(self):
+        self.output_config.output_batch_size = 5
+        sink = ResultsSink(self.output_config, 'test_background_flush')
+        for i in range(5):
+            sink.add(create_results('Operation {}'.format(i)))
+
+        # Reaching the batch size wakes the background thread, well before the flush interval
+        for _ in range(100):
+            if len(self.server.writes) > 0:
+                break
+            threading.Event().wait(0.05)
+        self.assertEqual(1, len(self.server.writes))
+        self.assertEqual(5, len(self.server.writes[0][1]))
+        sink.close()
+
+    def test_csv_batches(self):
+        self.output_config.output_csv_enabled = True
+        self.output_config.output_csv_delimiter = ','
+        self.output_config.output_influxdb_enabled = False
+        label = 'test_results_sink_csv'
+        csv_file = '{}.csv'.format(label)
+        if os.path.exists(csv_file):
+            os.remove(csv_file)
+
+        sink = ResultsSink(self.output_config, label)
+        for run_number in [1, 2]:
+            for i in range(3):
+                sink.add(create_results('Operation {}'.format(i), run_number))
+            sink.flush()
+        sink.close()
+
+        with open(csv_file, 'r') as f:
+            csv_lines = [line.rstrip('\n').split(',') for line in f]
+        os.remove(csv_file)
+
+        # A single header is followed by all results in order
+        self.assertEqual(list(BenchmarkResultsData().to_dict().keys()), csv_lines[0])
+        self.assertEqual(7, len(csv_lines))
+        self.assertEqual(['1', '1', '1', '2', '2', '2'], [line[1] for line in csv_lines[1:]])
+        self.assertEqual('Operation 2', csv_lines[6][2])
+
+    def test_failed_writes_retried(self):
+        """ Tests that results which could not be written to InfluxDB are kept and written by the next flush, without
+        writing them to the CSV file again. """
+        self.output_config.output_csv_enabled = True
+        self.output_config.output_csv_delimiter = ','
+        self.output_config.output_batch_size = 4
+        label = 'test_results_sink_failed_writes'
+        csv_file = '{}.csv'.format(label)
+        if os.path.exists(csv_file):
+            os.remove(csv_file)
+
+        sink = ResultsSink(self.output_config, label)
+        self.server.failing = True
+        for i in range(3):
+            sink.add(create_results('Operation {}'.format(i)))
+        self.assertFalse(sink.flush())
+        self.assertEqual([], self.server.writes)
+
+        self.server.failing = False
+        for i in range(3, 6):
+            sink.add(create_results('Operation {}'.format(i)))
+        self.assertTrue(sink.flush())
+        sink.close()
+
+        with open(csv_file, 'r') as f:
+            csv_lines = [line.rstrip('\n').split(',') for line in f]
+        os.remove(csv_file)
+
+        # Each result is written once to each output, in order
+        self.assertEqual(['Operation {}'.format(i) for i in range(6)], [line[2] for line in csv_lines[1:]])
+        points = [point for _, write_points in self.server.writes for point in write_points]
+        self.assertEqual(6, len(points))
+        self.assertEqual([4, 2], [len(write_points) for _, write_points in self.server.writes])
+        for i, point in enumerate(points):
+            self.assertIn('operation_name=Operation\\ {}'.format(i), point)
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+""" Unit test for scaling experiments.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_scaling
+"""
+import unittest
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from genben import config, scaling
+from genben.config import \
+    BenchmarkConfigurationRepresentation, \
+    VCFtoZarrConfigurationRepresentation, \
+    OutputConfigurationRepresentation, \
+    DataDirectoriesConfigurationRepresentation, \
+    DaskSchedulerConfigurationRepresentation, \
+    ScalingConfigurationRepresentation
+
+
+class TestScaling(unittest.TestCase):
+    def test_strong_scaling_metrics(self):
+        # Amdahl's law with a serial fraction of 0.1: the Karp-Flatt metric recovers the serial fraction
+        counts = [1, 2, 4, 8]
+        times = [10.0 * (0.1 + 0.9 / p) for p in counts]
+        metrics = scaling.scaling_metrics(counts, times, mode='strong')
+
+        self.assertEqual(counts, [m['count'] for m in metrics])
+        np.testing.assert_allclose([1.0, 10 / 5.5, 10 / 3.25, 10 / 2.125], [m['speedup'] for m in metrics])
+        np.testing.assert_allclose([m['speedup'] / p for m, p in zip(metrics, counts)],
+                                   [m['efficiency'] for m in metrics])
+        self.assertTrue(np.isnan(metrics[0]['karp_flatt']))
+        np.testing.assert_allclose([0.1, 0.1, 0.1], [m['karp_flatt'] for m in metrics[1:]])
+
+    def test_weak_scaling_metrics(self):
+        # Perfect weak scaling: constant time as the data size grows with the count
+        metrics = scaling.scaling_metrics([2, 4, 8], [3.0, 3.0, 3.0], mode='weak')
+        np.testing.assert_allclose([1.0, 2.0, 4.0], [m['speedup'] for m in metrics])
+        np.testing.assert_allclose([1.0, 1.0, 1.0], [m['efficiency'] for m in metrics])
+        np.testing.assert_allclose([0.0, 0.0], [m['karp_flatt'] for m in metrics[1:]], atol=1e-12)
+
+        # If the data set is too small to grow with the count, the speedup is scaled by the actual growth
+        metrics = scaling.scaling_metrics([1, 2], [3.0, 3.0], mode='weak', sizes=[600, 900])
+        np.testing.assert_allclose([1.0, 1.5], [m['speedup'] for m in metrics])
+        np.testing.assert_allclose([1.0, 0.75], [m['efficiency'] for m in metrics])
+
+    def test_scaling_experiment(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_scaling_experiment'
+        output_files = ['{}{}.csv'.format(benchmark_label, suffix)
+                        for suffix in ['_scaling', '_workers1', '_workers2', '_workers1_summary', '_workers2_summary']]
+        output_files += ['{}_workers{}_metadata.jsonl'.format(benchmark_label, count) for count in [1, 2]]
+
+        def remove_output():
+            if os.path.isdir(test_dir):
+                shutil.rmtree(test_dir)
+            for output_file in output_files:
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+
+        remove_output()
+
+        vcf_to_zar_config = VCFtoZarrConfigurationRepresentation()
+        vcf_to_zar_config.enabled = True
+
+        output_config = OutputConfigurationRepresentation()
+        output_config.output_csv_enabled = True
+        output_config.output_csv_delimiter = ','
+        output_config.output_influxdb_enabled = False
+
+        bench_conf = BenchmarkConfigurationRepresentation()
+        bench_conf.vcf_to_zarr_config = vcf_to_zar_config
+        bench_conf.results_output_config = output_config
+        bench_conf.benchmark_number_runs = 1
+        bench_conf.benchmark_data_input = 'vcf'
+        bench_conf.benchmark_dataset = 'trio.2010_06.ychr.genotypes.vcf'
+        bench_conf.benchmark_num_variants = 600
+        bench_conf.benchmark_aggregations = True
+        bench_conf.genotype_array_type = config.GENOTYPE_ARRAY_DASK
+
+        dask_config = DaskSchedulerConfigurationRepresentation()
+        dask_config.local_cluster_processes = False
+
+        scaling_config = ScalingConfigurationRepresentation()
+        scaling_config.enabled = True
+        scaling_config.mode = 'weak'
+        scaling_config.counts = [1, 2]
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        experiment = scaling.ScalingExperiment(bench_conf=bench_conf, dask_config=dask_config,
+                                               scaling_config=scaling_config, data_dirs=data_dirs,
+                                               benchmark_label=benchmark_label)
+        rows = experiment.run()
+
+        # Each count is run with its own label, and the configured number of variants is per worker
+        self.assertEqual(600, bench_conf.benchmark_num_variants)
+        for count in [1, 2]:
+            self.assertTrue(os.path.isfile('{}_workers{}.csv'.format(benchmark_label, count)))
+
+        scaling_results = pd.read_csv('{}_scaling.csv'.format(benchmark_label))
+        self.assertEqual(len(rows), len(scaling_results))
+        allele_count = scaling_results[scaling_results['operation'] == 'Allele Count (All Samples)']
+        self.assertEqual([1, 2], list(allele_count['count']))
+        self.assertEqual(['weak', 'weak'], list(allele_count['mode']))
+        self.assertEqual(1.0, allele_count['speedup'].iloc[0])
+
+        # The data set only has 959 variants, fewer than the 1200 requested for two workers
+        self.assertEqual([600, 959], list(allele_count['n_variants']))
+        times = list(allele_count['median_time'])
+        self.assertAlmostEqual(959 / 600 * times[0] / times[1], allele_count['speedup'].iloc[1])
+
+        remove_output()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+from genben import stats
+
+
+class TestStats(unittest.TestCase):
+    def test_median_ci(self):
+        samples = np.arange(1, 101, dtype=np.float64)
+        low, high = stats.median_ci(samples)
+        self.assertLessEqual(low, np.median(samples))
+        self.assertGreaterEqual(high, np.median(samples))
+        self.assertEqual((40, 61), (low, high))
+
+        # Too few samples for a 95% interval: the full range is returned
+        self.assertEqual((1, 5), stats.median_ci([5, 1, 3, 2, 4]))
+
+    def test_relative_ci_half_width(self):
+        self.assertEqual(0.0, stats.relative_ci_half_width([2.0] * 10))
+        self.assertAlmostEqual(0.5, stats.relative_ci_half_width([1.0, 2.0, 3.0]))
+        self.assertEqual(np.inf, stats.relative_ci_half_width([0.0, 0.0, 1.0]))
+
+    def test_summarize(self):
+        summary = stats.summarize([1.0, 2.0, 3.0, 4.0, 100.0])
+        self.assertEqual(5, summary['n_samples'])
+        self.assertEqual(3.0, summary['median'])
+        self.assertEqual(1.0, summary['mad'])
+        self.assertEqual(2.0, summary['iqr'])
+        self.assertEqual(22.0, summary['mean'])
+        self.assertEqual(1.0, summary['min'])
+        self.assertEqual(100.0, summary['max'])
+
+        summary = stats.summarize([1.5])
+        self.assertEqual(1, summary['n_samples'])
+        self.assertEqual(0.0, summary['std'])
+
+
+if __name__ == "__main__":
+    unittest.main()
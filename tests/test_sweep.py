@@ -0,0 +1,144 @@
+""" Unit test for parameter sweeps.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_sweep
+"""
+import unittest
+import os
+import json
+import shutil
+from collections import Counter, OrderedDict
+import pandas as pd
+
+from genben import config, sweep
+from genben.config import DataDirectoriesConfigurationRepresentation
+
+
+class TestSweep(unittest.TestCase):
+    config_file = './test_sweep.conf'
+
+    def tearDown(self):
+        if os.path.isfile(self.config_file):
+            os.remove(self.config_file)
+
+    def _read_config(self, content):
+        with open(self.config_file, 'w') as f:
+            f.write(content)
+        return config.read_configuration(location=self.config_file)
+
+    def test_parse_sweep_values(self):
+        self.assertEqual(['1', '2', '3'], config.parse_sweep_values('1, 2,3'))
+        self.assertEqual(['10', '30', '50'], config.parse_sweep_values('range(10, 51, 20)'))
+        self.assertEqual(['0', '1'], config.parse_sweep_values('range(2)'))
+        with self.assertRaises(ValueError):
+            config.parse_sweep_values('range(a, 2)')
+
+    def test_sweep_configuration(self):
+        runtime_config = self._read_config('[sweep]\n'
+                                           'enabled = True\n'
+                                           'method = latin_hypercube\n'
+                                           'samples = 4\n'
+                                           'benchmark.pca_subset_size = 100, 200\n'
+                                           'vcf_to_zarr.chunk_length = range(1000, 3001, 1000)\n')
+        sweep_config = config.SweepConfigurationRepresentation(runtime_config)
+        self.assertTrue(sweep_config.enabled)
+        self.assertEqual('latin_hypercube', sweep_config.method)
+        self.assertEqual(4, sweep_config.samples)
+        self.assertEqual(OrderedDict([(('benchmark', 'pca_subset_size'), ['100', '200']),
+                                      (('vcf_to_zarr', 'chunk_length'), ['1000', '2000', '3000'])]),
+                         sweep_config.parameters)
+
+        with self.assertRaises(ValueError):
+            config.SweepConfigurationRepresentation(self._read_config('[sweep]\nftp.server = a, b\n'))
+        # Misspelled keys would otherwise run every point with the same configuration
+        for name in ['benchmark.pca_subset_sise', 'vcf_to_zarr.chunk_lenght', 'benchmark.__init__']:
+            with self.assertRaises(ValueError):
+                config.SweepConfigurationRepresentation(self._read_config('[sweep]\n{} = 1, 2\n'.format(name)))
+
+    def test_sweep_points(self):
+        parameters = OrderedDict([(('benchmark', 'a'), ['1', '2', '3']),
+                                  (('benchmark', 'b'), ['x', 'y'])])
+        points = sweep.cartesian_points(parameters)
+        self.assertEqual(6, len(points))
+        self.assertEqual(OrderedDict([(('benchmark', 'a'), '1'), (('benchmark', 'b'), 'x')]), points[0])
+
+        # Each value is used equally often when the number of samples is a multiple of the number of values
+        points = sweep.latin_hypercube_points(OrderedDict([(('benchmark', 'a'), ['1', '2', '3'])]), 6, seed=1)
+        self.assertEqual(3, len(points))  # Duplicates are removed
+        points = sweep.latin_hypercube_points(parameters, 6, seed=1)
+        self.assertLessEqual(len(points), 6)
+        self.assertEqual(points, sweep.latin_hypercube_points(parameters, 6, seed=1))
+        self.assertEqual(len(points), len(set(sweep.point_id(point) for point in points)))
+
+    def test_sweep_runner(self):
+        test_dir = './tests_temp/'
+        benchmark_label = 'test_sweep_runner'
+        output_files = ['{}.csv'.format(benchmark_label), '{}_summary.csv'.format(benchmark_label),
+                        '{}_sweep_state.jsonl'.format(benchmark_label)]
+
+        def remove_output():
+            if os.path.isdir(test_dir):
+                shutil.rmtree(test_dir)
+            for output_file in output_files:
+                if os.path.isfile(output_file):
+                    os.remove(output_file)
+
+        remove_output()
+
+        runtime_config = self._read_config('[vcf_to_zarr]\n'
+                                           'enabled = True\n'
+                                           '[benchmark]\n'
+                                           'benchmark_number_runs = 1\n'
+                                           'benchmark_data_input = vcf\n'
+                                           'benchmark_dataset = trio.2010_06.ychr.genotypes.vcf\n'
+                                           'benchmark_aggregations = True\n'
+                                           'genotype_array_type = 1\n'
+                                           '[output.csv]\n'
+                                           'enabled = True\n'
+                                           'delimiter = ,\n'
+                                           '[sweep]\n'
+                                           'enabled = True\n'
+                                           'benchmark.dask_genotype_array_chunk_variants = 50, 100\n')
+        sweep_config = config.SweepConfigurationRepresentation(runtime_config)
+
+        data_dirs = DataDirectoriesConfigurationRepresentation()
+        data_dirs.vcf_dir = './tests/data/'
+        data_dirs.zarr_dir_setup = './tests_temp/zarr/'
+        data_dirs.zarr_dir_benchmark = './tests_temp/zarr_benchmark/'
+        data_dirs.temp_dir = './tests_temp/temp/'
+
+        runner = sweep.SweepRunner(runtime_config=runtime_config, sweep_config=sweep_config, data_dirs=data_dirs,
+                                   benchmark_label=benchmark_label)
+        self.assertEqual(2, runner.run())
+
+        # Every result is tagged with the parameter values of its point
+        column = 'benchmark.dask_genotype_array_chunk_variants'
+        results = pd.read_csv('{}.csv'.format(benchmark_label))
+        counts = Counter(results[column])
+        self.assertEqual({50, 100}, set(counts.keys()))
+        self.assertEqual(counts[50], counts[100])
+        summary = pd.read_csv('{}_summary.csv'.format(benchmark_label))
+        self.assertEqual({50, 100}, set(summary[column]))
+
+        # A completed sweep is not run again; a partly finished sweep runs only the remaining points
+        self.assertEqual(0, runner.run())
+        with open(runner.state_file, 'r') as f:
+            first_point = f.readline()
+        with open(runner.state_file, 'w') as f:
+            f.write(first_point)
+        self.assertEqual(1, runner.run())
+        self.assertEqual(2, len(runner.completed_point_ids()))
+
+        # Rows of the point which ran twice are told apart by attempt; the state file records the completing attempts
+        with open(runner.state_file, 'r') as f:
+            completed_attempts = set(json.loads(line)['attempt'] for line in f)
+        results = pd.read_csv('{}.csv'.format(benchmark_label))
+        self.assertEqual(3, len(set(results['sweep.attempt'])))
+        self.assertEqual(2, len(completed_attempts))
+        completed = results[results['sweep.attempt'].isin(completed_attempts)]
+        self.assertEqual(Counter(completed[column])[50], Counter(completed[column])[100])
+
+        remove_output()
+
+
+if __name__ == "__main__":
+    unittest.main()
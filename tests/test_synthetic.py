@@ -0,0 +1,181 @@
+""" Unit test for synthetic genotype datasets.
+    To execute on a command line, run from the home directory:
+    python -m unittest tests.test_synthetic
+"""
+import unittest
+import os
+import gzip
+import struct
+import shutil
+import zlib
+import allel
+import zarr
+import numpy as np
+
+from genben import config, data_service, synthetic
+
+
+class TestSynthetic(unittest.TestCase):
+    output_zarr_path = './tests_synthetic.zarr'
+
+    def tearDown(self):
+        if os.path.isdir(self.output_zarr_path):
+            shutil.rmtree(self.output_zarr_path)
+
+    def generate(self, **kwargs):
+        parameters = dict(output_zarr_path=self.output_zarr_path, n_variants=1000, n_samples=50, seed=1,
+                          missing_rate=0.1, multiallelic_rate=0.2, chunk_length=300, chunk_width=16)
+        parameters.update(kwargs)
+        return synthetic.generate_zarr(**parameters)
+
+    def test_layout(self):
+        """ Tests that the dataset has the layout of converted VCF data and can be used as a callset. """
+        callset = self.generate()
+
+        gt = callset['calldata/GT']
+        self.assertEqual((1000, 50, 2), gt.shape)
+        self.assertEqual(np.int8, gt.dtype)
+        self.assertEqual((300, 16, 2), gt.chunks)
+        self.assertEqual((1000, 3), callset['variants/ALT'].shape)
+        self.assertEqual(50, callset['samples'].shape[0])
+        for field in ['POS', 'CHROM', 'REF', 'numalt']:
+            self.assertEqual((1000,), callset['variants/{}'.format(field)].shape)
+
+        pos = callset['variants/POS'][:]
+        self.assertTrue(np.all(np.diff(pos) > 0))
+        self.assertTrue(np.all(callset['variants/CHROM'][:] == '1'))
+
+        store = zarr.DirectoryStore(self.output_zarr_path)
+        genotypes = data_service.get_genotype_array(zarr.Group(store=store, read_only=True),
+                                                    genotype_array_type=config.GENOTYPE_ARRAY_NORMAL)
+        self.assertEqual((1000, 50, 2), genotypes.shape)
+
+    def test_alleles(self):
+        """ Tests that genotype calls only use the ALT alleles of their variant, at the configured rates. """
+        callset = self.generate(n_variants=5000)
+        gt = callset['calldata/GT'][:]
+        numalt = callset['variants/numalt'][:]
+        alt = callset['variants/ALT'][:]
+        ref = callset['variants/REF'][:]
+
+        self.assertTrue(np.all(np.max(gt, axis=(1, 2)) <= numalt))
+        self.assertTrue(np.all((alt != '') == (np.arange(3) < numalt[:, np.newaxis])))
+        self.assertTrue(np.all(alt[:, 0] != ref))
+
+        self.assertAlmostEqual(0.2, np.mean(numalt > 1), delta=0.03)
+        missing = np.all(gt < 0, axis=2)
+        self.assertTrue(np.all(np.any(gt < 0, axis=2) == missing))
+        self.assertAlmostEqual(0.1, np.mean(missing), delta=0.01)
+
+        # Most variants are rare under the neutral spectrum
+        non_ref_frequency = np.sum(gt > 0, axis=(1, 2)) / np.maximum(np.sum(gt >= 0, axis=(1, 2)), 1)
+        self.assertLess(np.median(non_ref_frequency), 0.2)
+
+    def test_reproducible(self):
+        """ Tests that the same seed produces the same dataset, and a different seed a different one. """
+        first = self.generate()['calldata/GT'][:]
+        second = self.generate()['calldata/GT'][:]
+        np.testing.assert_array_equal(first, second)
+
+        other = self.generate(seed=2)['calldata/GT'][:]
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            self.generate(n_variants=0)
+        with self.assertRaises(ValueError):
+            self.generate(missing_rate=1.5)
+        with self.assertRaises(ValueError):
+            self.generate(alt_number=1)
+
+
+class TestSyntheticVCF(unittest.TestCase):
+    output_vcf_path = './tests_synthetic.vcf'
+
+    def tearDown(self):
+        for path in [self.output_vcf_path, self.output_vcf_path + '.gz']:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def generate(self, **kwargs):
+        parameters = dict(output_vcf_path=self.output_vcf_path, n_variants=500, n_samples=20, seed=1,
+                          missing_rate=0.1, multiallelic_rate=0.3, info_fields=['NS', 'AN', 'AC', 'AF', 'DP'],
+                          format_fields=['GT', 'DP', 'GQ', 'AD'], n_workers=1)
+        parameters.update(kwargs)
+        return synthetic.generate_vcf(**parameters)
+
+    def test_read_vcf(self):
+        """ Tests that the VCF file can be read, with INFO and FORMAT values consistent with the genotype calls. """
+        self.generate()
+        callset = allel.read_vcf(self.output_vcf_path, fields='*', alt_number=3)
+
+        gt = allel.GenotypeArray(callset['calldata/GT'])
+        self.assertEqual((500, 20, 2), gt.shape)
+        self.assertEqual(['SYN{:08d}'.format(i) for i in range(20)], list(callset['samples']))
+        self.assertTrue(np.all(np.diff(callset['variants/POS']) > 0))
+        self.assertTrue(np.all(np.max(gt, axis=(1, 2)) <= callset['variants/numalt']))
+
+        ac = gt.count_alleles(max_allele=3)
+        np.testing.assert_array_equal(ac.sum(axis=1), callset['variants/AN'])
+        np.testing.assert_array_equal(ac[:, 1:], np.maximum(callset['variants/AC'], 0))
+        np.testing.assert_array_equal(gt.count_called(axis=1), callset['variants/NS'])
+
+        # Allele depths add up to the depth of each call (up to rounding of heterozygous calls)
+        ad = np.maximum(callset['calldata/AD'], 0)
+        depth = callset['calldata/DP']
+        called = gt.is_called()
+        self.assertTrue(np.all(np.abs(np.sum(ad, axis=2) - depth)[called] <= 1))
+        np.testing.assert_array_equal(np.sum(np.maximum(depth, 0), axis=1), callset['variants/DP'])
+
+    def test_compression(self):
+        """ Tests that gzip and BGZF compressed files decompress to the plain VCF file. """
+        self.generate(compression='none')
+        with open(self.output_vcf_path, 'rb') as f:
+            plain = f.read()
+
+        for compression in ['gzip', 'bgzf']:
+            self.generate(output_vcf_path=self.output_vcf_path + '.gz', compression=compression)
+            with gzip.open(self.output_vcf_path + '.gz', 'rb') as f:
+                self.assertEqual(plain, f.read())
+
+        # Each BGZF block records its size and decompresses independently; the file ends with an empty block
+        with open(self.output_vcf_path + '.gz', 'rb') as f:
+            data = f.read()
+        offset, decompressed = 0, b''
+        while offset < len(data):
+            self.assertEqual(b'BC', data[offset + 12:offset + 14])
+            block_size = struct.unpack('<H', data[offset + 16:offset + 18])[0] + 1
+            self.assertLessEqual(block_size, 65536)
+            decompressed += zlib.decompress(data[offset + 18:offset + block_size - 8], -15)
+            offset += block_size
+        self.assertEqual(len(data), offset)
+        self.assertEqual(plain, decompressed)
+        self.assertEqual(28, block_size)
+
+    def test_parallel(self):
+        """ Tests that writing with several worker processes produces the same file. """
+        self.generate(output_vcf_path=self.output_vcf_path + '.gz', n_variants=1200, n_samples=2000, n_workers=1,
+                      format_fields=['GT'])
+        with open(self.output_vcf_path + '.gz', 'rb') as f:
+            serial = f.read()
+        self.generate(output_vcf_path=self.output_vcf_path + '.gz', n_variants=1200, n_samples=2000, n_workers=2,
+                      format_fields=['GT'])
+        with open(self.output_vcf_path + '.gz', 'rb') as f:
+            self.assertEqual(serial, f.read())
+
+    def test_supported_fields(self):
+        """ Tests that the fields offered by the configuration (and command line) are those supported. """
+        self.assertEqual(config.synthetic_vcf_info_field_types, list(synthetic.VCF_INFO_FIELDS.keys()))
+        self.assertEqual(config.synthetic_vcf_format_field_types, list(synthetic.VCF_FORMAT_FIELDS.keys()))
+
+    def test_invalid_fields(self):
+        with self.assertRaises(ValueError):
+            self.generate(info_fields=['XX'])
+        with self.assertRaises(ValueError):
+            self.generate(format_fields=['GT', 'PL'])
+        with self.assertRaises(ValueError):
+            self.generate(compression='bzip2')
+
+
+if __name__ == '__main__':
+    unittest.main()